@@ -37,6 +37,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'core',
     'rest_framework',
     'rest_framework.authtoken',
@@ -46,6 +47,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.PrometheusMiddleware',
+    'core.middleware.RequestTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -55,6 +58,27 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# API-only worker processes (DJANGO_API_ONLY=1) leave out the admin, the
+# Swagger UI and what only they use, so they boot faster. The postgres app
+# only adds lookups the API does not use, and imports django.test. Measure
+# with `manage.py profile_startup --compare`.
+API_ONLY = os.environ.get('DJANGO_API_ONLY', '0') == '1'
+API_ONLY_EXCLUDED = (
+    'django.contrib.admin',
+    'django.contrib.messages',
+    'django.contrib.postgres',
+    'drf_spectacular',
+    'django.contrib.messages.middleware.MessageMiddleware',
+)
+if API_ONLY:
+    INSTALLED_APPS = [
+        app for app in INSTALLED_APPS if app not in API_ONLY_EXCLUDED
+    ]
+    MIDDLEWARE = [
+        middleware for middleware in MIDDLEWARE
+        if middleware not in API_ONLY_EXCLUDED
+    ]
+
 ROOT_URLCONF = 'app.urls'
 
 TEMPLATES = [
@@ -67,8 +91,9 @@ TEMPLATES = [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
+            ] + ([] if API_ONLY else [
                 'django.contrib.messages.context_processors.messages',
-            ],
+            ]),
         },
     },
 ]
@@ -79,16 +104,175 @@ WSGI_APPLICATION = 'app.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
+# DB_POOL=1 hands closed connections back to a per-process pool, see
+# core.db.pool. DB_CONN_MAX_AGE keeps one connection per thread instead,
+# and should stay 0 with the pool.
+DB_POOL = os.environ.get('DB_POOL', '0') == '1'
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': (
+            'core.db.backends.postgresql_pool' if DB_POOL
+            else 'django.db.backends.postgresql'
+        ),
         'HOST': os.environ.get('DB_HOST'),
         'NAME': os.environ.get('DB_NAME'),
         'USER': os.environ.get('DB_USER'),
         'PASSWORD': os.environ.get('DB_PASS'),
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 0)),
+        'POOL': {
+            # connections open at once, checkouts past it wait up to timeout
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+            'timeout': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+            # seconds a connection is reused for, and may stay idle for
+            'max_lifetime': float(
+                os.environ.get('DB_POOL_MAX_LIFETIME', 1800)
+            ),
+            'idle_timeout': float(os.environ.get('DB_POOL_IDLE_TIMEOUT', 300)),
+            # connections idle for longer are pinged before being reused
+            'health_check_interval': float(
+                os.environ.get('DB_POOL_HEALTH_CHECK_INTERVAL', 30)
+            ),
+        },
     }
 }
 
+# Read replicas of DB_NAME, as a comma separated list of hosts. Views
+# using core.db.replicas.ReplicaReadMixin serve safe requests from them.
+DATABASE_REPLICAS = []
+for index, host in enumerate(
+    filter(None, os.environ.get('DB_REPLICA_HOSTS', '').split(',')),
+    start=1,
+):
+    DATABASES[f'replica_{index}'] = dict(
+        DATABASES['default'],
+        HOST=host.strip(),
+        TEST={'MIRROR': 'default'},
+    )
+    DATABASE_REPLICAS.append(f'replica_{index}')
+
+DATABASE_ROUTERS = ['core.db.replicas.ReplicaRouter']
+
+# Seconds a client reads from the primary after writing, longer than the
+# replication lag
+REPLICA_PIN_SECONDS = int(os.environ.get('DB_REPLICA_PIN_SECONDS', 10))
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    },
+    # used instead of the default one by the benchmark_api command, which
+    # clears it between scenarios. Point it to another Redis or Memcached
+    # database than the default one to benchmark a shared cache
+    'benchmark': {
+        'BACKEND': os.environ.get(
+            'BENCHMARK_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': os.environ.get('BENCHMARK_CACHE_LOCATION', 'benchmark'),
+    },
+}
+
+# Seconds a serialized recipe list or detail body stays cached
+RECIPE_CACHE_TIMEOUT = int(os.environ.get('RECIPE_CACHE_TIMEOUT', 300))
+
+# Limits of the recipe bulk endpoint
+RECIPE_BULK_MAX_ITEMS = int(os.environ.get('RECIPE_BULK_MAX_ITEMS', 1000))
+RECIPE_BULK_BATCH_SIZE = 500
+
+# Rows fetched per server-side cursor round trip by the recipe export
+RECIPE_EXPORT_CHUNK_SIZE = 2000
+
+# Seconds the user resolved from an auth token stays cached. Only cached
+# with a CACHE_BACKEND shared by all workers, such as Redis or Memcached:
+# with the default per-process LocMemCache a token revoked through one
+# worker would stay valid in the others, so every request looks it up
+AUTH_TOKEN_CACHE_TIMEOUT = int(os.environ.get('AUTH_TOKEN_CACHE_TIMEOUT', 300))
+
+# Login attempts allowed per email and per client IP in a sliding window
+# of LOGIN_RATE_WINDOW seconds, keys over the limit are locked out for
+# LOGIN_LOCKOUT seconds
+LOGIN_RATE_LIMIT_ENABLED = (
+    os.environ.get('LOGIN_RATE_LIMIT_ENABLED', '1') == '1'
+)
+LOGIN_RATE_WINDOW = int(os.environ.get('LOGIN_RATE_WINDOW', 60))
+LOGIN_RATE_EMAIL_LIMIT = int(os.environ.get('LOGIN_RATE_EMAIL_LIMIT', 5))
+LOGIN_RATE_IP_LIMIT = int(os.environ.get('LOGIN_RATE_IP_LIMIT', 30))
+LOGIN_LOCKOUT = int(os.environ.get('LOGIN_LOCKOUT', 300))
+
+# Reverse proxies in front of the app. Throttles identify clients by the
+# address the first proxy appended to X-Forwarded-For, or by REMOTE_ADDR
+# when 0. Entries before it are sent by the client and can be forged
+NUM_PROXIES = int(os.environ.get('NUM_PROXIES', 0))
+
+
+# Request timing
+# Per-request SQL, view and render timings in the Server-Timing header
+
+REQUEST_TIMING_ENABLED = os.environ.get('REQUEST_TIMING_ENABLED', '1') == '1'
+# Requests slower than this many milliseconds log their slowest queries
+REQUEST_TIMING_SLOW_MS = int(os.environ.get('REQUEST_TIMING_SLOW_MS', 500))
+REQUEST_TIMING_SLOW_QUERIES = 5
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'core.request_timing': {
+            'handlers': ['console'],
+            'level': os.environ.get('REQUEST_TIMING_LOG_LEVEL', 'INFO'),
+        },
+    },
+}
+
+
+# Metrics
+# Prometheus metrics served on /metrics, set PROMETHEUS_MULTIPROC_DIR when
+# running several worker processes (see core/metrics.py)
+
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'
+# Scrapers either send `Authorization: Bearer <METRICS_TOKEN>` or connect
+# from one of these addresses or networks. REMOTE_ADDR is checked, not
+# X-Forwarded-For, so scrape the app directly rather than through a proxy
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+METRICS_ALLOWED_IPS = [
+    ip.strip()
+    for ip in os.environ.get('METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',')
+    if ip.strip()
+]
+
+
+# Health checks
+# /healthz and /readyz for load balancers and orchestrators (see
+# core/health.py)
+
+# Seconds a database probe result is reused by /readyz
+HEALTH_CHECK_CACHE_SECONDS = float(
+    os.environ.get('HEALTH_CHECK_CACHE_SECONDS', 5)
+)
+# Seconds a database probe may take to connect
+HEALTH_CHECK_TIMEOUT = float(os.environ.get('HEALTH_CHECK_TIMEOUT', 2))
+
+
+# Admin
+# Changelists count with the planner's estimate from table statistics,
+# estimates under this many rows are replaced by an exact COUNT(*)
+
+ADMIN_EXACT_COUNT_LIMIT = int(os.environ.get('ADMIN_EXACT_COUNT_LIMIT', 10000))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -136,5 +320,30 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 AUTH_USER_MODEL = 'core.User'
 
 REST_FRAMEWORK = {
-    'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'NUM_PROXIES': NUM_PROXIES,
+    # orjson for JSON, MessagePack when asked for in Accept/Content-Type,
+    # see core/renderers.py
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.ORJSONRenderer',
+        'core.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.parsers.ORJSONParser',
+        'core.parsers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    # DRF imports the schema class with its token view, API-only workers
+    # serve the pre-built schema and skip loading drf-spectacular's
+    'DEFAULT_SCHEMA_CLASS': (
+        'rest_framework.schemas.openapi.AutoSchema' if API_ONLY
+        else 'drf_spectacular.openapi.AutoSchema'
+    ),
 }
+
+# OpenAPI schema written by the build_schema command and served on
+# /api/schema/, see core/schema.py
+OPENAPI_SCHEMA_FILE = os.environ.get(
+    'OPENAPI_SCHEMA_FILE', BASE_DIR / 'openapi-schema.yaml',
+)
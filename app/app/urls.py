@@ -13,20 +13,37 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
-from django.contrib import admin
+from django.conf import settings
 from django.urls import include, path
 
+from core.health import healthz, readyz
+from core.metrics import metrics_view
+from core.schema import schema_view
+
 urlpatterns = [
-    path('admin/', admin.site.urls),
-    # returns the OpenAPI schema (in yaml format)
-    path('api/schema/', SpectacularAPIView.as_view(), name='api-schema'),
-    # returns the swagger UI view
-    path(
-        'api/docs/',
-        SpectacularSwaggerView.as_view(url_name='api-schema'),
-        name='api-docs'
-    ),
+    # returns the pre-built OpenAPI schema (in yaml format)
+    path('api/schema/', schema_view, name='api-schema'),
     path('api/user/', include('user.urls')),
     path('api/recipe/', include('recipe.urls')),
+    # liveness and readiness probes
+    path('healthz', healthz, name='healthz'),
+    path('readyz', readyz, name='readyz'),
 ]
+
+if not settings.API_ONLY:
+    # imported here, so API-only workers never load them
+    from django.contrib import admin
+    from drf_spectacular.views import SpectacularSwaggerView
+
+    urlpatterns += [
+        path('admin/', admin.site.urls),
+        # returns the swagger UI view
+        path(
+            'api/docs/',
+            SpectacularSwaggerView.as_view(url_name='api-schema'),
+            name='api-docs'
+        ),
+    ]
+
+if settings.METRICS_ENABLED:
+    urlpatterns.append(path('metrics', metrics_view, name='metrics'))
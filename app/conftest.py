@@ -4,6 +4,16 @@ Shared Pytest fixtures defined for the whole project.
 import pytest
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from user.throttling import LoginRateThrottle
+
+    cache.clear()
+    LoginRateThrottle.local_lockouts.clear()
+    yield
 
 
 @pytest.fixture()
@@ -1,5 +1,18 @@
 from django.contrib import admin
 
+from .paginator import EstimatedCountPaginator
+
 
 class RecipeAdmin(admin.ModelAdmin):
     list_display = ['title', 'user']
+    list_select_related = ['user']
+    # a select listing every user would not load on a big table
+    autocomplete_fields = ['user']
+
+    # COUNT(*) reads the whole table, count from the planner's estimate
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        # maintained by a trigger and never shown, skip loading it
+        return super().get_queryset(request).defer('search_vector')
@@ -0,0 +1,89 @@
+"""
+Support for native async read-only API views.
+
+DRF views are synchronous, so under ASGI Django runs each of them in a
+thread. Views decorated with `async_api_view` run on the event loop
+instead and only hand off the blocking work (authentication and ORM
+calls) to the thread pool, while keeping DRF's authentication,
+permission, error and JSON rendering behaviour.
+"""
+import functools
+
+from asgiref.sync import sync_to_async
+
+from django.http import HttpResponseNotAllowed
+from rest_framework import exceptions
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.views import exception_handler
+
+from core.renderers import ORJSONRenderer
+
+
+def async_api_view(authentication_classes,
+                   permission_classes=(IsAuthenticated,)):
+    """
+    Turn an async handler into a read-only API view.
+
+    The handler gets a DRF `Request` whose user is already resolved and
+    returns a DRF `Response`, which is rendered as JSON.
+    """
+    def decorator(handler):
+        @functools.wraps(handler)
+        async def view(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return HttpResponseNotAllowed(['GET', 'HEAD'])
+
+            api_request = Request(
+                request,
+                authenticators=[cls() for cls in authentication_classes],
+            )
+            context = {'request': api_request, 'args': args, 'kwargs': kwargs}
+            try:
+                # authentication looks up the token in the cache or database
+                await sync_to_async(_check_permissions)(
+                    api_request, permission_classes
+                )
+                response = await handler(api_request, *args, **kwargs)
+            except Exception as exc:
+                response = _handle_exception(exc, api_request, context)
+
+            return _render(response, api_request, context)
+
+        return view
+
+    return decorator
+
+
+def _check_permissions(request, permission_classes):
+    for permission in (cls() for cls in permission_classes):
+        if not permission.has_permission(request, None):
+            if request.authenticators and not request.successful_authenticator:
+                raise exceptions.NotAuthenticated()
+            raise exceptions.PermissionDenied()
+
+
+def _handle_exception(exc, request, context):
+    if isinstance(exc, (
+        exceptions.NotAuthenticated,
+        exceptions.AuthenticationFailed,
+    )) and request.authenticators:
+        # as APIView does, to send the WWW-Authenticate header with 401s
+        exc.auth_header = request.authenticators[0].authenticate_header(
+            request
+        )
+
+    response = exception_handler(exc, context)
+    if response is None:
+        raise exc
+
+    return response
+
+
+def _render(response, request, context):
+    renderer = ORJSONRenderer()
+    response.accepted_renderer = renderer
+    response.accepted_media_type = renderer.media_type
+    response.renderer_context = dict(context, response=response)
+
+    return response.render()
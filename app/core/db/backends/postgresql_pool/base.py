@@ -0,0 +1,59 @@
+"""
+PostgreSQL database backend that takes its connections from a pool.
+
+Django closes the connection at the end of each request when
+CONN_MAX_AGE is 0, this backend gives it back to a per-process pool
+instead, so the next request skips the TCP connect, authentication and
+backend start of a new session. The pool is configured with the POOL
+entry of the database settings, see core.db.pool.ConnectionPool.
+"""
+from django.db.backends.postgresql import base, creation
+
+from core.db.pool import close_pools, get_pool
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    # idle pooled sessions would keep the test database in use
+
+    def _clone_test_db(self, suffix, verbosity, keepdb=False):
+        close_pools()
+        super()._clone_test_db(suffix, verbosity, keepdb)
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        close_pools()
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    def get_new_connection(self, conn_params):
+        self.pool = get_pool(
+            (self.alias, repr(sorted(conn_params.items()))),
+            self.settings_dict.get('POOL', {}),
+        )
+        created = []
+
+        def connect():
+            created.append(True)
+            return super(DatabaseWrapper, self).get_new_connection(
+                conn_params
+            )
+
+        connection = self.pool.get(connect)
+        if not created:
+            self.isolation_level = self.settings_dict['OPTIONS'].get(
+                'isolation_level', connection.isolation_level,
+            )
+
+        return connection
+
+    def _close(self):
+        if self.connection is None:
+            return
+        with self.wrap_database_errors:
+            if self.in_atomic_block:
+                # Django keeps using the connection until the block ends
+                self.pool.discard(self.connection)
+            else:
+                self.pool.put(self.connection)
@@ -0,0 +1,209 @@
+"""
+A bounded, per-process pool of database connections.
+
+Connections are handed out most recently used first, so a quiet server
+keeps a few warm connections and lets the others go idle until they
+are evicted. Connections older than the maximum lifetime are closed
+instead of being reused, and those idle for longer than the health
+check interval are pinged before they are handed out again. Returned
+connections are rolled back and their session state is discarded, so
+the next user gets a clean session.
+"""
+import os
+import threading
+import time
+from collections import deque
+
+from psycopg2 import extensions
+
+from django.db import OperationalError
+
+_pools = {}
+_pools_lock = threading.Lock()
+_pools_pid = os.getpid()
+# connections inherited from the parent of a forked process, kept
+# referenced so their finalizer never closes the parent's sessions
+_inherited = []
+
+
+class ConnectionPool:
+    """Pool of psycopg2 connections to one database."""
+
+    def __init__(self, max_size=10, max_lifetime=1800, idle_timeout=300,
+                 timeout=10, health_check_interval=30):
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.size = 0
+        self.closed = False
+        # (connection, created, returned), the most recently used last
+        self.idle = deque()
+        self.created = {}
+        self.condition = threading.Condition()
+
+    def get(self, connect):
+        """Return an idle connection, or one made with `connect()`."""
+        deadline = time.monotonic() + self.timeout
+        while True:
+            connection, created, returned = self._checkout(deadline)
+            if connection is None:
+                return self._connect(connect)
+            if self._usable(connection, created, returned):
+                self.created[connection] = created
+                return connection
+            self._discard(connection)
+
+    def put(self, connection):
+        """Give a connection back, or close it if it can not be reused."""
+        created = self.created.pop(connection, None)
+        now = time.monotonic()
+        expired = created is None or now - created > self.max_lifetime
+        if self.closed or expired or not self._reset(connection):
+            self._discard(connection)
+            return
+
+        with self.condition:
+            self.idle.append((connection, created, now))
+            self.condition.notify()
+
+    def discard(self, connection):
+        """Close a checked out connection instead of giving it back."""
+        self.created.pop(connection, None)
+        self._discard(connection)
+
+    def close(self):
+        """Close all idle connections, and those given back later."""
+        with self.condition:
+            self.closed = True
+            idle, self.idle = self.idle, deque()
+            self.size -= len(idle)
+            self.condition.notify_all()
+        for connection, _, _ in idle:
+            connection.close()
+
+    def _checkout(self, deadline):
+        with self.condition:
+            while True:
+                self._evict_idle()
+                if self.idle:
+                    return self.idle.pop()
+                if self.size < self.max_size:
+                    self.size += 1
+                    return None, None, None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise OperationalError(
+                        f'No database connection available within '
+                        f'{self.timeout}s, all {self.max_size} are in use.'
+                    )
+                self.condition.wait(remaining)
+
+    def _connect(self, connect):
+        try:
+            connection = connect()
+        except BaseException:
+            with self.condition:
+                self.size -= 1
+                self.condition.notify()
+            raise
+        self.created[connection] = time.monotonic()
+
+        return connection
+
+    def _evict_idle(self):
+        # the least recently used are first, stop at the first fresh one
+        now = time.monotonic()
+        while self.idle and now - self.idle[0][2] > self.idle_timeout:
+            connection, _, _ = self.idle.popleft()
+            self.size -= 1
+            connection.close()
+
+    def _usable(self, connection, created, returned):
+        now = time.monotonic()
+        if connection.closed or now - created > self.max_lifetime:
+            return False
+        if now - returned <= self.health_check_interval:
+            return True
+
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            return self._rollback(connection)
+        except Exception:
+            return False
+
+    def _reset(self, connection):
+        """
+        End any open transaction and drop the session state left behind,
+        such as settings, advisory locks, temporary tables and held
+        cursors. Return whether that succeeded.
+        """
+        if not self._rollback(connection):
+            return False
+        try:
+            # DISCARD can not run in a transaction block
+            autocommit = connection.autocommit
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute('DISCARD ALL')
+            connection.autocommit = autocommit
+        except Exception:
+            return False
+
+        return True
+
+    def _rollback(self, connection):
+        """End any open transaction, return whether that succeeded."""
+        if connection.closed:
+            return False
+        status = connection.get_transaction_status()
+        if status == extensions.TRANSACTION_STATUS_IDLE:
+            return True
+        if status not in (
+            extensions.TRANSACTION_STATUS_INTRANS,
+            extensions.TRANSACTION_STATUS_INERROR,
+        ):
+            return False
+        try:
+            connection.rollback()
+        except Exception:
+            return False
+
+        return True
+
+    def _discard(self, connection):
+        try:
+            connection.close()
+        finally:
+            with self.condition:
+                self.size -= 1
+                self.condition.notify()
+
+
+def get_pool(key, options):
+    """Return the pool of this process for the key, creating it if needed."""
+    global _pools_pid
+    with _pools_lock:
+        if _pools_pid != os.getpid():
+            _inherited.append(_pools.copy())
+            _pools.clear()
+            _pools_pid = os.getpid()
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(**options)
+
+    return pool
+
+
+def close_pools():
+    """
+    Close the idle connections of every pool of this process and forget
+    the pools, connections in use are closed when they are given back.
+    """
+    with _pools_lock:
+        pools = list(_pools.values()) if _pools_pid == os.getpid() else []
+        _pools.clear()
+    for pool in pools:
+        pool.close()
@@ -0,0 +1,129 @@
+"""
+Routing of reads to read replicas.
+
+Reads go to the primary database unless a view opts in with
+ReplicaReadMixin: its safe requests then pick one of the replicas and
+run all their reads against it. A client that just wrote through such
+a view is pinned to the primary for REPLICA_PIN_SECONDS, so replication
+lag never hides its own writes from it. Pins live in the cache, which
+must be shared by all workers for them to hold across processes.
+"""
+import hashlib
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+from rest_framework.permissions import SAFE_METHODS
+
+# alias of the replica the current request reads from, if any
+_replica = ContextVar('replica', default=None)
+
+
+class ReplicaRouter:
+    """Send reads to the replica chosen for the request, writes to primary"""
+
+    def db_for_read(self, model, **hints):
+        return _replica.get() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # also for instances that were read from a replica
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # replicas get the schema through replication
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+def reading_from_replica():
+    """Return whether the reads of the current request go to a replica."""
+    return _replica.get() is not None
+
+
+def choose_replica(request):
+    """Return a replica for the request to read from, None if pinned."""
+    if not settings.DATABASE_REPLICAS or is_pinned(request):
+        return None
+    return random.choice(settings.DATABASE_REPLICAS)
+
+
+@contextmanager
+def replica_reads(request):
+    """Send the reads of the block to a replica, unless pinned."""
+    token = _replica.set(choose_replica(request))
+    try:
+        yield
+    finally:
+        _replica.reset(token)
+
+
+@contextmanager
+def primary_reads():
+    """Send the reads of the block to the primary."""
+    token = _replica.set(None)
+    try:
+        yield
+    finally:
+        _replica.reset(token)
+
+
+def _pin_key(request):
+    credentials = request.META.get('HTTP_AUTHORIZATION')
+    if not credentials:
+        return None
+    digest = hashlib.sha256(credentials.encode()).hexdigest()
+
+    return f'db:primary:{digest}'
+
+
+def pin_to_primary(request):
+    """Make the client of the request read from the primary for a while."""
+    key = _pin_key(request)
+    if key is not None:
+        cache.set(key, True, settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned(request):
+    """Return whether the client of the request wrote recently."""
+    key = _pin_key(request)
+    return key is not None and cache.get(key, False)
+
+
+class ReplicaReadMixin:
+    """
+    Serve the safe requests of `replica_actions`, or of every action if
+    it is None, from a replica, and pin the client to the primary after
+    a successful write. Token lookups still go to the primary, see
+    user.authentication.
+    """
+    replica_actions = None
+
+    def dispatch(self, request, *args, **kwargs):
+        token = _replica.set(None)
+        try:
+            response = super().dispatch(request, *args, **kwargs)
+        finally:
+            _replica.reset(token)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            pin_to_primary(request)
+
+        return response
+
+    def initial(self, request, *args, **kwargs):
+        if request.method in SAFE_METHODS and (
+            self.replica_actions is None
+            or getattr(self, 'action', None) in self.replica_actions
+        ):
+            _replica.set(choose_replica(request))
+        super().initial(request, *args, **kwargs)
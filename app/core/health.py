@@ -0,0 +1,79 @@
+"""
+Health checks of the app.
+
+`/healthz` only tells the process is serving requests. `/readyz` also
+probes every configured database, with a connect that skips Django's
+connection setup, and answers 503 when one of them is unreachable.
+Probe results are reused for HEALTH_CHECK_CACHE_SECONDS, so frequent
+load balancer checks cost at most one connection per database and
+interval in each process.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections
+from django.http import JsonResponse
+
+_lock = threading.Lock()
+# (time of the probe, {alias: error or None})
+_last_probe = None
+
+
+def probe_database(alias, timeout):
+    """Open and close a connection to the database, raise if it fails."""
+    wrapper = connections[alias]
+    params = wrapper.get_connection_params()
+    params['connect_timeout'] = max(1, round(timeout))
+    wrapper.Database.connect(**params).close()
+
+
+def probe_databases(aliases, timeout):
+    """Probe the databases in parallel, return {alias: error or None}."""
+    def probe(alias):
+        try:
+            probe_database(alias, timeout)
+        except Exception as error:
+            return error
+        return None
+
+    aliases = list(aliases)
+    with ThreadPoolExecutor(max_workers=max(1, len(aliases))) as executor:
+        return dict(zip(aliases, executor.map(probe, aliases)))
+
+
+def _database_errors():
+    global _last_probe
+    with _lock:
+        now = time.monotonic()
+        if _last_probe is None or (
+            now - _last_probe[0] >= settings.HEALTH_CHECK_CACHE_SECONDS
+        ):
+            _last_probe = now, probe_databases(
+                connections, settings.HEALTH_CHECK_TIMEOUT,
+            )
+
+        return _last_probe[1]
+
+
+def healthz(request):
+    """Answer as long as the process serves requests."""
+    return JsonResponse({'status': 'ok'})
+
+
+def readyz(request):
+    """Answer 200 when all databases are reachable, 503 otherwise."""
+    errors = _database_errors()
+    ready = not any(errors.values())
+
+    return JsonResponse(
+        {
+            'status': 'ok' if ready else 'unavailable',
+            'databases': {
+                alias: 'unavailable' if error else 'ok'
+                for alias, error in errors.items()
+            },
+        },
+        status=200 if ready else 503,
+    )
@@ -0,0 +1,348 @@
+"""
+Django command to benchmark the API against a seeded dataset.
+Recipes are spread over a number of users inside a transaction that is
+rolled back at the end, then each scenario is requested through the
+full middleware and view stack while latency, throughput and SQL query
+counts are recorded. Results can be written as JSON and compared with
+a stored baseline, failing the command when a scenario regressed.
+
+The API runs against the `benchmark` cache, cleared before every
+scenario, and reads from the primary only: the seed is not committed,
+replicas never see it. The tokens, lockouts and replica pins of the
+deployment in the default cache are left alone.
+"""
+import json
+import logging
+import platform
+import random
+import statistics
+import time
+from decimal import Decimal
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.db.replicas import primary_reads
+from core.models import Recipe
+from user.throttling import LoginRateThrottle
+
+BENCHMARK_PASSWORD = 'benchmark-pass-123'
+WORDS = (
+    'tomato', 'basil', 'garlic', 'onion', 'pasta', 'rice', 'chicken',
+    'lentil', 'curry', 'lemon', 'ginger', 'salad', 'soup', 'roast',
+    'pepper', 'mushroom', 'spinach', 'cheese', 'bread', 'chili',
+)
+SCENARIOS = (
+    'recipe_list',
+    'recipe_list_uncached',
+    'recipe_search',
+    'recipe_detail',
+    'recipe_create',
+    'recipe_update',
+    'token',
+    'token_burst',
+    'profile',
+)
+PERCENTILES = (50, 90, 95, 99)
+QUIET_LOGGERS = ('core.request_timing', 'django.request')
+BENCHMARK_CACHE = 'benchmark'
+
+
+class Command(BaseCommand):
+    """Django command to benchmark the API"""
+    help = 'Benchmark API endpoints against a seeded dataset.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--recipes',
+            type=int,
+            default=1000,
+            help='Recipes to seed, e.g. 1000, 100000 or 1000000.',
+        )
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=200,
+            help='Measured requests per scenario.',
+        )
+        parser.add_argument('--warmup', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--scenarios',
+            nargs='+',
+            choices=SCENARIOS,
+            default=SCENARIOS,
+        )
+        parser.add_argument('--output', help='File the results are saved to.')
+        parser.add_argument(
+            '--baseline',
+            help='Results of an earlier run to compare against.',
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=0.2,
+            help='Allowed slowdown over the baseline, 0.2 is 20%%.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        if options['requests'] < 2:
+            raise CommandError('At least 2 requests per scenario are needed.')
+        self.random = random.Random(options['seed'])
+
+        # a line per request, and per rejected one, would drown the results
+        quiet = [logging.getLogger(name) for name in QUIET_LOGGERS]
+        for logger in quiet:
+            logger.disabled = True
+        try:
+            with transaction.atomic(), primary_reads(), override_settings(
+                ALLOWED_HOSTS=['testserver'],
+                CACHES={'default': settings.CACHES[BENCHMARK_CACHE]},
+                # views pick a replica for their reads by themselves
+                DATABASE_REPLICAS=[],
+            ):
+                self.stdout.write(
+                    f'Seeding {options["recipes"]} recipes for '
+                    f'{options["users"]} users...'
+                )
+                self._seed(options['users'], options['recipes'])
+                scenarios = {}
+                for name in options['scenarios']:
+                    scenarios[name] = self._measure(
+                        name, options['requests'], options['warmup'],
+                    )
+                    self._write_scenario(name, scenarios[name])
+                transaction.set_rollback(True)
+        finally:
+            for logger in quiet:
+                logger.disabled = False
+
+        results = {
+            'meta': {
+                'recipes': options['recipes'],
+                'users': options['users'],
+                'requests': options['requests'],
+                'seed': options['seed'],
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+            },
+            'scenarios': scenarios,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(results, output, indent=2, sort_keys=True)
+            self.stdout.write(f'Results written to {options["output"]}.')
+
+        if options['baseline']:
+            with open(options['baseline']) as baseline:
+                self._compare(
+                    json.load(baseline)['scenarios'],
+                    scenarios,
+                    options['threshold'],
+                )
+
+    def _seed(self, users, recipes):
+        password = make_password(BENCHMARK_PASSWORD)
+        self.users = get_user_model().objects.bulk_create(
+            get_user_model()(
+                email=f'benchmark-{i}@example.com',
+                name=f'Benchmark User {i}',
+                password=password,
+            )
+            for i in range(users)
+        )
+        self.tokens = {
+            token.user_id: token.key
+            for token in Token.objects.bulk_create(
+                Token(user=user, key=Token.generate_key())
+                for user in self.users
+            )
+        }
+
+        batch = []
+        for i in range(recipes):
+            batch.append(self._make_recipe(self.users[i % users]))
+            if len(batch) == 10000:
+                Recipe.objects.bulk_create(batch)
+                batch = []
+        Recipe.objects.bulk_create(batch)
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {Recipe._meta.db_table}')
+
+        self.recipe_ids = {
+            user.pk: list(
+                Recipe.objects.filter(user=user).values_list(
+                    'id', flat=True,
+                )[:1000]
+            )
+            for user in self.users
+        }
+
+    def _make_recipe(self, user):
+        words = self.random.sample(WORDS, 6)
+        return Recipe(
+            user=user,
+            title=' '.join(words[:3]).capitalize(),
+            description=' '.join(words) + '.',
+            time_minutes=self.random.randint(1, 240),
+            price=Decimal(self.random.randint(100, 5000)) / 100,
+            link='https://example.com/recipe',
+        )
+
+    def _client(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {self.tokens[user.pk]}')
+        return client
+
+    def _request(self, name, i):
+        user = self.users[i % len(self.users)]
+        client = self._client(user)
+        recipe_id = self.random.choice(self.recipe_ids[user.pk] or [0])
+        list_url = reverse('recipe:recipe-list')
+        detail_url = reverse('recipe:recipe-detail', args=[recipe_id])
+
+        if name in ('recipe_list', 'recipe_list_uncached'):
+            return client.get(list_url)
+        if name == 'recipe_search':
+            return client.get(list_url, {'search': self.random.choice(WORDS)})
+        if name == 'recipe_detail':
+            return client.get(detail_url)
+        if name == 'recipe_create':
+            recipe = self._make_recipe(user)
+            return client.post(list_url, {
+                'title': recipe.title,
+                'description': recipe.description,
+                'time_minutes': recipe.time_minutes,
+                'price': recipe.price,
+            })
+        if name == 'recipe_update':
+            return client.patch(detail_url, {'title': 'Updated recipe'})
+        if name == 'token':
+            return APIClient().post(reverse('user:token'), {
+                'email': user.email,
+                'password': BENCHMARK_PASSWORD,
+            })
+        if name == 'token_burst':
+            # credential stuffing against one account from one client
+            return APIClient().post(reverse('user:token'), {
+                'email': self.users[0].email,
+                'password': f'guess-{i}',
+            })
+
+        return client.get(reverse('user:profile'))
+
+    def _measure(self, name, requests, warmup):
+        overrides = {
+            # only the burst scenario is about the login rate limiter
+            'LOGIN_RATE_LIMIT_ENABLED': name == 'token_burst',
+        }
+        if name == 'recipe_list_uncached':
+            overrides['RECIPE_CACHE_TIMEOUT'] = 0
+        allowed_statuses = {400, 429} if name == 'token_burst' else set()
+
+        latencies = []
+        cpu_times = []
+        queries = []
+        rejected = 0
+        # every scenario starts from a cold cache, then warms it up
+        cache.clear()
+        LoginRateThrottle.local_lockouts.clear()
+        with override_settings(**overrides):
+            for i in range(warmup):
+                self._request(name, i)
+
+            started = time.perf_counter()
+            for i in range(requests):
+                with CaptureQueriesContext(connection) as captured:
+                    request_started = time.perf_counter()
+                    cpu_started = time.process_time()
+                    response = self._request(name, i)
+                    cpu_times.append(time.process_time() - cpu_started)
+                    latencies.append(time.perf_counter() - request_started)
+                if response.status_code == 429:
+                    rejected += 1
+                if response.status_code >= 400 and (
+                    response.status_code not in allowed_statuses
+                ):
+                    raise CommandError(
+                        f'{name} failed with {response.status_code}: '
+                        f'{response.content[:200]!r}'
+                    )
+                queries.append(len(captured))
+            elapsed = time.perf_counter() - started
+
+        cut_points = statistics.quantiles(
+            latencies, n=100, method='inclusive',
+        )
+        result = {
+            f'p{percentile}_ms': cut_points[percentile - 1] * 1000
+            for percentile in PERCENTILES
+        }
+        result.update({
+            'mean_ms': statistics.mean(latencies) * 1000,
+            'cpu_mean_ms': statistics.mean(cpu_times) * 1000,
+            'throughput_rps': requests / elapsed,
+            'rejected': rejected,
+            'queries_mean': statistics.mean(queries),
+            'queries_max': max(queries),
+        })
+
+        return result
+
+    def _write_scenario(self, name, result):
+        self.stdout.write(
+            f'{name:<22} p50 {result["p50_ms"]:8.2f} ms  '
+            f'p95 {result["p95_ms"]:8.2f} ms  '
+            f'p99 {result["p99_ms"]:8.2f} ms  '
+            f'{result["throughput_rps"]:8.1f} req/s  '
+            f'cpu {result["cpu_mean_ms"]:7.2f} ms  '
+            f'{result["queries_max"]:3d} queries'
+        )
+
+    def _compare(self, baseline, scenarios, threshold):
+        regressions = []
+        for name, result in scenarios.items():
+            if name not in baseline:
+                continue
+            before = baseline[name]
+            if result['p95_ms'] > before['p95_ms'] * (1 + threshold):
+                regressions.append(
+                    f'{name}: p95 {before["p95_ms"]:.2f} ms -> '
+                    f'{result["p95_ms"]:.2f} ms'
+                )
+            if result['throughput_rps'] < (
+                before['throughput_rps'] * (1 - threshold)
+            ):
+                regressions.append(
+                    f'{name}: throughput {before["throughput_rps"]:.1f} -> '
+                    f'{result["throughput_rps"]:.1f} req/s'
+                )
+            if result['queries_max'] > before['queries_max']:
+                regressions.append(
+                    f'{name}: queries {before["queries_max"]} -> '
+                    f'{result["queries_max"]}'
+                )
+
+        if regressions:
+            raise CommandError(
+                'Performance regressed against the baseline:\n  '
+                + '\n  '.join(regressions)
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'No regressions against the baseline (threshold '
+            f'{threshold:.0%}).'
+        ))
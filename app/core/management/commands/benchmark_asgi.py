@@ -0,0 +1,234 @@
+"""
+Django command comparing the throughput of concurrent requests served
+by the WSGI handler with threads, by the ASGI handler with the sync DRF
+views, and by the ASGI handler with the async views. Requests are fed
+to the handlers in-process, like a server would after parsing them, so
+the numbers show the cost of the Django and DRF stack without sockets.
+"""
+import asyncio
+import io
+import logging
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from rest_framework.authtoken.models import Token
+
+from core.models import Recipe
+
+MODES = ('wsgi', 'asgi-sync', 'asgi-async')
+ENDPOINTS = ('list', 'detail', 'profile')
+HOST = 'localhost'
+QUIET_LOGGERS = ('core.request_timing', 'django.request')
+
+
+class Command(BaseCommand):
+    """Django command to benchmark the WSGI and ASGI request paths"""
+    help = 'Compare concurrent throughput of the WSGI and ASGI paths.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipes', type=int, default=1000)
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=32,
+            help='Requests in flight at the same time.',
+        )
+        parser.add_argument(
+            '--modes', nargs='+', choices=MODES, default=MODES,
+        )
+        parser.add_argument(
+            '--endpoints', nargs='+', choices=ENDPOINTS, default=ENDPOINTS,
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        if options['requests'] < 2:
+            raise CommandError('At least 2 requests are needed.')
+
+        # the handlers run on other threads and connections, so the data
+        # has to be committed, it is deleted again at the end
+        self._seed(options['users'], options['recipes'])
+        # a line per request, and per rejected one, would drown the results
+        quiet = [logging.getLogger(name) for name in QUIET_LOGGERS]
+        for logger in quiet:
+            logger.disabled = True
+        try:
+            with override_settings(ALLOWED_HOSTS=[HOST]):
+                for endpoint in options['endpoints']:
+                    for mode in options['modes']:
+                        self._benchmark(
+                            mode, endpoint, options['requests'],
+                            options['concurrency'],
+                        )
+        finally:
+            for logger in quiet:
+                logger.disabled = False
+            get_user_model().objects.filter(
+                pk__in=[user.pk for user in self.users]
+            ).delete()
+
+    def _seed(self, users, recipes):
+        self.users = [
+            get_user_model().objects.create_user(
+                email=f'asgi-benchmark-{i}@example.com',
+                password=None,
+            )
+            for i in range(users)
+        ]
+        self.tokens = [
+            Token.objects.create(user=user).key for user in self.users
+        ]
+        created = Recipe.objects.bulk_create(
+            (
+                Recipe(
+                    user=self.users[i % users],
+                    title=f'Benchmark Recipe {i}',
+                    time_minutes=i % 120 + 1,
+                    price=Decimal(i % 5000) / 100,
+                )
+                for i in range(recipes)
+            ),
+            batch_size=5000,
+        )
+        self.recipe_ids = {}
+        for recipe in created:
+            self.recipe_ids.setdefault(recipe.user_id, recipe.id)
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {Recipe._meta.db_table}')
+
+    def _paths(self, endpoint, is_async, count):
+        suffix = '-async' if is_async else ''
+        paths = []
+        for i in range(count):
+            user = self.users[i % len(self.users)]
+            if endpoint == 'list':
+                path = reverse(f'recipe:recipe-list{suffix}')
+            elif endpoint == 'detail':
+                path = reverse(
+                    f'recipe:recipe-detail{suffix}',
+                    args=[self.recipe_ids.get(user.pk, 0)],
+                )
+            else:
+                path = reverse(f'user:profile{suffix}')
+            paths.append((path, self.tokens[i % len(self.tokens)]))
+
+        return paths
+
+    def _benchmark(self, mode, endpoint, requests, concurrency):
+        paths = self._paths(endpoint, mode == 'asgi-async', requests)
+        started = time.perf_counter()
+        if mode == 'wsgi':
+            results = self._run_wsgi(paths, concurrency)
+        else:
+            results = asyncio.run(self._run_asgi(paths, concurrency))
+        elapsed = time.perf_counter() - started
+
+        latencies = [latency for latency, _ in results]
+        errors = sum(1 for _, status in results if status >= 400)
+        cut_points = statistics.quantiles(
+            latencies, n=100, method='inclusive',
+        )
+        self.stdout.write(
+            f'{endpoint:<8} {mode:<11} {requests / elapsed:9.1f} req/s  '
+            f'p50 {cut_points[49] * 1000:8.2f} ms  '
+            f'p99 {cut_points[98] * 1000:8.2f} ms  '
+            f'{errors} errors'
+        )
+
+    def _run_wsgi(self, paths, concurrency):
+        handler = WSGIHandler()
+
+        def request(item):
+            path, token = item
+            started = time.perf_counter()
+            status = []
+            body = handler(
+                self._environ(path, token),
+                lambda code, headers: status.append(int(code.split()[0])),
+            )
+            for _ in body:
+                pass
+            body.close()
+            return time.perf_counter() - started, status[0]
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            return list(executor.map(request, paths))
+
+    async def _run_asgi(self, paths, concurrency):
+        handler = ASGIHandler()
+        pending = iter(paths)
+        results = []
+
+        async def worker():
+            for path, token in pending:
+                started = time.perf_counter()
+                status = await self._asgi_request(handler, path, token)
+                results.append((time.perf_counter() - started, status))
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+        return results
+
+    async def _asgi_request(self, handler, path, token):
+        status = []
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': path,
+            'raw_path': path.encode(),
+            'query_string': b'',
+            'root_path': '',
+            'headers': [
+                (b'host', HOST.encode()),
+                (b'authorization', f'Token {token}'.encode()),
+            ],
+            'client': ('127.0.0.1', 50000),
+            'server': (HOST, 80),
+        }
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                status.append(message['status'])
+
+        await handler(scope, receive, send)
+
+        return status[0]
+
+    def _environ(self, path, token):
+        return {
+            'REQUEST_METHOD': 'GET',
+            'SCRIPT_NAME': '',
+            'PATH_INFO': path,
+            'QUERY_STRING': '',
+            'SERVER_NAME': HOST,
+            'SERVER_PORT': '80',
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'HTTP_HOST': HOST,
+            'HTTP_AUTHORIZATION': f'Token {token}',
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': 'http',
+            'wsgi.input': io.BytesIO(),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+        }
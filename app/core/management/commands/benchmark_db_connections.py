@@ -0,0 +1,84 @@
+"""
+Django command measuring what connection handling costs a request.
+Each simulated request opens the connection if needed, runs the recipe
+detail query and then lets Django close or keep the connection as it
+does when a request finishes, with a new connection per request, with
+the pooled backend and with a persistent connection (CONN_MAX_AGE).
+"""
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.backends.postgresql.base import (
+    DatabaseWrapper as PostgresWrapper,
+)
+
+from core.db.backends.postgresql_pool.base import (
+    DatabaseWrapper as PooledWrapper,
+)
+from core.db.pool import close_pools
+from core.models import Recipe
+
+MODES = ('connect', 'pool', 'persistent')
+
+
+class Command(BaseCommand):
+    """Django command to benchmark database connection handling"""
+    help = 'Compare per-request latency with new, pooled and ' \
+        'persistent connections.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument(
+            '--modes', nargs='+', choices=MODES, default=MODES,
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        if options['requests'] < 2:
+            raise CommandError('At least 2 requests are needed.')
+        if connection.vendor != 'postgresql':
+            raise CommandError('The default database is not PostgreSQL.')
+
+        pk = Recipe.objects.values_list('pk', flat=True).first() or 0
+        self.query = Recipe.objects.filter(pk=pk).query.sql_with_params()
+        for mode in options['modes']:
+            self._benchmark(mode, options['requests'])
+
+    def _wrapper(self, mode):
+        # a wrapper of its own, under the default alias the postgres
+        # signal handlers look up, so its connection is the only one timed
+        settings_dict = dict(connection.settings_dict, CONN_MAX_AGE=0)
+        if mode == 'persistent':
+            settings_dict['CONN_MAX_AGE'] = None
+        if mode == 'pool':
+            return PooledWrapper(settings_dict, alias=connection.alias)
+
+        return PostgresWrapper(settings_dict, alias=connection.alias)
+
+    def _benchmark(self, mode, requests):
+        wrapper = self._wrapper(mode)
+        latencies = []
+        try:
+            for _ in range(requests):
+                started = time.perf_counter()
+                with wrapper.cursor() as cursor:
+                    cursor.execute(*self.query)
+                    cursor.fetchall()
+                # what the request_finished signal does
+                wrapper.close_if_unusable_or_obsolete()
+                latencies.append(time.perf_counter() - started)
+        finally:
+            wrapper.close()
+            close_pools()
+
+        cut_points = statistics.quantiles(
+            latencies, n=100, method='inclusive',
+        )
+        self.stdout.write(
+            f'{mode:<11} '
+            f'p50 {cut_points[49] * 1000:7.2f} ms  '
+            f'p95 {cut_points[94] * 1000:7.2f} ms  '
+            f'mean {statistics.mean(latencies) * 1000:7.2f} ms'
+        )
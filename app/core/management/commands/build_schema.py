@@ -0,0 +1,49 @@
+"""
+Django command to generate the OpenAPI schema served on /api/schema/.
+Run it when building the image, so no server process has to introspect
+the API. The schema is only generated again when its sources changed.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.schema import build_schema, read_schema, source_hash
+
+
+class Command(BaseCommand):
+    """Django command to pre-build the OpenAPI schema"""
+    help = 'Generate the OpenAPI schema file if its sources changed.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--file',
+            default=settings.OPENAPI_SCHEMA_FILE,
+            help='Schema file, OPENAPI_SCHEMA_FILE by default.',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Generate the schema even if it is up to date.',
+        )
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only fail if the schema file is missing or stale.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        path = options['file']
+        if options['check']:
+            _, file_hash = read_schema(path)
+            if file_hash != source_hash():
+                raise CommandError(f'{path} is missing or out of date.')
+            self.stdout.write(f'{path} is up to date.')
+            return
+
+        current_hash, written = build_schema(path, force=options['force'])
+        if written:
+            self.stdout.write(self.style.SUCCESS(
+                f'Schema written to {path} ({current_hash[:12]}).'
+            ))
+        else:
+            self.stdout.write(f'{path} is up to date ({current_hash[:12]}).')
@@ -0,0 +1,221 @@
+"""
+Django command to import recipes for a user from CSV or JSONL files.
+Rows are validated with the rules of the Recipe model and inserted in
+large batches, using COPY on PostgreSQL and bulk_create elsewhere. With
+--checkpoint, progress is saved in the transaction of each batch, so a
+resumed import neither skips nor repeats rows. Rejected rows are held
+until their batch commits, so rows read again on resume are not written
+to the rejects file twice.
+"""
+import csv
+import io
+import json
+import sys
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.management.rows import guess_format, read_rows
+from core.models import Recipe, RecipeImportCheckpoint
+from recipe.cache import bump_user_version
+
+IMPORT_FIELDS = ('title', 'description', 'time_minutes', 'price', 'link')
+COPY_COLUMNS = ('user_id',) + IMPORT_FIELDS + ('updated_at',)
+
+
+class Command(BaseCommand):
+    """Django command to bulk import recipes"""
+    help = 'Import recipes for a user from CSV or JSONL files or stdin.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'files',
+            nargs='*',
+            default=['-'],
+            help='Files to import, "-" reads stdin (default).',
+        )
+        parser.add_argument(
+            '--user',
+            required=True,
+            help='Email of the user who will own the recipes.',
+        )
+        parser.add_argument(
+            '--format',
+            choices=('csv', 'jsonl'),
+            help='Input format, guessed from the file extension if omitted.',
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--checkpoint',
+            help='Name the progress is recorded under, to resume an import.',
+        )
+        parser.add_argument(
+            '--rejects',
+            help='JSONL file the rejected rows are written to.',
+        )
+        parser.add_argument(
+            '--no-copy',
+            action='store_true',
+            help='Use bulk_create even on PostgreSQL.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        try:
+            self.user = get_user_model().objects.get(email=options['user'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f'User {options["user"]} does not exist.')
+
+        if options['batch_size'] < 1:
+            raise CommandError('The batch size must be at least 1.')
+        self.batch_size = options['batch_size']
+        self.use_copy = (
+            connection.vendor == 'postgresql' and not options['no_copy']
+        )
+        self.checkpoint_name = options['checkpoint']
+        self.checkpoint = self._load_checkpoint()
+        self.rejects = None
+        self.pending_rejects = []
+        if options['rejects']:
+            self.rejects = open(options['rejects'], 'a')
+
+        self.imported = self.rejected = 0
+        self.started = time.monotonic()
+        try:
+            for source in options['files']:
+                self._import_source(source, options['format'])
+        finally:
+            if self.rejects:
+                self.rejects.close()
+            bump_user_version(self.user.pk)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {self.imported} recipes, rejected {self.rejected} '
+            f'({self._rate():.0f} rows/s).'
+        ))
+
+    def _import_source(self, source, input_format):
+        input_format = input_format or guess_format(source)
+        done = self.checkpoint.get(source, 0)
+        if done:
+            self.stdout.write(f'Resuming {source} after {done} rows...')
+
+        stream = sys.stdin if source == '-' else open(source, newline='')
+        try:
+            rows = read_rows(stream, input_format)
+            batch = []
+            position = 0
+            for position, row in enumerate(rows, start=1):
+                if position <= done:
+                    continue
+                recipe = self._validate(source, position, row)
+                if recipe is not None:
+                    batch.append(recipe)
+                if position - done >= self.batch_size:
+                    self._flush(source, position, batch)
+                    batch, done = [], position
+            if position > done:
+                self._flush(source, position, batch)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+    def _validate(self, source, position, row):
+        if isinstance(row, Exception):
+            self._reject(source, position, None, {'row': [str(row)]})
+            return None
+        if not isinstance(row, dict):
+            self._reject(source, position, row, {'row': ['Not an object.']})
+            return None
+
+        recipe = Recipe(
+            user=self.user,
+            **{
+                field: row[field] for field in IMPORT_FIELDS
+                if row.get(field) not in (None, '')
+            }
+        )
+        try:
+            recipe.full_clean(exclude=['user'], validate_unique=False)
+        except ValidationError as error:
+            self._reject(source, position, row, error.message_dict)
+            return None
+
+        return recipe
+
+    def _reject(self, source, position, row, errors):
+        self.pending_rejects.append({
+            'source': source,
+            'row': position,
+            'data': row,
+            'errors': errors,
+        })
+
+    def _flush(self, source, position, batch):
+        with transaction.atomic():
+            if self.use_copy:
+                self._copy(batch)
+            else:
+                Recipe.objects.bulk_create(batch, batch_size=1000)
+            self._save_checkpoint(source, position)
+        self.imported += len(batch)
+
+        self.checkpoint[source] = position
+        self._write_rejects()
+        self.stdout.write(
+            f'{source}: {position} rows read, {self.imported} imported '
+            f'({self._rate():.0f} rows/s)'
+        )
+
+    def _write_rejects(self):
+        self.rejected += len(self.pending_rejects)
+        if self.rejects:
+            self.rejects.writelines(
+                json.dumps(reject) + '\n' for reject in self.pending_rejects
+            )
+            self.rejects.flush()
+        self.pending_rejects = []
+
+    def _copy(self, batch):
+        now = timezone.now().isoformat()
+        buffer = io.StringIO()
+        # quoted, so COPY reads empty strings as such instead of NULL
+        writer = csv.writer(buffer, quoting=csv.QUOTE_ALL)
+        for recipe in batch:
+            writer.writerow(
+                [recipe.user_id]
+                + [getattr(recipe, field) for field in IMPORT_FIELDS]
+                + [now]
+            )
+        buffer.seek(0)
+
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f'COPY {Recipe._meta.db_table} ({", ".join(COPY_COLUMNS)}) '
+                'FROM STDIN WITH (FORMAT csv)',
+                buffer,
+            )
+
+    def _load_checkpoint(self):
+        if not self.checkpoint_name:
+            return {}
+        return dict(RecipeImportCheckpoint.objects.filter(
+            name=self.checkpoint_name,
+        ).values_list('source', 'position'))
+
+    def _save_checkpoint(self, source, position):
+        if not self.checkpoint_name:
+            return
+        RecipeImportCheckpoint.objects.update_or_create(
+            name=self.checkpoint_name,
+            source=source,
+            defaults={'position': position},
+        )
+
+    def _rate(self):
+        elapsed = time.monotonic() - self.started
+        return self.imported / elapsed if elapsed else 0.0
@@ -0,0 +1,168 @@
+"""
+Django command profiling the cold start of a worker process.
+Each run starts a fresh interpreter with `-X importtime` and times the
+settings, the import, models and ready() of each INSTALLED_APPS entry,
+the URLconf, the WSGI handler and the first requests, see
+core.management.startup_probe. With --compare the default settings
+are measured against the API-only profile (DJANGO_API_ONLY=1).
+"""
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+PROBE = 'core.management.startup_probe'
+# "import time:  self [us] | cumulative | imported package"
+IMPORT_TIME = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)')
+
+
+class Command(BaseCommand):
+    """Django command to profile worker start up"""
+    help = 'Report where the cold start of a worker process goes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--runs',
+            type=int,
+            default=3,
+            help='Processes started per profile, the median is reported.',
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=15,
+            help='Slowest modules to list.',
+        )
+        parser.add_argument(
+            '--path',
+            help='Path of the first requests, the recipe list by default.',
+        )
+        profile = parser.add_mutually_exclusive_group()
+        profile.add_argument(
+            '--api-only',
+            action='store_true',
+            help='Profile the API-only settings (DJANGO_API_ONLY=1).',
+        )
+        profile.add_argument(
+            '--compare',
+            action='store_true',
+            help='Profile the default and the API-only settings.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        if options['runs'] < 1:
+            raise CommandError('At least 1 run is needed.')
+
+        path = options['path'] or reverse('recipe:recipe-list')
+        if options['compare']:
+            profiles = [('default', False), ('API-only', True)]
+        else:
+            profiles = [
+                ('API-only' if options['api_only'] else 'default',
+                 options['api_only']),
+            ]
+
+        cold_starts = {}
+        for name, api_only in profiles:
+            runs = [
+                self._run(path, api_only) for _ in range(options['runs'])
+            ]
+            cold_starts[name] = self._report(name, runs, options['top'])
+
+        if options['compare']:
+            before, after = cold_starts['default'], cold_starts['API-only']
+            self.stdout.write(self.style.SUCCESS(
+                f'Cold start: {before:.0f} ms default, {after:.0f} ms '
+                f'API-only ({(after - before) / before * 100:+.0f}%).'
+            ))
+
+    def _run(self, path, api_only):
+        env = dict(
+            os.environ,
+            DJANGO_SETTINGS_MODULE=os.environ.get(
+                'DJANGO_SETTINGS_MODULE', 'app.settings',
+            ),
+            DJANGO_API_ONLY='1' if api_only else '0',
+        )
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-m', PROBE, path],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        wall = (time.perf_counter() - started) * 1000
+        if result.returncode:
+            raise CommandError(
+                f'Start up probe failed:\n{result.stderr[-2000:]}'
+            )
+
+        run = json.loads(result.stdout.splitlines()[-1])
+        run['process'] = wall
+        run['modules'] = self._import_times(result.stderr)
+
+        return run
+
+    def _import_times(self, output):
+        """Return {module: (self ms, cumulative ms)} from -X importtime."""
+        modules = {}
+        for line in output.splitlines():
+            match = IMPORT_TIME.match(line)
+            if match:
+                own, cumulative, _, module = match.groups()
+                modules[module] = (int(own) / 1000, int(cumulative) / 1000)
+
+        return modules
+
+    def _report(self, name, runs, top):
+        median = statistics.median
+        process = median(run['process'] for run in runs)
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'{name} settings, median of {len(runs)} runs: '
+            f'{process:.0f} ms process, '
+            f'{median(run["total"] for run in runs):.0f} ms after the '
+            f'interpreter started'
+        ))
+        for phase in runs[0]['phases']:
+            status = f' ({runs[0]["status"]})' if 'request' in phase else ''
+            self.stdout.write(
+                f'  {phase:<16}'
+                f'{median(run["phases"][phase] for run in runs):8.1f} ms'
+                f'{status}'
+            )
+
+        self.stdout.write('  INSTALLED_APPS        import   models    ready')
+        for app in runs[0]['apps']:
+            steps = [
+                median(run['apps'][app].get(step, 0) for run in runs)
+                for step in ('import', 'models', 'ready')
+            ]
+            self.stdout.write(
+                f'    {runs[0]["apps"][app]["entry"]:<28}'
+                + ''.join(f'{step:8.1f}' for step in steps)
+            )
+
+        self.stdout.write('  slowest modules, cumulative import ms (self)')
+        modules = {
+            module: (
+                median(run['modules'].get(module, (0, 0))[1] for run in runs),
+                median(run['modules'].get(module, (0, 0))[0] for run in runs),
+            )
+            for module in runs[0]['modules']
+        }
+        slowest = sorted(modules.items(), key=lambda item: -item[1][0])
+        for module, (cumulative, own) in slowest[:top]:
+            self.stdout.write(
+                f'    {module:<44}{cumulative:8.1f} ({own:.1f})'
+            )
+
+        return process
@@ -0,0 +1,212 @@
+"""
+Django command to create many users from CSV or JSONL files.
+Passwords are hashed in a pool of processes, one per core, and users
+are inserted in batches. Invalid rows and emails that are already taken
+are reported per row instead of failing the import.
+"""
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth import get_user_model, password_validation
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+
+from core.management.rows import guess_format, read_rows
+
+
+def _setup_worker():
+    """Make the settings and hashers available in a worker process."""
+    django.setup()
+
+
+class Command(BaseCommand):
+    """Django command to bulk create users"""
+    help = 'Create users from CSV or JSONL files or stdin.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'files',
+            nargs='*',
+            default=['-'],
+            help='Files to import, "-" reads stdin (default).',
+        )
+        parser.add_argument(
+            '--format',
+            choices=('csv', 'jsonl'),
+            help='Input format, guessed from the file extension if omitted.',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count(),
+            help='Processes hashing passwords, one per core by default.',
+        )
+        parser.add_argument(
+            '--rejects',
+            help='JSONL file the rejected rows are written to.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        if options['batch_size'] < 1:
+            raise CommandError('The batch size must be at least 1.')
+        # None when the core count is unknown, the pool then picks its own
+        if options['workers'] is not None and options['workers'] < 1:
+            raise CommandError('The number of workers must be at least 1.')
+        self.batch_size = options['batch_size']
+        self.rejects = None
+        if options['rejects']:
+            self.rejects = open(options['rejects'], 'a')
+
+        self.created = self.rejected = 0
+        self.started = time.monotonic()
+        self.workers = options['workers']
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_setup_worker,
+        )
+        try:
+            for source in options['files']:
+                self._import_source(source, options['format'])
+        finally:
+            self.pool.shutdown()
+            if self.rejects:
+                self.rejects.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {self.created} users, rejected {self.rejected} '
+            f'({self._rate():.0f} users/s).'
+        ))
+
+    def _import_source(self, source, input_format):
+        input_format = input_format or guess_format(source)
+        # emails seen in this source, so a repeated row is rejected even
+        # when its first occurrence is still waiting in the batch
+        self.seen = set()
+        stream = sys.stdin if source == '-' else open(source, newline='')
+        try:
+            batch = []
+            for position, row in enumerate(
+                read_rows(stream, input_format), start=1
+            ):
+                user = self._validate(source, position, row)
+                if user is not None:
+                    batch.append((position, row, user, row['password']))
+                if len(batch) >= self.batch_size:
+                    self._flush(source, batch)
+                    batch = []
+            if batch:
+                self._flush(source, batch)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+    def _validate(self, source, position, row):
+        if isinstance(row, Exception):
+            self._reject(source, position, None, {'row': [str(row)]})
+            return None
+        if not isinstance(row, dict):
+            self._reject(source, position, row, {'row': ['Not an object.']})
+            return None
+
+        User = get_user_model()
+        email = User.objects.normalize_email((row.get('email') or '').strip())
+        user = User(email=email, name=row.get('name') or '')
+        password = row.get('password')
+        errors = {}
+        try:
+            validate_email(email)
+        except ValidationError as error:
+            errors['email'] = error.messages
+        if not errors and email in self.seen:
+            errors['email'] = ['Email is listed more than once.']
+        if not password or not isinstance(password, str):
+            errors['password'] = ['This field cannot be blank.']
+        else:
+            try:
+                password_validation.validate_password(password, user)
+            except ValidationError as error:
+                errors['password'] = error.messages
+        # the name is optional, as for create_user
+        exclude = ['email', 'password'] + ([] if user.name else ['name'])
+        try:
+            user.clean_fields(exclude=exclude)
+        except ValidationError as error:
+            errors.update(error.message_dict)
+
+        if errors:
+            self._reject(source, position, row, errors)
+            return None
+
+        self.seen.add(email)
+        return user
+
+    def _reject(self, source, position, row, errors):
+        self.rejected += 1
+        if self.rejects:
+            if isinstance(row, dict):
+                row = {k: v for k, v in row.items() if k != 'password'}
+            self.rejects.write(json.dumps({
+                'source': source,
+                'row': position,
+                'data': row,
+                'errors': errors,
+            }) + '\n')
+
+    def _flush(self, source, batch):
+        passwords = [password for *_, password in batch]
+        chunksize = max(1, len(passwords) // (self.workers * 4))
+        hashes = self.pool.map(make_password, passwords, chunksize=chunksize)
+        for (_, _, user, _), password_hash in zip(batch, hashes):
+            user.password = password_hash
+
+        batch = self._skip_taken(source, batch)
+        try:
+            with transaction.atomic():
+                get_user_model().objects.bulk_create(
+                    [user for _, _, user, _ in batch]
+                )
+        except IntegrityError:
+            # an email was taken since the check, check again and retry
+            batch = self._skip_taken(source, batch)
+            with transaction.atomic():
+                get_user_model().objects.bulk_create(
+                    [user for _, _, user, _ in batch]
+                )
+        self.created += len(batch)
+
+        if self.rejects:
+            self.rejects.flush()
+        self.stdout.write(
+            f'{source}: {self.created} created, {self.rejected} rejected '
+            f'({self._rate():.0f} users/s)'
+        )
+
+    def _skip_taken(self, source, batch):
+        """Reject the rows whose email already belongs to a user."""
+        taken = set(get_user_model().objects.filter(
+            email__in=[user.email for _, _, user, _ in batch],
+        ).values_list('email', flat=True))
+        remaining = []
+        for item in batch:
+            position, row, user, _ = item
+            if user.email in taken:
+                self._reject(source, position, row, {
+                    'email': ['User with this email already exists.'],
+                })
+            else:
+                remaining.append(item)
+
+        return remaining
+
+    def _rate(self):
+        elapsed = time.monotonic() - self.started
+        return self.created / elapsed if elapsed else 0.0
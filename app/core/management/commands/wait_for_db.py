@@ -2,29 +2,77 @@
 Django command to wait for the database to be available.
 Useful for resolving any race conditions when running the Docker Compose
 services locally and database would load in slower than the Django app.
+
+Every configured database is probed in parallel with a bare connect,
+retrying with exponential backoff and jitter until a deadline.
 """
+import random
 import time
 
-from psycopg2 import OperationalError as Psycopg2OpError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
 
-from django.db.utils import OperationalError
-from django.core.management.base import BaseCommand
+from core.health import probe_databases
 
 
 class Command(BaseCommand):
     """Django command to wait for database"""
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--databases',
+            nargs='+',
+            help='Aliases to wait for, all configured databases by default.',
+        )
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=60,
+            help='Seconds to wait before giving up.',
+        )
+        parser.add_argument(
+            '--max-delay',
+            type=float,
+            default=2,
+            help='Longest pause between two attempts, in seconds.',
+        )
+
     def handle(self, *args, **options):
         """Entrypoint for command."""
+        pending = options['databases'] or list(connections)
+        # a typo would otherwise be retried, as unreachable, until timeout
+        unknown = [
+            alias for alias in pending if alias not in connections.databases
+        ]
+        if unknown:
+            raise CommandError(
+                f'Unknown database alias: {", ".join(unknown)}.'
+            )
+
         self.stdout.write('Waiting for database...')
-        is_db_up = False
-
-        while is_db_up is False:
-            try:
-                self.check(databases=['default'])
-                is_db_up = True
-            except (Psycopg2OpError, OperationalError):
-                self.stdout.write('Database unavailable, waiting 1 second...')
-                time.sleep(1)
+        deadline = time.monotonic() + options['timeout']
+        delay = 0.05
+
+        while True:
+            remaining = deadline - time.monotonic()
+            errors = probe_databases(pending, max(remaining, 1))
+            pending = [alias for alias, error in errors.items() if error]
+            if not pending:
+                break
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise CommandError(
+                    f'Database unavailable after {options["timeout"]:g}s: '
+                    f'{", ".join(pending)}.'
+                )
+            # full jitter, so restarted containers do not retry in step
+            pause = min(random.uniform(0, delay), remaining)
+            self.stdout.write(
+                f'Database unavailable ({", ".join(pending)}), '
+                f'waiting {pause:.2f} seconds...'
+            )
+            time.sleep(pause)
+            delay = min(delay * 2, options['max_delay'])
 
         self.stdout.write(self.style.SUCCESS('Database available!'))
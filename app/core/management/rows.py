@@ -0,0 +1,36 @@
+"""
+Readers shared by the commands that import rows from CSV or JSONL files.
+"""
+import csv
+import json
+import os
+
+from django.core.management.base import CommandError
+
+
+def guess_format(source):
+    """Return 'csv' or 'jsonl' depending on the file extension."""
+    extension = os.path.splitext(source)[1].lower()
+    if extension in ('.jsonl', '.ndjson'):
+        return 'jsonl'
+    if extension == '.csv':
+        return 'csv'
+    raise CommandError(f'Can not guess the format of {source}.')
+
+
+def read_rows(stream, input_format):
+    """
+    Yield the rows of a CSV or JSONL stream as dicts. Lines that are
+    not valid JSON are yielded as the ValueError they raised.
+    """
+    if input_format == 'csv':
+        yield from csv.DictReader(stream)
+        return
+
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as error:
+            yield error
@@ -0,0 +1,129 @@
+"""
+Cold start of the app, run in a fresh interpreter by profile_startup.
+
+Times each step a WSGI worker takes before it answers: loading the
+settings, importing, setting up the models of and readying each app,
+resolving the URLconf, building the WSGI handler and answering the
+first requests. Prints the timings as JSON on stdout.
+"""
+import io
+import json
+import logging
+import os
+import sys
+import time
+
+started = time.perf_counter()
+QUIET_LOGGERS = ('core.request_timing', 'django.request')
+
+import django  # noqa: E402
+from django.apps import AppConfig  # noqa: E402
+
+
+def _elapsed_ms(since):
+    return (time.perf_counter() - since) * 1000
+
+
+def _instrument_apps(timings):
+    """Time the import, models and ready() of every app."""
+    create = AppConfig.create.__func__
+    import_models = AppConfig.import_models
+
+    def timed_create(cls, entry):
+        step = time.perf_counter()
+        app_config = create(cls, entry)
+        timings[app_config.name] = {
+            'entry': entry,
+            'import': _elapsed_ms(step),
+        }
+        ready = app_config.ready
+
+        def timed_ready():
+            step = time.perf_counter()
+            ready()
+            timings[app_config.name]['ready'] = _elapsed_ms(step)
+
+        app_config.ready = timed_ready
+        return app_config
+
+    def timed_import_models(self):
+        step = time.perf_counter()
+        import_models(self)
+        timings[self.name]['models'] = _elapsed_ms(step)
+
+    AppConfig.create = classmethod(timed_create)
+    AppConfig.import_models = timed_import_models
+
+
+def _request(application, path):
+    status = []
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'SCRIPT_NAME': '',
+        'PATH_INFO': path,
+        'QUERY_STRING': '',
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': 'localhost',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': False,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    step = time.perf_counter()
+    body = application(
+        environ, lambda code, headers: status.append(int(code.split()[0])),
+    )
+    for _ in body:
+        pass
+    body.close()
+
+    return _elapsed_ms(step), status[0]
+
+
+def main(path):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
+    phases = {}
+    apps = {}
+
+    step = time.perf_counter()
+    from django.conf import settings
+    settings.INSTALLED_APPS
+    phases['settings'] = _elapsed_ms(step)
+
+    _instrument_apps(apps)
+    step = time.perf_counter()
+    django.setup(set_prefix=False)
+    phases['apps'] = _elapsed_ms(step)
+
+    step = time.perf_counter()
+    from django.urls import get_resolver
+    get_resolver().url_patterns
+    phases['urlconf'] = _elapsed_ms(step)
+
+    step = time.perf_counter()
+    from django.core.handlers.wsgi import WSGIHandler
+    application = WSGIHandler()
+    phases['wsgi handler'] = _elapsed_ms(step)
+
+    # a line per request would only add to the time measured
+    for name in QUIET_LOGGERS:
+        logging.getLogger(name).disabled = True
+
+    phases['first request'], status = _request(application, path)
+    phases['second request'], _ = _request(application, path)
+
+    print(json.dumps({
+        'total': _elapsed_ms(started),
+        'phases': phases,
+        'apps': apps,
+        'status': status,
+    }))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1])
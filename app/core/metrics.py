@@ -0,0 +1,124 @@
+"""
+Prometheus metrics of the app.
+
+When PROMETHEUS_MULTIPROC_DIR is set, before the app is imported, every
+worker process writes its samples to memory-mapped files in that
+directory and `/metrics` sums them up, so it reports the whole server
+whichever worker answers the scrape. The directory must be emptied
+before the server starts, and with gunicorn `child_exit` should call
+`prometheus_client.multiprocess.mark_process_dead(worker.pid)`.
+
+`/metrics` only answers scrapers sending the METRICS_TOKEN bearer token
+or connecting from METRICS_ALLOWED_IPS, other clients get a 403.
+"""
+import hmac
+import ipaddress
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+UNRESOLVED_VIEW = '<unresolved>'
+
+REQUESTS = Counter(
+    'django_http_requests_total',
+    'HTTP requests by view, method and status code.',
+    ['view', 'method', 'status'],
+)
+REQUEST_LATENCY = Histogram(
+    'django_http_request_duration_seconds',
+    'Time spent answering HTTP requests.',
+    ['view', 'method'],
+)
+REQUEST_QUERIES = Histogram(
+    'django_http_request_db_queries',
+    'SQL queries run per HTTP request.',
+    ['view', 'method'],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, float('inf')),
+)
+REQUEST_DB_LATENCY = Histogram(
+    'django_http_request_db_duration_seconds',
+    'Time spent in SQL queries per HTTP request.',
+    ['view', 'method'],
+)
+CACHE_REQUESTS = Counter(
+    'django_cache_requests_total',
+    'Lookups of the app caches by cache and result (hit or miss).',
+    ['cache', 'result'],
+)
+
+# Label children are looked up under the metric's lock, so the hot path
+# keeps its own map of them and only pays for that on first use.
+_children = {}
+
+
+def _child(metric, *labels):
+    key = (metric, labels)
+    child = _children.get(key)
+    if child is None:
+        child = _children.setdefault(key, metric.labels(*labels))
+
+    return child
+
+
+def observe_request(view, method, status, duration, queries, db_duration):
+    """Record one answered HTTP request."""
+    _child(REQUESTS, view, method, str(status)).inc()
+    _child(REQUEST_LATENCY, view, method).observe(duration)
+    _child(REQUEST_QUERIES, view, method).observe(queries)
+    _child(REQUEST_DB_LATENCY, view, method).observe(db_duration)
+
+
+def record_cache_lookup(cache_name, hit):
+    """Record a hit or a miss of one of the app caches."""
+    _child(CACHE_REQUESTS, cache_name, 'hit' if hit else 'miss').inc()
+
+
+def _remote_addr_allowed(request):
+    try:
+        address = ipaddress.ip_address(request.META.get('REMOTE_ADDR', ''))
+    except ValueError:
+        return False
+
+    return any(
+        address in ipaddress.ip_network(network, strict=False)
+        for network in settings.METRICS_ALLOWED_IPS
+    )
+
+
+def _token_allowed(request):
+    if not settings.METRICS_TOKEN:
+        return False
+    scheme, _, token = request.META.get(
+        'HTTP_AUTHORIZATION', '',
+    ).partition(' ')
+
+    return scheme.lower() == 'bearer' and hmac.compare_digest(
+        token.strip().encode(), settings.METRICS_TOKEN.encode(),
+    )
+
+
+def metrics_view(request):
+    """Expose the metrics in the Prometheus text format."""
+    if not (_token_allowed(request) or _remote_addr_allowed(request)):
+        return HttpResponseForbidden()
+
+    registry = REGISTRY
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+
+    return HttpResponse(
+        generate_latest(registry),
+        content_type=CONTENT_TYPE_LATEST,
+    )
@@ -0,0 +1,244 @@
+"""
+Middleware for the app.
+"""
+import asyncio
+import heapq
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from core import metrics
+
+logger = logging.getLogger('core.request_timing')
+
+
+class QueryTimer:
+    """
+    Count the queries of a request, their total duration and the
+    slowest of them.
+    """
+
+    def __init__(self, keep):
+        self.keep = keep
+        self.count = 0
+        self.duration = 0.0
+        self.slowest = []
+
+    def record(self, duration, sql):
+        self.count += 1
+        self.duration += duration
+        if not self.keep:
+            return
+
+        # a min-heap of the `keep` slowest, the count breaks ties
+        entry = (duration, self.count, sql)
+        if len(self.slowest) < self.keep:
+            heapq.heappush(self.slowest, entry)
+        else:
+            heapq.heappushpop(self.slowest, entry)
+
+    def slowest_queries(self):
+        return [
+            (duration, sql)
+            for duration, _, sql in sorted(self.slowest, reverse=True)
+        ]
+
+
+# Timers of the current request. A context variable rather than a
+# per-connection wrapper, so queries that async views run in a thread
+# pool are still counted: the context is copied into the worker thread.
+_active_timers = ContextVar('active_query_timers', default=())
+
+
+def execute_wrapper(execute, sql, params, many, context):
+    """Database execute wrapper feeding the active query timers."""
+    timers = _active_timers.get()
+    if not timers:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - started
+        for timer in timers:
+            timer.record(duration, sql)
+
+
+def install_execute_wrapper(sender, connection, **kwargs):
+    """Add the execute wrapper to each new database connection."""
+    if execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(execute_wrapper)
+
+
+@contextmanager
+def track_queries(timer):
+    """Feed the queries run in this context to the timer."""
+    token = _active_timers.set(_active_timers.get() + (timer,))
+    try:
+        yield
+    finally:
+        _active_timers.reset(token)
+
+
+class QueryTrackingMiddleware:
+    """
+    Base of middleware that time each request and its SQL queries.
+    Works in both sync and async mode, so async views are not pushed
+    through a thread under ASGI.
+
+    Subclasses name the setting that enables them and implement
+    `finish`, which gets the response, the duration and the timer.
+    """
+    sync_capable = True
+    async_capable = True
+    enabled_setting = None
+    keep_queries = 0
+
+    def __init__(self, get_response):
+        if not getattr(settings, self.enabled_setting):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            # marks the instance as a coroutine function for the handler,
+            # as Django's MiddlewareMixin does
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        started = time.perf_counter()
+        timer = QueryTimer(self.keep_queries)
+        self.start(request)
+        with track_queries(timer):
+            response = self.get_response(request)
+
+        return self.finish(request, response, started, timer)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        timer = QueryTimer(self.keep_queries)
+        self.start(request)
+        with track_queries(timer):
+            response = await self.get_response(request)
+
+        return self.finish(request, response, started, timer)
+
+    def start(self, request):
+        pass
+
+    def finish(self, request, response, started, timer):
+        raise NotImplementedError
+
+
+class RequestTimingMiddleware(QueryTrackingMiddleware):
+    """
+    Measure the SQL queries, database time, view time (serialization
+    included), render time and total time of each request. The numbers
+    are sent back in the `Server-Timing` header and logged on one line,
+    together with the slowest queries when the request took longer
+    than the threshold.
+
+    Set REQUEST_TIMING_ENABLED to False to remove the middleware from
+    the stack altogether.
+    """
+    enabled_setting = 'REQUEST_TIMING_ENABLED'
+
+    @property
+    def keep_queries(self):
+        return settings.REQUEST_TIMING_SLOW_QUERIES
+
+    def start(self, request):
+        request._timing = {}
+
+    def finish(self, request, response, started, timer):
+        finished = time.perf_counter()
+        timing = request._timing
+        # responses that are not rendered are complete when the view returns
+        view_end = timing.get('view_end', finished)
+        render_start = timing.get('render_start', 0)
+        durations = {
+            'db': timer.duration,
+            'view': view_end - started,
+            'render': timing.get('render_end', render_start) - render_start,
+            'total': finished - started,
+        }
+        response['Server-Timing'] = ', '.join(
+            f'{name};dur={duration * 1000:.2f}'
+            + (f';desc="{timer.count} queries"' if name == 'db' else '')
+            for name, duration in durations.items()
+        )
+        self._log(request, response, timer, durations)
+
+        return response
+
+    def process_template_response(self, request, response):
+        # first in MIDDLEWARE, so this hook runs right before rendering
+        timing = request._timing
+        timing['view_end'] = timing['render_start'] = time.perf_counter()
+
+        def rendered(response):
+            timing['render_end'] = time.perf_counter()
+
+        response.add_post_render_callback(rendered)
+
+        return response
+
+    def _log(self, request, response, timer, durations):
+        fields = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': timer.count,
+        }
+        fields.update({
+            f'{name}_ms': round(duration * 1000, 2)
+            for name, duration in durations.items()
+        })
+        logger.info(
+            ' '.join(f'{key}={value}' for key, value in fields.items()),
+            extra={'timing': fields},
+        )
+
+        if durations['total'] * 1000 >= settings.REQUEST_TIMING_SLOW_MS:
+            logger.warning(
+                'Slow request %s %s took %.2f ms, slowest queries:\n%s',
+                request.method,
+                request.path,
+                durations['total'] * 1000,
+                '\n'.join(
+                    f'  {duration * 1000:.2f} ms: {sql}'
+                    for duration, sql in timer.slowest_queries()
+                ),
+            )
+
+
+class PrometheusMiddleware(QueryTrackingMiddleware):
+    """
+    Record the count, latency and SQL queries of every request in the
+    Prometheus metrics, labelled by the URL name of the view, so each
+    route has its own series however many ids appear in its paths.
+
+    Set METRICS_ENABLED to False to remove the middleware from the stack.
+    """
+    enabled_setting = 'METRICS_ENABLED'
+    methods = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+
+    def finish(self, request, response, started, timer):
+        match = request.resolver_match
+        metrics.observe_request(
+            match.view_name if match else metrics.UNRESOLVED_VIEW,
+            request.method if request.method in self.methods else 'other',
+            response.status_code,
+            time.perf_counter() - started,
+            timer.count,
+            timer.duration,
+        )
+
+        return response
@@ -0,0 +1,131 @@
+# Generated by Django 3.2.25 on 2026-10-18 20:09
+
+from decimal import Decimal
+from django.db import migrations, models
+import django.db.models.deletion
+
+# {rows} is a relation of (user_id, price, time_minutes) recipe rows
+AGGREGATE_SQL = """
+    SELECT user_id,
+           count(*) AS recipe_count,
+           sum(price) AS price_sum,
+           min(price) AS price_min,
+           max(price) AS price_max,
+           sum(time_minutes) AS time_minutes_sum
+    FROM {rows} AS rows
+    GROUP BY user_id
+"""
+
+ADD_SQL = f"""
+    INSERT INTO core_recipestats AS stats (
+        user_id, recipe_count, price_sum, price_min, price_max,
+        time_minutes_sum
+    )
+    {AGGREGATE_SQL}
+    ON CONFLICT (user_id) DO UPDATE SET
+        recipe_count = stats.recipe_count + EXCLUDED.recipe_count,
+        price_sum = stats.price_sum + EXCLUDED.price_sum,
+        price_min = LEAST(stats.price_min, EXCLUDED.price_min),
+        price_max = GREATEST(stats.price_max, EXCLUDED.price_max),
+        time_minutes_sum = stats.time_minutes_sum + EXCLUDED.time_minutes_sum;
+"""
+
+# a removed minimum or maximum is looked up again, on the (user, price)
+# index, once the statement has changed core_recipe
+REMOVE_SQL = f"""
+    UPDATE core_recipestats AS stats SET
+        recipe_count = stats.recipe_count - removed.recipe_count,
+        price_sum = stats.price_sum - removed.price_sum,
+        price_min = CASE WHEN removed.price_min > stats.price_min
+            THEN stats.price_min
+            ELSE (SELECT min(price) FROM core_recipe
+                  WHERE user_id = stats.user_id) END,
+        price_max = CASE WHEN removed.price_max < stats.price_max
+            THEN stats.price_max
+            ELSE (SELECT max(price) FROM core_recipe
+                  WHERE user_id = stats.user_id) END,
+        time_minutes_sum = stats.time_minutes_sum - removed.time_minutes_sum
+    FROM ({AGGREGATE_SQL}) AS removed
+    WHERE stats.user_id = removed.user_id;
+"""
+
+# only rows whose owner, price or time changed move the stats
+CHANGED_SQL = """
+    (SELECT {side}.user_id, {side}.price, {side}.time_minutes
+     FROM old_rows JOIN new_rows USING (id)
+     WHERE (old_rows.user_id, old_rows.price, old_rows.time_minutes)
+        IS DISTINCT FROM
+        (new_rows.user_id, new_rows.price, new_rows.time_minutes))
+"""
+
+CREATE_TRIGGERS_SQL = f"""
+CREATE FUNCTION core_recipestats_insert() RETURNS trigger AS $$
+BEGIN
+    {ADD_SQL.format(rows='new_rows')}
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION core_recipestats_update() RETURNS trigger AS $$
+BEGIN
+    {REMOVE_SQL.format(rows=CHANGED_SQL.format(side='old_rows'))}
+    {ADD_SQL.format(rows=CHANGED_SQL.format(side='new_rows'))}
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION core_recipestats_delete() RETURNS trigger AS $$
+BEGIN
+    {REMOVE_SQL.format(rows='old_rows')}
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER core_recipestats_insert_trigger
+    AFTER INSERT ON core_recipe
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION core_recipestats_insert();
+
+CREATE TRIGGER core_recipestats_update_trigger
+    AFTER UPDATE ON core_recipe
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION core_recipestats_update();
+
+CREATE TRIGGER core_recipestats_delete_trigger
+    AFTER DELETE ON core_recipe
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION core_recipestats_delete();
+
+{ADD_SQL.format(rows='core_recipe')}
+"""
+
+DROP_TRIGGERS_SQL = """
+DROP TRIGGER core_recipestats_insert_trigger ON core_recipe;
+DROP TRIGGER core_recipestats_update_trigger ON core_recipe;
+DROP TRIGGER core_recipestats_delete_trigger ON core_recipe;
+DROP FUNCTION core_recipestats_insert();
+DROP FUNCTION core_recipestats_update();
+DROP FUNCTION core_recipestats_delete();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_recipe_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='recipe_stats', serialize=False, to='core.user')),
+                ('recipe_count', models.PositiveIntegerField(default=0)),
+                ('price_sum', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('price_min', models.DecimalField(decimal_places=2, max_digits=5, null=True)),
+                ('price_max', models.DecimalField(decimal_places=2, max_digits=5, null=True)),
+                ('time_minutes_sum', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunSQL(CREATE_TRIGGERS_SQL, DROP_TRIGGERS_SQL),
+    ]
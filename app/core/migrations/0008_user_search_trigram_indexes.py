@@ -0,0 +1,47 @@
+from django.db import migrations
+
+COLUMNS = ('email', 'name')
+
+# icontains compiles to UPPER(column::text) LIKE UPPER('%term%'), so the
+# indexes are on that expression to serve the admin's user search
+CREATE_INDEX_SQL = """
+CREATE INDEX CONCURRENTLY IF NOT EXISTS core_user_{column}_trgm_idx
+    ON core_user USING gin (UPPER({column}::text) gin_trgm_ops);
+"""
+
+DROP_INDEX_SQL = """
+DROP INDEX CONCURRENTLY IF EXISTS core_user_{column}_trgm_idx;
+"""
+
+
+def create_indexes(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'"
+        )
+        if cursor.fetchone() is None:
+            # the indexes only speed the search up, servers built without
+            # the contrib extensions search with a scan
+            return
+
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for column in COLUMNS:
+        schema_editor.execute(CREATE_INDEX_SQL.format(column=column))
+
+
+def drop_indexes(apps, schema_editor):
+    for column in COLUMNS:
+        schema_editor.execute(DROP_INDEX_SQL.format(column=column))
+
+
+class Migration(migrations.Migration):
+    # built concurrently, so the users table stays writable meanwhile
+    atomic = False
+
+    dependencies = [
+        ('core', '0007_recipestats'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 3.2.25 on 2026-10-18 20:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_user_search_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeImportCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('source', models.TextField()),
+                ('position', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='recipeimportcheckpoint',
+            constraint=models.UniqueConstraint(fields=('name', 'source'), name='core_recipeimportcheckpoint_name_source_uniq'),
+        ),
+    ]
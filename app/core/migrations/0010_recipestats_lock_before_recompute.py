@@ -0,0 +1,53 @@
+import importlib
+
+from django.db import migrations
+
+recipestats = importlib.import_module('core.migrations.0007_recipestats')
+
+# A removed minimum or maximum is recomputed from core_recipe. Under READ
+# COMMITTED the recompute would wait on the stats row held by a
+# concurrent insert, then run with the snapshot taken before that insert
+# committed, missing its row. The stats rows are now locked first, in a
+# statement of their own, so the recompute takes a snapshot that sees
+# it. They are locked in user order, two removals can not deadlock
+LOCKING_REMOVE_SQL = """
+    PERFORM 1 FROM core_recipestats
+    WHERE user_id IN (SELECT user_id FROM {rows} AS rows)
+    ORDER BY user_id
+    FOR UPDATE;
+""" + recipestats.REMOVE_SQL
+
+
+def replace_functions_sql(remove_sql):
+    old_rows = recipestats.CHANGED_SQL.format(side='old_rows')
+    new_rows = recipestats.CHANGED_SQL.format(side='new_rows')
+    return f"""
+CREATE OR REPLACE FUNCTION core_recipestats_update() RETURNS trigger AS $$
+BEGIN
+    {remove_sql.format(rows=old_rows)}
+    {recipestats.ADD_SQL.format(rows=new_rows)}
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION core_recipestats_delete() RETURNS trigger AS $$
+BEGIN
+    {remove_sql.format(rows='old_rows')}
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_recipeimportcheckpoint'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            replace_functions_sql(LOCKING_REMOVE_SQL),
+            replace_functions_sql(recipestats.REMOVE_SQL),
+        ),
+    ]
@@ -1,2 +1,2 @@
 from .user_models import UserManager, User
-from .recipe_models import Recipe
+from .recipe_models import Recipe, RecipeImportCheckpoint, RecipeStats
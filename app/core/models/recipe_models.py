@@ -2,6 +2,8 @@
 Database model for Recipe object.
 """
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.core.validators import MinValueValidator
 from decimal import Decimal
@@ -21,6 +23,102 @@ class Recipe(models.Model):
         validators=[MinValueValidator(Decimal('0.00'))]
     )
     link = models.CharField(max_length=255, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # maintained by a database trigger from title and description
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # backs the keyset pagination of the recipe list endpoint
+            models.Index(
+                fields=['user', '-id'],
+                name='core_recipe_user_id_desc_idx',
+            ),
+            # backs the MAX(updated_at) check of conditional requests
+            models.Index(
+                fields=['user', 'updated_at'],
+                name='core_recipe_user_updated_idx',
+            ),
+            # back the range filters and orderings of the recipe list,
+            # the id keeps tied rows in cursor order without a sort
+            models.Index(
+                fields=['user', 'time_minutes', 'id'],
+                name='core_recipe_user_time_idx',
+            ),
+            models.Index(
+                fields=['user', 'price', 'id'],
+                name='core_recipe_user_price_idx',
+            ),
+            # pattern ops, so title prefix lookups can use it in any locale
+            models.Index(
+                fields=['user', 'title'],
+                name='core_recipe_user_title_idx',
+                opclasses=['int8_ops', 'varchar_pattern_ops'],
+            ),
+            GinIndex(
+                fields=['search_vector'],
+                name='core_recipe_search_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.title
+
+
+class RecipeStats(models.Model):
+    """
+    Summary of the recipes of a user, kept up to date by statement level
+    triggers on core_recipe, so bulk inserts, updates and deletes are
+    counted too. `repair_recipe_stats` recomputes it from scratch.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='recipe_stats',
+    )
+    recipe_count = models.PositiveIntegerField(default=0)
+    price_sum = models.DecimalField(
+        max_digits=14, decimal_places=2, default=Decimal('0.00'),
+    )
+    price_min = models.DecimalField(max_digits=5, decimal_places=2, null=True)
+    price_max = models.DecimalField(max_digits=5, decimal_places=2, null=True)
+    time_minutes_sum = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f'Recipe stats of {self.user_id}'
+
+    @property
+    def average_price(self):
+        if not self.recipe_count:
+            return None
+        return self.price_sum / self.recipe_count
+
+    @property
+    def average_time_minutes(self):
+        if not self.recipe_count:
+            return None
+        return self.time_minutes_sum / self.recipe_count
+
+
+class RecipeImportCheckpoint(models.Model):
+    """
+    Rows of a source already imported by `import_recipes` under a
+    checkpoint name. Written in the transaction of each batch, so it
+    never disagrees with the recipes that were committed.
+    """
+    name = models.CharField(max_length=255)
+    source = models.TextField()
+    position = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['name', 'source'],
+                name='core_recipeimportcheckpoint_name_source_uniq',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.name}: {self.source} at row {self.position}'
@@ -0,0 +1,35 @@
+"""
+Fast JSON and MessagePack parsers for the API, the counterparts of
+core.renderers.
+"""
+import msgpack
+import orjson
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class ORJSONParser(BaseParser):
+    """
+    Parse JSON with orjson. Numbers become floats as with DRF's
+    JSONParser, DecimalField reads them back through their shortest
+    repr, so prices sent as numbers keep their exact value.
+    """
+    media_type = 'application/json'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
+
+
+class MessagePackParser(BaseParser):
+    """Parse MessagePack, map keys must be strings or bytes."""
+    media_type = 'application/msgpack'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except (ValueError, msgpack.UnpackException) as exc:
+            raise ParseError(f'MessagePack parse error - {exc}')
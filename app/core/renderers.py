@@ -0,0 +1,94 @@
+"""
+Fast JSON and MessagePack renderers for the API.
+
+Both write the same primitives as DRF's JSONRenderer. Values they can
+not encode natively go through DRF's JSONEncoder, so datetimes, lazy
+translations and querysets come out as before, except Decimals, which
+are written as strings so prices keep their exact value.
+"""
+import decimal
+
+import msgpack
+import orjson
+
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+_encoder = JSONEncoder()
+
+LINE_SEPARATOR_LEAD = b'\xe2'
+LINE_SEPARATORS = (
+    ('\u2028'.encode(), b'\\u2028'),
+    ('\u2029'.encode(), b'\\u2029'),
+)
+
+
+def _default(obj):
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+
+    return _encoder.default(obj)
+
+
+class ORJSONRenderer(BaseRenderer):
+    """
+    Render JSON with orjson. Output is compact UTF-8, an `indent`
+    parameter in the accepted media type indents it by two spaces.
+    """
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+    # datetimes are formatted by DRF's encoder, which writes UTC as 'Z'
+    options = orjson.OPT_PASSTHROUGH_DATETIME
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        options = self.options
+        if self._wants_indent(accepted_media_type, renderer_context or {}):
+            options |= orjson.OPT_INDENT_2
+
+        try:
+            body = orjson.dumps(data, default=_default, option=options)
+        except TypeError:
+            # int keys, as in ListField and DictField errors, are written
+            # as strings, the option slows every other body down
+            body = orjson.dumps(
+                data, default=_default,
+                option=options | orjson.OPT_NON_STR_KEYS,
+            )
+        # escaped as DRF does, they end lines in JavaScript. Both start
+        # with a byte a single memchr rules out for most bodies
+        if LINE_SEPARATOR_LEAD in body:
+            for separator, escaped in LINE_SEPARATORS:
+                body = body.replace(separator, escaped)
+
+        return body
+
+    def _wants_indent(self, accepted_media_type, renderer_context):
+        if renderer_context.get('indent'):
+            return True
+        if accepted_media_type:
+            params = accepted_media_type.split(';')[1:]
+            return any(
+                param.strip().startswith('indent=') for param in params
+            )
+
+        return False
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Render MessagePack, strings as str and bytes as bin."""
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        return msgpack.packb(
+            data, default=_default, use_bin_type=True, datetime=False,
+        )
@@ -0,0 +1,218 @@
+"""
+OpenAPI schema served from a pre-built file.
+
+Generating the schema introspects every view and serializer, so it is
+done once, by the `build_schema` command, into OPENAPI_SCHEMA_FILE. The
+file starts with a hash of the sources the schema is derived from: the
+root URLconf, the modules of the project apps (except their tests,
+migrations and commands), the DRF settings that shape the schema, the
+drf-spectacular settings and their versions. The view
+serves the file from memory, gzipped for clients that accept it and
+with an ETag. When the hash no longer matches the sources, the schema
+is generated again on the first request and the file is rewritten.
+"""
+import gzip
+import hashlib
+import importlib.util
+import json
+import re
+import threading
+from contextlib import nullcontext
+from importlib.metadata import version
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.views.decorators.http import require_safe
+
+# directories of the project apps that never change the schema
+SKIPPED_DIRS = {'tests', 'migrations', 'management', '__pycache__'}
+HASH_PREFIX = '# source-hash: '
+# also used by API-only processes, which configure DRF's lighter one
+SCHEMA_CLASS = 'drf_spectacular.openapi.AutoSchema'
+# DRF settings the schema is derived from, others such as NUM_PROXIES
+# are runtime and env-driven and must not make a pre-built schema stale
+SCHEMA_SETTINGS = (
+    'DEFAULT_SCHEMA_CLASS',
+    'DEFAULT_RENDERER_CLASSES',
+    'DEFAULT_PARSER_CLASSES',
+    'DEFAULT_AUTHENTICATION_CLASSES',
+    'DEFAULT_PERMISSION_CLASSES',
+    'DEFAULT_PAGINATION_CLASS',
+    'DEFAULT_FILTER_BACKENDS',
+    'DEFAULT_VERSIONING_CLASS',
+    'DEFAULT_VERSION',
+    'ALLOWED_VERSIONS',
+    'VERSION_PARAM',
+    'PAGE_SIZE',
+    'COERCE_DECIMAL_TO_STRING',
+    'SCHEMA_COERCE_PATH_PK',
+    'SCHEMA_COERCE_METHOD_NAMES',
+)
+MEDIA_TYPES = {
+    'yaml': 'application/vnd.oai.openapi',
+    'json': 'application/vnd.oai.openapi+json',
+}
+_accepts_gzip = re.compile(r'\bgzip\b')
+
+_lock = threading.Lock()
+# format -> (body, gzipped body, etag)
+_bodies = {}
+
+
+def _source_files():
+    urlconf = importlib.util.find_spec(settings.ROOT_URLCONF)
+    yield settings.ROOT_URLCONF, Path(urlconf.origin)
+    for app_config in apps.get_app_configs():
+        root = Path(app_config.path)
+        if not root.is_relative_to(settings.BASE_DIR):
+            continue
+        # every module, models and their packages included: max_length,
+        # max_digits or a new field show up through ModelSerializers
+        for path in sorted(root.rglob('*.py')):
+            relative = path.relative_to(root)
+            if not SKIPPED_DIRS.intersection(relative.parts[:-1]):
+                yield f'{app_config.name}/{relative.as_posix()}', path
+
+
+def source_hash():
+    """Return the hash of what the schema is generated from."""
+    digest = hashlib.sha256()
+    for name, path in _source_files():
+        digest.update(name.encode())
+        digest.update(path.read_bytes())
+    digest.update(repr((
+        version('djangorestframework'),
+        version('drf-spectacular'),
+        sorted(
+            (key, value) for key, value in _rest_framework_settings().items()
+            if key in SCHEMA_SETTINGS
+        ),
+        getattr(settings, 'SPECTACULAR_SETTINGS', {}),
+    )).encode())
+
+    return digest.hexdigest()
+
+
+def _rest_framework_settings():
+    return dict(
+        getattr(settings, 'REST_FRAMEWORK', {}),
+        DEFAULT_SCHEMA_CLASS=SCHEMA_CLASS,
+    )
+
+
+def generate_schema(current_hash):
+    """Generate the schema as YAML, starting with the source hash."""
+    # only imported when the schema has to be generated
+    from django.test.utils import override_settings
+    from drf_spectacular.renderers import OpenApiYamlRenderer
+    from drf_spectacular.settings import spectacular_settings
+
+    rest_framework = _rest_framework_settings()
+    if rest_framework != getattr(settings, 'REST_FRAMEWORK', {}):
+        overridden = override_settings(REST_FRAMEWORK=rest_framework)
+    else:
+        overridden = nullcontext()
+    with overridden:
+        generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+        schema = generator.get_schema(request=None, public=True)
+    content = OpenApiYamlRenderer().render(schema, renderer_context={})
+
+    return f'{HASH_PREFIX}{current_hash}\n'.encode() + content
+
+
+def read_schema(path):
+    """Return the content of the schema file and its hash, if any."""
+    try:
+        content = Path(path).read_bytes()
+    except FileNotFoundError:
+        return None, None
+    first_line = content.split(b'\n', 1)[0].decode(errors='replace')
+    if not first_line.startswith(HASH_PREFIX):
+        return content, None
+
+    return content, first_line[len(HASH_PREFIX):]
+
+
+def build_schema(path, force=False):
+    """Write the schema file if it is stale, return (hash, written)."""
+    current_hash = source_hash()
+    content, file_hash = read_schema(path)
+    if not force and content is not None and file_hash == current_hash:
+        return current_hash, False
+
+    content = generate_schema(current_hash)
+    Path(path).write_bytes(content)
+
+    return current_hash, True
+
+
+def _load_schema():
+    path = settings.OPENAPI_SCHEMA_FILE
+    current_hash = source_hash()
+    content, file_hash = read_schema(path)
+    if file_hash != current_hash:
+        content = generate_schema(current_hash)
+        try:
+            Path(path).write_bytes(content)
+        except OSError:
+            # served from memory only, e.g. on a read-only file system
+            pass
+
+    return content
+
+
+def _body(schema_format):
+    body = _bodies.get(schema_format)
+    if body is not None:
+        return body
+
+    with _lock:
+        if 'yaml' not in _bodies:
+            _bodies['yaml'] = _encode(_load_schema())
+        if schema_format == 'json' and 'json' not in _bodies:
+            import yaml
+
+            data = yaml.safe_load(_bodies['yaml'][0])
+            _bodies['json'] = _encode(json.dumps(data).encode())
+
+        return _bodies[schema_format]
+
+
+def _encode(content):
+    digest = hashlib.sha256(content).hexdigest()[:32]
+    return content, gzip.compress(content, mtime=0), digest
+
+
+def clear_schema_cache():
+    """Forget the schema held in memory, it is loaded again when served."""
+    with _lock:
+        _bodies.clear()
+
+
+@require_safe
+def schema_view(request):
+    """Serve the OpenAPI schema, as YAML or with ?format=json as JSON."""
+    schema_format = request.GET.get('format', 'yaml')
+    if schema_format not in MEDIA_TYPES:
+        schema_format = 'yaml'
+    content, gzipped, digest = _body(schema_format)
+
+    use_gzip = bool(
+        _accepts_gzip.search(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    )
+    etag = f'"{digest}-gzip"' if use_gzip else f'"{digest}"'
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(
+            gzipped if use_gzip else content,
+            content_type=MEDIA_TYPES[schema_format],
+        )
+        if use_gzip:
+            response['Content-Encoding'] = 'gzip'
+    response['ETag'] = etag
+    patch_vary_headers(response, ('Accept-Encoding',))
+
+    return response
@@ -1,9 +1,43 @@
 """
 Tests for the Django admin modifiactions.
 """
+from decimal import Decimal
+
 import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
+from core.admin.paginator import EstimatedCountPaginator
+from core.models import Recipe
+
+
+def create_users(count, prefix='sample'):
+    """Create users with one recipe each."""
+    users = get_user_model().objects.bulk_create(
+        get_user_model()(email=f'{prefix}{i}@example.com', name=f'User {i}')
+        for i in range(count)
+    )
+    Recipe.objects.bulk_create(
+        Recipe(
+            user=user, title=f'Recipe of {user.email}',
+            time_minutes=5, price=Decimal('1.00'),
+        )
+        for user in users
+    )
+
+    return users
+
+
+def changelist_queries(client, url, **params):
+    """Return the SQL run to render a changelist page."""
+    with CaptureQueriesContext(connection) as queries:
+        res = client.get(url, params)
+    assert res.status_code == 200
+
+    return [query['sql'] for query in queries.captured_queries]
+
 
 @pytest.mark.django_db
 class TestUserAdmin:
@@ -40,3 +74,140 @@ class TestUserAdmin:
         res = self.client.get(url)
 
         assert res.status_code == 200
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        """Test that the user list runs the same queries for more users."""
+        url = reverse('admin:core_user_changelist')
+        create_users(2)
+        few = changelist_queries(self.client, url)
+
+        create_users(20, prefix='more')
+        many = changelist_queries(self.client, url)
+
+        assert len(many) == len(few)
+
+    def test_search_runs_no_full_count(self):
+        """Test that a search does not count the whole table."""
+        url = reverse('admin:core_user_changelist')
+
+        sql = changelist_queries(self.client, url, q='user@')
+
+        assert len([s for s in sql if 'COUNT(*)' in s]) == 1
+
+    def test_search_uses_trigram_index(self):
+        """Test that the email and name search can use an index."""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM pg_indexes "
+                "WHERE indexname = 'core_user_email_trgm_idx'"
+            )
+            if cursor.fetchone() is None:
+                pytest.skip('pg_trgm is not available.')
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+        queryset = get_user_model().objects.filter(email__icontains='user@')
+        plan = queryset.explain()
+
+        assert 'core_user_email_trgm_idx' in plan
+
+
+@pytest.mark.django_db
+class TestRecipeAdmin:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, client, test_user, test_user_2, admin_user):
+        self.test_user = test_user
+        self.test_user_2 = test_user_2
+        self.recipe = Recipe.objects.create(
+            user=test_user, title='Soup', time_minutes=5,
+            price=Decimal('1.00'),
+        )
+
+        client.force_login(admin_user)
+        self.client = client
+
+    def test_recipes_list(self):
+        """Test that recipes are listed with their user."""
+        url = reverse('admin:core_recipe_changelist')
+        res = self.client.get(url)
+
+        assert res.status_code == 200
+        assert self.recipe.title in str(res.content)
+        assert self.test_user.email in str(res.content)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        """Test that users are fetched with the recipes, not per row."""
+        url = reverse('admin:core_recipe_changelist')
+        create_users(2)
+        few = changelist_queries(self.client, url)
+
+        create_users(20, prefix='more')
+        many = changelist_queries(self.client, url)
+
+        assert len(many) == len(few)
+        assert not [s for s in many if 'search_vector' in s]
+
+    def test_changelist_counts_from_estimate(self, settings):
+        """Test that large changelists are not counted with COUNT(*)."""
+        settings.ADMIN_EXACT_COUNT_LIMIT = 0
+        url = reverse('admin:core_recipe_changelist')
+
+        sql = changelist_queries(self.client, url)
+
+        assert not [s for s in sql if 'COUNT(*)' in s]
+        assert [s for s in sql if s.startswith('EXPLAIN')]
+
+    def test_edit_recipe_page_does_not_list_users(self):
+        """Test that the user is picked with autocomplete."""
+        url = reverse('admin:core_recipe_change', args=[self.recipe.id])
+        res = self.client.get(url)
+
+        assert res.status_code == 200
+        assert 'admin-autocomplete' in str(res.content)
+        assert self.test_user_2.email not in str(res.content)
+
+    def test_user_autocomplete(self):
+        """Test that the autocomplete searches the users."""
+        res = self.client.get(reverse('admin:autocomplete'), {
+            'term': 'user2',
+            'app_label': 'core',
+            'model_name': 'recipe',
+            'field_name': 'user',
+        })
+
+        assert res.status_code == 200
+        assert [item['id'] for item in res.json()['results']] == [
+            str(self.test_user_2.id)
+        ]
+
+
+@pytest.mark.django_db
+class TestEstimatedCountPaginator:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, test_user):
+        create_users(3)
+
+    def test_exact_count_under_limit(self, settings):
+        """Test that small estimates are replaced by the exact count."""
+        settings.ADMIN_EXACT_COUNT_LIMIT = 10000
+        paginator = EstimatedCountPaginator(
+            Recipe.objects.order_by('id'), 100,
+        )
+
+        assert paginator.count == 3
+
+    def test_estimated_count_over_limit(self, settings):
+        """Test that the planner's estimate is used past the limit."""
+        settings.ADMIN_EXACT_COUNT_LIMIT = 0
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE core_recipe')
+        paginator = EstimatedCountPaginator(
+            Recipe.objects.order_by('id'), 100,
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            count = paginator.count
+
+        assert count == 3
+        assert queries.captured_queries[0]['sql'].startswith('EXPLAIN')
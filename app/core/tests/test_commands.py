@@ -1,33 +1,607 @@
 """
 Test custom Django management commands.
 """
-
+import io
+import json
+from decimal import Decimal
 from unittest.mock import patch
 
 from psycopg2 import OperationalError as Psycopg2Error
+import pytest
 
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connections
 from django.db.utils import OperationalError
 
+from core.management.commands.import_recipes import (
+    Command as ImportRecipesCommand,
+)
+from core.management.commands.provision_users import (
+    Command as ProvisionUsersCommand,
+)
+from core.models import Recipe, RecipeImportCheckpoint
+
+
+def probe_results(*rounds):
+    """Fake probe_databases answering with the given rounds of errors."""
+    rounds = list(rounds)
+
+    def probe(aliases, timeout):
+        errors = rounds.pop(0)
+        return {alias: errors.get(alias) for alias in aliases}
 
-@patch('core.management.commands.wait_for_db.Command.check')
+    return probe
+
+
+@patch('core.management.commands.wait_for_db.probe_databases')
 class TestWaitForDb:
 
-    def test_wait_for_db_ready(self, patched_check):
+    def test_wait_for_db_ready(self, patched_probe):
         """Test waiting for the database to be ready."""
-        patched_check.return_value = True
+        patched_probe.side_effect = probe_results({})
 
-        call_command('wait_for_db')
+        call_command('wait_for_db', stdout=io.StringIO())
 
-        assert patched_check.call_count == 1
+        assert patched_probe.call_count == 1
+        assert patched_probe.call_args[0][0] == ['default']
 
     @patch('time.sleep')
-    def test_wait_for_db_delay(self, patched_sleep, patched_check):
+    def test_wait_for_db_delay(self, patched_sleep, patched_probe):
         """Test waiting for the database when getting OperationalError."""
-        patched_check.side_effect = [Psycopg2Error] * 2 + \
-            [OperationalError] * 3 + [True]
+        patched_probe.side_effect = probe_results(
+            *[{'default': Psycopg2Error()}] * 2,
+            *[{'default': OperationalError()}] * 3,
+            {},
+        )
+
+        call_command('wait_for_db', max_delay=0.4, stdout=io.StringIO())
+
+        assert patched_probe.call_count == 6
+        pauses = [call[0][0] for call in patched_sleep.call_args_list]
+        assert len(pauses) == 5
+        assert all(0 <= pause <= 0.4 for pause in pauses)
+
+    @patch('time.sleep')
+    def test_only_unavailable_databases_are_retried(
+        self, patched_sleep, patched_probe,
+    ):
+        """Test a database that answered is not probed again."""
+        patched_probe.side_effect = probe_results(
+            {'replica_1': OperationalError()}, {},
+        )
+
+        with patch.dict(connections.databases, {
+            'replica_1': connections.databases['default'],
+        }):
+            call_command(
+                'wait_for_db', databases=['default', 'replica_1'],
+                stdout=io.StringIO(),
+            )
+
+        assert patched_probe.call_args_list[0][0][0] == [
+            'default', 'replica_1',
+        ]
+        assert patched_probe.call_args_list[1][0][0] == ['replica_1']
+
+    def test_unknown_alias_fails_at_once(self, patched_probe):
+        """Test an alias that is not configured is not waited for."""
+        with pytest.raises(CommandError, match='replcia_1'):
+            call_command(
+                'wait_for_db', databases=['default', 'replcia_1'],
+                stdout=io.StringIO(),
+            )
+
+        patched_probe.assert_not_called()
+
+    @patch('time.sleep')
+    def test_wait_for_db_timeout(self, patched_sleep, patched_probe):
+        """Test giving up once the deadline has passed."""
+        patched_probe.side_effect = probe_results({'default': Psycopg2Error()})
+
+        with pytest.raises(CommandError, match='default'):
+            call_command('wait_for_db', timeout=0, stdout=io.StringIO())
+
+        patched_sleep.assert_not_called()
+
+
+@pytest.mark.django_db
+class TestImportRecipes:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, test_user, tmp_path):
+        self.test_user = test_user
+        self.tmp_path = tmp_path
+
+    def write(self, name, content):
+        path = self.tmp_path / name
+        path.write_text(content)
+        return str(path)
+
+    def test_import_csv_with_copy(self):
+        """Test importing a CSV file creates the recipes."""
+        path = self.write('recipes.csv', (
+            'title,time_minutes,price,description,link\n'
+            'Soup,10,4.50,Hot soup,\n'
+            'Salad,5,3.00,,https://example.com\n'
+        ))
+
+        call_command('import_recipes', path, user=self.test_user.email)
+
+        recipes = Recipe.objects.filter(user=self.test_user).order_by('id')
+        assert [r.title for r in recipes] == ['Soup', 'Salad']
+        assert recipes[0].price == Decimal('4.50')
+        assert recipes[0].link == ''
+        assert recipes[1].description == ''
+
+    def test_import_jsonl_with_bulk_create(self):
+        """Test importing a JSONL file through bulk_create."""
+        path = self.write('recipes.jsonl', (
+            '{"title": "Soup", "time_minutes": 10, "price": "4.50"}\n'
+            '\n'
+            '{"title": "Salad", "time_minutes": 5, "price": 3}\n'
+        ))
+
+        call_command(
+            'import_recipes', path, user=self.test_user.email, no_copy=True,
+        )
+
+        assert Recipe.objects.filter(user=self.test_user).count() == 2
+
+    def test_import_from_stdin(self):
+        """Test importing rows piped through stdin."""
+        stdin = io.StringIO('{"title": "Soup", "time_minutes": 1, '
+                            '"price": "1.00"}\n')
+
+        with patch('sys.stdin', stdin):
+            call_command(
+                'import_recipes', user=self.test_user.email, format='jsonl',
+            )
+
+        assert Recipe.objects.filter(user=self.test_user).count() == 1
+
+    def test_invalid_rows_rejected(self):
+        """Test rows breaking the model rules go to the rejects file."""
+        path = self.write('recipes.jsonl', (
+            '{"title": "Good", "time_minutes": 10, "price": "4.50"}\n'
+            '{"title": "Cheap", "time_minutes": 10, "price": "-1.00"}\n'
+            '{"title": "Slow", "time_minutes": -5, "price": "1.00"}\n'
+            'not json\n'
+        ))
+        rejects = self.tmp_path / 'rejects.jsonl'
+
+        call_command(
+            'import_recipes', path,
+            user=self.test_user.email, rejects=str(rejects),
+        )
+
+        assert list(Recipe.objects.values_list('title', flat=True)) == [
+            'Good'
+        ]
+        rejected = [json.loads(line) for line in rejects.open()]
+        assert [row['row'] for row in rejected] == [2, 3, 4]
+        assert 'price' in rejected[0]['errors']
+        assert 'time_minutes' in rejected[1]['errors']
+
+    def test_resume_from_checkpoint(self):
+        """Test an import resumes after the rows already recorded."""
+        rows = ''.join(f'Recipe {i},10,1.00\n' for i in range(5))
+        path = self.write('recipes.csv', 'title,time_minutes,price\n' + rows)
+        RecipeImportCheckpoint.objects.create(
+            name='nightly', source=path, position=3,
+        )
+
+        call_command(
+            'import_recipes', path, user=self.test_user.email,
+            checkpoint='nightly', batch_size=1,
+        )
+
+        titles = Recipe.objects.order_by('id').values_list('title', flat=True)
+        assert list(titles) == ['Recipe 3', 'Recipe 4']
+        assert RecipeImportCheckpoint.objects.get(
+            name='nightly', source=path,
+        ).position == 5
+
+    def test_checkpoint_commits_with_batch(self):
+        """Test a batch is not kept when its checkpoint can not be saved."""
+        rows = ''.join(f'Recipe {i},10,1.00\n' for i in range(4))
+        path = self.write('recipes.csv', 'title,time_minutes,price\n' + rows)
+        save = ImportRecipesCommand._save_checkpoint
+
+        def crash_on_second_batch(command, source, position):
+            save(command, source, position)
+            if position > 2:
+                raise RuntimeError('crash')
+
+        with patch.object(
+            ImportRecipesCommand, '_save_checkpoint', crash_on_second_batch,
+        ):
+            with pytest.raises(RuntimeError):
+                call_command(
+                    'import_recipes', path, user=self.test_user.email,
+                    checkpoint='nightly', batch_size=2,
+                )
+        assert Recipe.objects.count() == 2
+
+        call_command(
+            'import_recipes', path, user=self.test_user.email,
+            checkpoint='nightly', batch_size=2,
+        )
+
+        titles = Recipe.objects.order_by('id').values_list('title', flat=True)
+        assert list(titles) == [f'Recipe {i}' for i in range(4)]
+
+    def test_rejects_are_written_with_their_batch(self):
+        """Test rejects of a failed batch are not written, nor twice."""
+        path = self.write('recipes.csv', 'title,time_minutes,price\n' + (
+            'Recipe 0,10,1.00\n'
+            'Recipe 1,-1,1.00\n'
+            'Recipe 2,10,1.00\n'
+            'Recipe 3,-1,1.00\n'
+        ))
+        rejects = self.tmp_path / 'rejects.jsonl'
+        options = {
+            'user': self.test_user.email, 'checkpoint': 'nightly',
+            'batch_size': 2, 'rejects': str(rejects),
+        }
+        save = ImportRecipesCommand._save_checkpoint
+
+        def crash_on_second_batch(command, source, position):
+            save(command, source, position)
+            if position > 2:
+                raise RuntimeError('crash')
+
+        with patch.object(
+            ImportRecipesCommand, '_save_checkpoint', crash_on_second_batch,
+        ):
+            with pytest.raises(RuntimeError):
+                call_command('import_recipes', path, **options)
+        rejected = [json.loads(line) for line in rejects.open()]
+        assert [row['row'] for row in rejected] == [2]
+
+        call_command('import_recipes', path, **options)
+
+        rejected = [json.loads(line) for line in rejects.open()]
+        assert [row['row'] for row in rejected] == [2, 4]
+
+    def test_failed_batch_keeps_checkpoint(self):
+        """Test a batch that fails to insert leaves the checkpoint as is."""
+        path = self.write(
+            'recipes.csv', 'title,time_minutes,price\nSoup,10,1.00\n',
+        )
+
+        with patch.object(
+            ImportRecipesCommand, '_copy', side_effect=RuntimeError,
+        ):
+            with pytest.raises(RuntimeError):
+                call_command(
+                    'import_recipes', path, user=self.test_user.email,
+                    checkpoint='nightly',
+                )
+
+        assert not RecipeImportCheckpoint.objects.exists()
+
+    def test_invalid_batch_size_fails(self):
+        """Test the command refuses a batch size below 1."""
+        path = self.write('recipes.csv', 'title,time_minutes,price\n')
+
+        with pytest.raises(CommandError):
+            call_command(
+                'import_recipes', path, user=self.test_user.email,
+                batch_size=0,
+            )
+
+    def test_batches_are_committed_separately(self):
+        """Test each batch is written and checkpointed on its own."""
+        rows = ''.join(f'Recipe {i},10,1.00\n' for i in range(5))
+        path = self.write('recipes.csv', 'title,time_minutes,price\n' + rows)
+        out = io.StringIO()
+
+        call_command(
+            'import_recipes', path, user=self.test_user.email,
+            batch_size=2, stdout=out,
+        )
+
+        assert Recipe.objects.count() == 5
+        assert out.getvalue().count('rows/s') == 4
+
+    def test_unknown_user_fails(self):
+        """Test the command refuses an unknown user."""
+        path = self.write('recipes.csv', 'title,time_minutes,price\n')
+
+        with pytest.raises(CommandError):
+            call_command('import_recipes', path, user='nobody@example.com')
+
+
+@pytest.mark.django_db
+class TestBenchmarkApi:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.output = tmp_path / 'results.json'
+
+    def benchmark(self, *scenarios, **options):
+        options.setdefault('requests', 3)
+        call_command(
+            'benchmark_api', recipes=20, users=2, warmup=0,
+            scenarios=list(scenarios), stdout=io.StringIO(), **options
+        )
+
+    def test_results_are_written(self):
+        """Test every scenario is measured and the seed rolled back."""
+        self.benchmark(
+            'recipe_list', 'recipe_detail', 'recipe_create', 'token',
+            output=str(self.output),
+        )
+
+        results = json.loads(self.output.read_text())
+        assert results['meta']['recipes'] == 20
+        assert set(results['scenarios']) == {
+            'recipe_list', 'recipe_detail', 'recipe_create', 'token',
+        }
+        assert results['scenarios']['recipe_create']['queries_max'] >= 1
+        assert 'p95_ms' in results['scenarios']['token']
+        assert not Recipe.objects.exists()
+
+    def test_default_cache_is_kept(self):
+        """Test the benchmark clears its own cache only."""
+        cache.set('kept', True)
+
+        self.benchmark('recipe_list', 'profile')
+
+        assert cache.get('kept') is True
+
+    def test_reads_from_primary(self, settings):
+        """Test the uncommitted seed is not read from a replica."""
+        settings.DATABASE_REPLICAS = ['replica_1']
+
+        self.benchmark('recipe_list', 'recipe_detail', 'profile')
+
+    def test_token_burst_is_rate_limited(self):
+        """Test a login burst is mostly rejected by the rate limiter."""
+        self.benchmark('token_burst', output=str(self.output), requests=10)
+
+        result = json.loads(self.output.read_text())['scenarios']
+        assert result['token_burst']['rejected'] >= 5
+
+    def test_regression_against_baseline_fails(self):
+        """Test a slower run than the baseline fails the command."""
+        baseline = self.output.with_name('baseline.json')
+        baseline.write_text(json.dumps({'scenarios': {'profile': {
+            'p95_ms': 0.0001,
+            'throughput_rps': 10 ** 9,
+            'queries_max': 0,
+        }}}))
+
+        with pytest.raises(CommandError, match='profile: p95'):
+            self.benchmark('profile', baseline=str(baseline))
+
+    def test_no_regression_against_itself(self):
+        """Test the comparison passes within the threshold."""
+        self.benchmark('profile', output=str(self.output))
+
+        self.benchmark(
+            'profile', baseline=str(self.output), threshold=1000,
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestBenchmarkAsgi:
+
+    def test_all_modes_are_measured(self):
+        """Test each mode serves every request and the seed is removed."""
+        out = io.StringIO()
+
+        call_command(
+            'benchmark_asgi', recipes=10, users=2, requests=4,
+            concurrency=2, endpoints=['list', 'profile'], stdout=out,
+        )
+
+        lines = out.getvalue().splitlines()
+        assert len(lines) == 6
+        assert all(line.endswith(' 0 errors') for line in lines)
+        assert not Recipe.objects.exists()
+
+
+@pytest.mark.django_db
+class TestBenchmarkDbConnections:
+
+    def test_all_modes_are_measured(self):
+        """Test a line is reported for every connection mode."""
+        out = io.StringIO()
+
+        call_command('benchmark_db_connections', requests=3, stdout=out)
+
+        lines = out.getvalue().splitlines()
+        assert [line.split()[0] for line in lines] == [
+            'connect', 'pool', 'persistent',
+        ]
+
+
+class TestBuildSchema:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.path = tmp_path / 'schema.yaml'
+
+    def test_schema_is_written(self):
+        """Test the schema file is generated, then left alone."""
+        out = io.StringIO()
+
+        call_command('build_schema', file=self.path, stdout=out)
+        content = self.path.read_bytes()
+        call_command('build_schema', file=self.path, stdout=out)
+
+        assert content.startswith(b'# source-hash: ')
+        assert self.path.read_bytes() == content
+        assert 'up to date' in out.getvalue().splitlines()[-1]
+
+    def test_check_fails_when_stale(self):
+        """Test --check fails for a missing or outdated schema."""
+        with pytest.raises(CommandError, match='out of date'):
+            call_command('build_schema', file=self.path, check=True)
+
+        call_command('build_schema', file=self.path, stdout=io.StringIO())
+        call_command(
+            'build_schema', file=self.path, check=True, stdout=io.StringIO(),
+        )
+
+
+class TestProfileStartup:
+
+    def test_profiles_are_compared(self):
+        """Test both profiles are measured in fresh processes."""
+        out = io.StringIO()
+
+        call_command(
+            'profile_startup', runs=1, top=3, compare=True, stdout=out,
+        )
+
+        output = out.getvalue()
+        default, api_only = output.split('API-only settings')
+        assert 'first request' in default
+        assert 'django.contrib.admin ' in default
+        assert 'django.contrib.admin ' not in api_only
+        assert 'drf_spectacular ' not in api_only
+        assert 'first request' in api_only and '(401)' in api_only
+        assert output.splitlines()[-1].startswith('Cold start: ')
+
+
+@pytest.mark.django_db
+class TestProvisionUsers:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.tmp_path = tmp_path
+        self.rejects = tmp_path / 'rejects.jsonl'
+
+    def write(self, name, content):
+        path = self.tmp_path / name
+        path.write_text(content)
+        return str(path)
+
+    def provision(self, path, **options):
+        out = io.StringIO()
+        call_command(
+            'provision_users', path, workers=2, rejects=str(self.rejects),
+            stdout=out, **options
+        )
+        return out.getvalue()
+
+    def rejected_rows(self):
+        lines = self.rejects.read_text().splitlines()
+        rows = [json.loads(line) for line in lines]
+        return {row['row']: row['errors'] for row in rows}
+
+    def test_provision_csv(self):
+        """Test users are created with hashed passwords."""
+        path = self.write('users.csv', (
+            'email,name,password\n'
+            'one@EXAMPLE.com,One,correct-horse-1\n'
+            'two@example.com,,correct-horse-2\n'
+        ))
+
+        out = self.provision(path)
+
+        users = get_user_model().objects.order_by('email')
+        assert [user.email for user in users] == [
+            'one@example.com', 'two@example.com',
+        ]
+        assert users[0].name == 'One'
+        assert users[0].check_password('correct-horse-1')
+        assert users[1].check_password('correct-horse-2')
+        assert 'Created 2 users, rejected 0' in out
+
+    @pytest.mark.parametrize('options', [
+        {'batch_size': 0}, {'batch_size': -1}, {'workers': 0},
+    ])
+    def test_invalid_sizes_fail(self, options):
+        """Test the command refuses a batch size or workers below 1."""
+        path = self.write('users.csv', 'email,password\n')
+
+        with pytest.raises(CommandError):
+            call_command('provision_users', path, **options)
+
+    def test_invalid_rows_are_rejected(self):
+        """Test invalid rows are reported without their password."""
+        path = self.write('users.jsonl', '\n'.join([
+            json.dumps({'email': 'not-an-email', 'password': 'horse-123'}),
+            json.dumps({'email': 'short@example.com', 'password': 'abc'}),
+            json.dumps({'email': 'none@example.com'}),
+            'not json',
+            json.dumps({'email': 'ok@example.com', 'password': 'horse-123'}),
+        ]))
+
+        self.provision(path)
+
+        assert list(get_user_model().objects.values_list(
+            'email', flat=True,
+        )) == ['ok@example.com']
+        errors = self.rejected_rows()
+        assert set(errors) == {1, 2, 3, 4}
+        assert 'email' in errors[1]
+        assert 'password' in errors[2]
+        assert 'password' in errors[3]
+        assert 'horse-123' not in self.rejects.read_text()
+
+    def test_duplicate_emails_are_per_row_errors(self):
+        """Test taken and repeated emails do not abort the batch."""
+        get_user_model().objects.create_user(
+            email='taken@example.com', password='horse-123',
+        )
+        path = self.write('users.csv', (
+            'email,password\n'
+            'new@example.com,horse-1234\n'
+            'taken@example.com,horse-1234\n'
+            'new@example.com,horse-1234\n'
+            'other@example.com,horse-1234\n'
+        ))
+
+        self.provision(path)
+
+        assert get_user_model().objects.count() == 3
+        assert set(self.rejected_rows()) == {2, 3}
+
+    def test_email_taken_during_insert(self):
+        """Test a conflict raised by the insert is retried per row."""
+        path = self.write('users.csv', (
+            'email,password\n'
+            'raced@example.com,horse-1234\n'
+            'fine@example.com,horse-1234\n'
+        ))
+        skip_taken = ProvisionUsersCommand._skip_taken
+        calls = []
+
+        def taken_after_first_check(command, source, batch):
+            calls.append(source)
+            if len(calls) == 1:
+                get_user_model().objects.create_user(
+                    email='raced@example.com', password='horse-123',
+                )
+                return batch
+            return skip_taken(command, source, batch)
+
+        with patch.object(
+            ProvisionUsersCommand, '_skip_taken', taken_after_first_check,
+        ):
+            self.provision(path)
+
+        assert len(calls) == 2
+        assert get_user_model().objects.filter(
+            email='fine@example.com',
+        ).exists()
+        assert set(self.rejected_rows()) == {1}
+
+    def test_batches(self):
+        """Test users are inserted batch by batch."""
+        rows = ''.join(
+            f'user{i}@example.com,horse-1234\n' for i in range(5)
+        )
+        path = self.write('users.csv', 'email,password\n' + rows)
 
-        call_command('wait_for_db')
+        out = self.provision(path, batch_size=2)
 
-        assert patched_check.call_count == 6
-        patched_check.assert_called_with(databases=['default'])
+        assert get_user_model().objects.count() == 5
+        assert out.count('users/s') == 4
@@ -0,0 +1,165 @@
+"""
+Tests for the pooled PostgreSQL backend.
+"""
+from unittest.mock import patch
+
+from django.db import OperationalError, connection
+import pytest
+
+from core.db import pool as pool_module
+from core.db.backends.postgresql_pool.base import DatabaseWrapper
+from core.db.pool import close_pools, get_pool
+
+
+@pytest.mark.django_db
+class TestConnectionPool:
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.wrappers = []
+        yield
+        for wrapper in self.wrappers:
+            wrapper.in_atomic_block = False
+            wrapper.close()
+        close_pools()
+
+    def make_wrapper(self, **options):
+        settings_dict = dict(connection.settings_dict, POOL=options)
+        wrapper = DatabaseWrapper(settings_dict, alias=connection.alias)
+        self.wrappers.append(wrapper)
+
+        return wrapper
+
+    def checkout(self, wrapper):
+        """Connect the wrapper, return the psycopg2 connection."""
+        wrapper.ensure_connection()
+        return wrapper.connection
+
+    def test_connection_is_reused(self):
+        """Test a closed connection is handed out again."""
+        wrapper = self.make_wrapper()
+        raw = self.checkout(wrapper)
+        wrapper.close()
+
+        assert not raw.closed
+        assert self.checkout(wrapper) is raw
+
+    def test_connection_past_lifetime_is_closed(self):
+        """Test a connection older than max_lifetime is not reused."""
+        wrapper = self.make_wrapper(max_lifetime=0)
+        raw = self.checkout(wrapper)
+        wrapper.close()
+
+        assert raw.closed
+        assert self.checkout(wrapper) is not raw
+
+    def test_idle_connection_is_evicted(self):
+        """Test a connection idle for longer than idle_timeout is closed."""
+        wrapper = self.make_wrapper(idle_timeout=0)
+        raw = self.checkout(wrapper)
+        wrapper.close()
+
+        assert self.checkout(wrapper) is not raw
+        assert raw.closed
+
+    def test_broken_connection_is_replaced(self):
+        """Test the health check discards a connection the server closed."""
+        wrapper = self.make_wrapper(health_check_interval=0)
+        raw = self.checkout(wrapper)
+        wrapper.close()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT pg_terminate_backend(%s)', [raw.get_backend_pid()]
+            )
+
+        replacement = self.checkout(wrapper)
+
+        assert replacement is not raw
+        with wrapper.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            assert cursor.fetchone() == (1,)
+
+    def test_open_transaction_is_rolled_back(self):
+        """Test a connection is given back outside of any transaction."""
+        wrapper = self.make_wrapper()
+        wrapper.set_autocommit(False)
+        with wrapper.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        raw = wrapper.connection
+        wrapper.close()
+
+        assert self.checkout(wrapper) is raw
+        assert wrapper.get_autocommit()
+        assert raw.get_transaction_status() == 0
+
+    def test_session_state_is_discarded(self):
+        """Test settings, locks, temp tables and cursors do not leak."""
+        wrapper = self.make_wrapper()
+        with wrapper.cursor() as cursor:
+            cursor.execute("SET statement_timeout = '1234ms'")
+            cursor.execute('SELECT pg_advisory_lock(42)')
+            cursor.execute('CREATE TEMPORARY TABLE leftover (id int)')
+            cursor.execute(
+                'DECLARE held CURSOR WITH HOLD FOR SELECT 1'
+            )
+        raw = wrapper.connection
+        wrapper.close()
+
+        assert self.checkout(wrapper) is raw
+        with wrapper.cursor() as cursor:
+            cursor.execute('SHOW statement_timeout')
+            assert cursor.fetchone() != ('1234ms',)
+            cursor.execute(
+                "SELECT count(*) FROM pg_locks WHERE locktype = 'advisory' "
+                'AND pid = pg_backend_pid()'
+            )
+            assert cursor.fetchone() == (0,)
+            cursor.execute("SELECT to_regclass('pg_temp.leftover')")
+            assert cursor.fetchone() == (None,)
+            cursor.execute('SELECT count(*) FROM pg_cursors')
+            assert cursor.fetchone() == (0,)
+
+    def test_connection_that_can_not_be_reset_is_discarded(self):
+        """Test a connection is closed when discarding its state fails."""
+        wrapper = self.make_wrapper()
+        raw = self.checkout(wrapper)
+
+        with patch.object(
+            pool_module.ConnectionPool, '_reset', return_value=False,
+        ):
+            wrapper.close()
+
+        assert raw.closed
+        assert wrapper.pool.size == 0
+
+    def test_connection_closed_in_atomic_block_is_discarded(self):
+        """Test a connection Django still considers in use is closed."""
+        wrapper = self.make_wrapper()
+        raw = self.checkout(wrapper)
+        wrapper.in_atomic_block = True
+        wrapper.close()
+
+        assert raw.closed
+        assert wrapper.pool.size == 0
+
+    def test_pool_size_is_bounded(self):
+        """Test a checkout waits for a free connection, then fails."""
+        first = self.make_wrapper(max_size=1, timeout=0.05)
+        second = self.make_wrapper(max_size=1, timeout=0.05)
+        self.checkout(first)
+
+        with pytest.raises(OperationalError):
+            self.checkout(second)
+
+        first.close()
+        self.checkout(second)
+
+    def test_forked_process_gets_new_pools(self):
+        """Test a child process never shares the parent's connections."""
+        parent_pool = get_pool('key', {})
+
+        with patch.object(pool_module.os, 'getpid', return_value=-1):
+            child_pool = get_pool('key', {})
+
+        assert child_pool is not parent_pool
+        assert parent_pool in pool_module._inherited[-1].values()
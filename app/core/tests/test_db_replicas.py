@@ -0,0 +1,203 @@
+"""
+Tests for the routing of reads to replicas.
+
+A clone of the test database stands in for the replica. Rows copied to
+it are the replicated state, changes made on the primary afterwards are
+the replication lag.
+"""
+from decimal import Decimal
+
+from django.db import connection, connections, transaction
+from django.urls import reverse
+import pytest
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.db.replicas import ReplicaRouter, replica_reads
+from core.models import Recipe
+from recipe.tests.helpers import detail_url
+
+REPLICA = 'replica'
+PROFILE_URL = reverse('user:profile')
+
+
+def replicate(*instances):
+    """Copy the current rows of the instances to the replica."""
+    for instance in instances:
+        row = type(instance)._default_manager.get(pk=instance.pk)
+        row.save(using=REPLICA, force_insert=True)
+
+
+@pytest.fixture(scope='session')
+def replica_settings(django_db_setup, django_db_blocker):
+    """Create a second test database, a copy of the migrated one."""
+    with django_db_blocker.unblock():
+        connection.close()
+        connection.creation.clone_test_db(suffix=REPLICA, verbosity=0)
+    yield connection.creation.get_test_db_clone_settings(REPLICA)
+    with django_db_blocker.unblock():
+        connection.creation.destroy_test_db(verbosity=0, suffix=REPLICA)
+
+
+@pytest.fixture
+def replica(replica_settings, settings):
+    """Route reads to the replica, undo its changes after the test."""
+    connections.settings[REPLICA] = replica_settings
+    settings.DATABASE_REPLICAS = [REPLICA]
+    try:
+        with transaction.atomic(using=REPLICA):
+            yield connections[REPLICA]
+            transaction.set_rollback(True, using=REPLICA)
+    finally:
+        connections[REPLICA].close()
+        del connections.settings[REPLICA]
+        delattr(connections._connections, REPLICA)
+
+
+@pytest.mark.django_db
+class TestReplicaReads:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, client, test_user, replica):
+        self.client = client
+        self.user = test_user
+        self.token = Token.objects.create(user=test_user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.recipe = Recipe.objects.create(
+            user=test_user, title='Soup', time_minutes=5, price=Decimal(1),
+        )
+        replicate(test_user, self.token, self.recipe)
+        # not replicated yet
+        Recipe.objects.filter(pk=self.recipe.pk).update(title='Stew')
+
+    def test_list_reads_from_replica(self):
+        """Test the recipe list is served by the replica."""
+        res = self.client.get(reverse('recipe:recipe-list'))
+
+        assert res.status_code == status.HTTP_200_OK
+        assert [r['title'] for r in res.data['results']] == ['Soup']
+
+    def test_retrieve_reads_from_replica(self):
+        """Test a recipe is served by the replica."""
+        res = self.client.get(detail_url(self.recipe.pk))
+
+        assert res.data['title'] == 'Soup'
+
+    def test_writer_reads_own_writes(self):
+        """Test a client that wrote reads from the primary afterwards."""
+        res = self.client.patch(detail_url(self.recipe.pk), {'price': '2'})
+        assert res.status_code == status.HTTP_200_OK
+
+        res = self.client.get(detail_url(self.recipe.pk))
+
+        assert res.data['title'] == 'Stew'
+        assert res.data['price'] == '2.00'
+
+    def test_created_recipe_is_listed(self):
+        """Test a recipe is listed right after it is created."""
+        payload = {'title': 'Pie', 'time_minutes': 30, 'price': '4.00'}
+        res = self.client.post(reverse('recipe:recipe-list'), payload)
+        assert res.status_code == status.HTTP_201_CREATED
+
+        res = self.client.get(reverse('recipe:recipe-list'))
+
+        assert {r['title'] for r in res.data['results']} == {'Pie', 'Stew'}
+
+    def test_failed_write_does_not_pin(self):
+        """Test a rejected write leaves the client on the replica."""
+        res = self.client.patch(
+            detail_url(self.recipe.pk), {'time_minutes': 'soon'},
+        )
+        assert res.status_code == status.HTTP_400_BAD_REQUEST
+
+        res = self.client.get(detail_url(self.recipe.pk))
+
+        assert res.data['title'] == 'Soup'
+
+    def test_pin_expires(self, settings):
+        """Test the client is back on the replica after the pin window."""
+        settings.REPLICA_PIN_SECONDS = 0
+        self.client.patch(detail_url(self.recipe.pk), {'price': '2'})
+
+        res = self.client.get(detail_url(self.recipe.pk))
+
+        assert res.data['title'] == 'Soup'
+
+    def test_profile_user_comes_from_primary(self):
+        """Test the profile shows the user authenticated on the primary."""
+        self.user.name = 'Renamed'
+        self.user.save()
+
+        res = self.client.get(PROFILE_URL)
+        assert res.data['name'] == 'Renamed'
+
+        self.client.patch(PROFILE_URL, {'name': 'Patched'})
+        res = self.client.get(PROFILE_URL)
+        assert res.data['name'] == 'Patched'
+
+    def test_new_token_is_found_on_primary(self):
+        """Test a token that is not replicated yet still authenticates."""
+        self.token.delete()
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+        res = self.client.get(PROFILE_URL)
+
+        assert res.status_code == status.HTTP_200_OK
+
+    def test_deleted_token_is_rejected(self):
+        """Test a token deleted on the primary fails though replicated."""
+        assert self.client.get(PROFILE_URL).status_code == status.HTTP_200_OK
+        self.token.delete()
+
+        res = self.client.get(PROFILE_URL)
+        assert res.status_code == status.HTTP_401_UNAUTHORIZED
+        # nor was it cached from the replica for the next request
+        res = self.client.get(detail_url(self.recipe.pk))
+        assert res.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_deactivated_user_is_rejected(self):
+        """Test a user deactivated on the primary fails though replicated."""
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(PROFILE_URL)
+
+        assert res.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_replica_reads_are_not_cached(self):
+        """Test a stale replica read does not hide a write from the writer."""
+        # the same token, sent by another client, is pinned separately
+        other = APIClient()
+        other.credentials(HTTP_AUTHORIZATION=f'token {self.token.key}')
+
+        res = self.client.patch(detail_url(self.recipe.pk), {'price': '2'})
+        assert res.status_code == status.HTTP_200_OK
+
+        # another client of the user, not pinned, reads the replica
+        res = other.get(detail_url(self.recipe.pk))
+        assert res.data['title'] == 'Soup'
+
+        res = self.client.get(detail_url(self.recipe.pk))
+        assert res['X-Cache'] == 'MISS'
+        assert res.data['price'] == '2.00'
+
+    def test_replica_list_has_no_etag(self):
+        """Test a list read from a lagging replica is not validated."""
+        res = self.client.get(reverse('recipe:recipe-list'))
+
+        assert res.data['results'][0]['title'] == 'Soup'
+        assert 'ETag' not in res
+
+    def test_router(self, rf):
+        """Test only reads in a replica block go to the replica."""
+        router = ReplicaRouter()
+
+        assert router.db_for_read(Recipe) == 'default'
+        with replica_reads(rf.get('/')):
+            assert router.db_for_read(Recipe) == REPLICA
+            assert router.db_for_write(Recipe) == 'default'
+        assert router.allow_migrate(REPLICA, 'core') is False
+        assert router.allow_migrate('default', 'core') is None
@@ -0,0 +1,75 @@
+"""
+Tests for the health check endpoints.
+"""
+from unittest.mock import patch
+
+from django.db.utils import OperationalError
+from django.urls import reverse
+import pytest
+
+from rest_framework import status
+
+from core import health
+
+
+@pytest.fixture(autouse=True)
+def reset_probe():
+    health._last_probe = None
+    yield
+    health._last_probe = None
+
+
+class TestHealthz:
+
+    def test_healthz(self, client):
+        """Test the liveness probe answers without touching the database."""
+        with patch('core.health.probe_databases') as patched_probe:
+            res = client.get(reverse('healthz'))
+
+        assert res.status_code == status.HTTP_200_OK
+        assert res.json() == {'status': 'ok'}
+        patched_probe.assert_not_called()
+
+
+class TestReadyz:
+
+    def test_ready(self, client):
+        """Test the readiness probe connects to the database."""
+        res = client.get(reverse('readyz'))
+
+        assert res.status_code == status.HTTP_200_OK
+        assert res.json() == {
+            'status': 'ok',
+            'databases': {'default': 'ok'},
+        }
+
+    @patch('core.health.probe_database')
+    def test_database_unavailable(self, patched_probe, client):
+        """Test a database that can not be reached fails the probe."""
+        patched_probe.side_effect = OperationalError('connection refused')
+
+        res = client.get(reverse('readyz'))
+
+        assert res.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert res.json() == {
+            'status': 'unavailable',
+            'databases': {'default': 'unavailable'},
+        }
+
+    @patch('core.health.probe_database')
+    def test_probe_is_cached(self, patched_probe, client):
+        """Test repeated checks reuse the last probe result."""
+        client.get(reverse('readyz'))
+        client.get(reverse('readyz'))
+
+        assert patched_probe.call_count == 1
+
+    @patch('core.health.probe_database')
+    def test_probe_cache_expires(self, patched_probe, client, settings):
+        """Test the databases are probed again once the result is old."""
+        settings.HEALTH_CHECK_CACHE_SECONDS = 0
+
+        client.get(reverse('readyz'))
+        client.get(reverse('readyz'))
+
+        assert patched_probe.call_count == 2
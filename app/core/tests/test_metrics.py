@@ -0,0 +1,166 @@
+"""
+Tests for the Prometheus metrics.
+"""
+import subprocess
+import sys
+
+from django.test import override_settings
+from django.urls import reverse
+import pytest
+
+from core.models import Recipe
+from prometheus_client import REGISTRY
+from rest_framework import status
+
+METRICS_URL = reverse('metrics')
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+def sample(name, **labels):
+    """Return the current value of a sample, 0 if it was never set."""
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@pytest.mark.django_db
+class TestMetrics:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, client, test_user):
+        self.client = client
+        self.client.force_authenticate(test_user)
+        Recipe.objects.create(
+            user=test_user, title='Soup', time_minutes=5, price=1,
+        )
+
+    def test_requests_are_counted_per_view(self):
+        """Test requests are labelled by view name, method and status."""
+        labels = {'view': 'recipe:recipe-list', 'method': 'GET'}
+        before = sample(
+            'django_http_requests_total', status='200', **labels
+        )
+        latency_before = sample(
+            'django_http_request_duration_seconds_count', **labels
+        )
+
+        self.client.get(RECIPES_URL)
+        self.client.get(RECIPES_URL)
+
+        assert sample(
+            'django_http_requests_total', status='200', **labels
+        ) == before + 2
+        assert sample(
+            'django_http_request_duration_seconds_count', **labels
+        ) == latency_before + 2
+
+    def test_db_queries_are_observed(self):
+        """Test the SQL queries of a request are recorded."""
+        labels = {'view': 'recipe:recipe-list', 'method': 'GET'}
+        before = sample('django_http_request_db_queries_sum', **labels)
+
+        self.client.get(RECIPES_URL)
+
+        assert sample(
+            'django_http_request_db_queries_sum', **labels
+        ) == before + 1
+
+    def test_unresolved_paths_share_a_series(self):
+        """Test 404s for unknown paths do not add a series per path."""
+        labels = {'view': '<unresolved>', 'method': 'GET', 'status': '404'}
+        before = sample('django_http_requests_total', **labels)
+
+        self.client.get('/no-such-page/1/')
+        self.client.get('/no-such-page/2/')
+
+        assert sample('django_http_requests_total', **labels) == before + 2
+
+    def test_cache_lookups_are_counted(self):
+        """Test hits and misses of the response cache are recorded."""
+        hits = sample(
+            'django_cache_requests_total',
+            cache='recipe_response', result='hit',
+        )
+
+        self.client.get(RECIPES_URL)
+        self.client.get(RECIPES_URL)
+
+        assert sample(
+            'django_cache_requests_total',
+            cache='recipe_response', result='hit',
+        ) == hits + 1
+
+    def test_metrics_endpoint(self):
+        """Test the metrics are served in the Prometheus text format."""
+        self.client.get(RECIPES_URL)
+
+        res = self.client.get(METRICS_URL)
+
+        assert res.status_code == status.HTTP_200_OK
+        assert res['Content-Type'].startswith('text/plain')
+        assert b'django_http_requests_total{' in res.content
+
+    @pytest.mark.parametrize('remote_addr', ['203.0.113.7', '::ffff:1.2.3.4'])
+    def test_metrics_endpoint_rejects_other_addresses(self, remote_addr):
+        """Test clients outside the allowed addresses get a 403."""
+        res = self.client.get(METRICS_URL, REMOTE_ADDR=remote_addr)
+
+        assert res.status_code == status.HTTP_403_FORBIDDEN
+        assert b'django_http_requests_total' not in res.content
+
+    @override_settings(METRICS_ALLOWED_IPS=['10.0.0.0/8'])
+    def test_metrics_endpoint_allows_networks(self):
+        """Test allowed entries may be networks."""
+        res = self.client.get(METRICS_URL, REMOTE_ADDR='10.1.2.3')
+
+        assert res.status_code == status.HTTP_200_OK
+
+    @override_settings(METRICS_TOKEN='scrape-secret')
+    def test_metrics_endpoint_token(self):
+        """Test the bearer token is accepted from any address."""
+        res = self.client.get(
+            METRICS_URL, REMOTE_ADDR='203.0.113.7',
+            HTTP_AUTHORIZATION='Bearer scrape-secret',
+        )
+
+        assert res.status_code == status.HTTP_200_OK
+
+    @pytest.mark.parametrize('authorization', [
+        'Bearer wrong', 'Bearer ', 'Token scrape-secret', '',
+    ])
+    @override_settings(METRICS_TOKEN='scrape-secret')
+    def test_metrics_endpoint_wrong_token(self, authorization):
+        res = self.client.get(
+            METRICS_URL, REMOTE_ADDR='203.0.113.7',
+            HTTP_AUTHORIZATION=authorization,
+        )
+
+        assert res.status_code == status.HTTP_403_FORBIDDEN
+
+    @override_settings(METRICS_TOKEN='')
+    def test_metrics_endpoint_empty_token_is_disabled(self):
+        """Test an unset token never matches an empty bearer token."""
+        res = self.client.get(
+            METRICS_URL, REMOTE_ADDR='203.0.113.7',
+            HTTP_AUTHORIZATION='Bearer ',
+        )
+
+        assert res.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_metrics_endpoint_aggregates_processes(
+        self, tmp_path, monkeypatch
+    ):
+        """Test samples written by several workers are summed up."""
+        worker = (
+            'from prometheus_client import Counter\n'
+            "Counter('worker_jobs', 'Jobs.').inc(3)\n"
+        )
+        for _ in range(2):
+            subprocess.run(
+                [sys.executable, '-c', worker],
+                env={'PROMETHEUS_MULTIPROC_DIR': str(tmp_path)},
+                check=True,
+            )
+        monkeypatch.setenv('PROMETHEUS_MULTIPROC_DIR', str(tmp_path))
+
+        res = self.client.get(METRICS_URL)
+
+        assert b'worker_jobs_total 6.0' in res.content
@@ -0,0 +1,78 @@
+"""
+Tests for the request timing middleware.
+"""
+import logging
+
+from django.test import override_settings
+from django.urls import reverse
+import pytest
+
+from core.models import Recipe
+from rest_framework import status
+from rest_framework.test import APIClient
+
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+def parse_server_timing(header):
+    """Return the Server-Timing header as {name: {param: value}}."""
+    metrics = {}
+    for metric in header.split(', '):
+        name, *params = metric.split(';')
+        metrics[name] = dict(param.split('=', 1) for param in params)
+
+    return metrics
+
+
+@pytest.mark.django_db
+class TestRequestTimingMiddleware:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, client, test_user):
+        self.client = client
+        self.client.force_authenticate(test_user)
+        Recipe.objects.create(
+            user=test_user, title='Soup', time_minutes=5, price=1,
+        )
+
+    def test_server_timing_header(self):
+        """Test the response reports queries and timings."""
+        res = self.client.get(RECIPES_URL)
+
+        assert res.status_code == status.HTTP_200_OK
+        metrics = parse_server_timing(res['Server-Timing'])
+        assert set(metrics) == {'db', 'view', 'render', 'total'}
+        assert metrics['db']['desc'] == '"1 queries"'
+        assert float(metrics['render']['dur']) > 0
+        assert float(metrics['total']['dur']) >= float(metrics['view']['dur'])
+
+    def test_request_is_logged(self, caplog):
+        """Test a structured line is logged for each request."""
+        with caplog.at_level(logging.INFO, logger='core.request_timing'):
+            self.client.get(RECIPES_URL)
+
+        record, = caplog.records
+        assert record.timing['path'] == RECIPES_URL
+        assert record.timing['queries'] == 1
+        assert 'status=200 queries=1 db_ms=' in record.getMessage()
+
+    @override_settings(REQUEST_TIMING_SLOW_MS=0)
+    def test_slow_request_logs_queries(self, caplog):
+        """Test requests over the threshold log their slowest queries."""
+        with caplog.at_level(logging.INFO, logger='core.request_timing'):
+            self.client.get(RECIPES_URL)
+
+        slow = caplog.records[-1]
+        assert slow.levelno == logging.WARNING
+        assert 'FROM "core_recipe"' in slow.getMessage()
+
+    @override_settings(REQUEST_TIMING_ENABLED=False)
+    def test_disabled(self, test_user):
+        """Test the middleware is left out of the stack when disabled."""
+        client = APIClient()
+        client.force_authenticate(test_user)
+
+        res = client.get(RECIPES_URL)
+
+        assert res.status_code == status.HTTP_200_OK
+        assert 'Server-Timing' not in res
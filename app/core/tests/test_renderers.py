@@ -0,0 +1,210 @@
+"""
+Tests for the orjson and MessagePack renderers and parsers.
+"""
+import datetime
+import io
+from decimal import Decimal
+
+import msgpack
+import pytest
+import yaml
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+
+from rest_framework import status
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from core.models import Recipe
+from core.parsers import MessagePackParser, ORJSONParser
+from core.renderers import MessagePackRenderer, ORJSONRenderer
+from core.schema import generate_schema, source_hash
+from recipe.serializers import RecipeDetailSerializer
+from recipe.tests.helpers import detail_url
+
+RECIPES_URL = reverse('recipe:recipe-list')
+MSGPACK = 'application/msgpack'
+
+
+class TestORJSONRenderer:
+
+    def test_matches_drf_renderer(self):
+        """Test the body is byte-identical to DRF's JSONRenderer."""
+        data = RecipeDetailSerializer([
+            Recipe(
+                id=1, title='Crème brûlée', time_minutes=45,
+                price=Decimal('7.50'), link='', description='"Sweet"\n',
+            ),
+        ], many=True).data
+
+        body = ORJSONRenderer().render(data, 'application/json')
+
+        assert body == JSONRenderer().render(data, 'application/json')
+
+    def test_matches_drf_renderer_for_line_separators(self):
+        """Test U+2028 and U+2029 are escaped as DRF does."""
+        data = {'title': 'one\u2028two\u2029three'}
+
+        body = ORJSONRenderer().render(data)
+
+        assert body == JSONRenderer().render(data)
+        assert b'\\u2028' in body
+
+    def test_int_keys(self):
+        """Test int keys, as in ListField errors, are written as strings."""
+        data = {'delete': {0: ['Invalid.']}}
+
+        body = ORJSONRenderer().render(data)
+
+        assert body == JSONRenderer().render(data)
+
+    def test_decimal_is_exact(self):
+        """Test decimals are written as exact strings."""
+        body = ORJSONRenderer().render({
+            'price': Decimal('0.10'),
+            'total': Decimal('12345678901234567890.01'),
+        })
+
+        assert body == b'{"price":"0.10","total":"12345678901234567890.01"}'
+
+    def test_uses_drf_encoder_for_other_types(self):
+        """Test datetimes and lazy strings are written as DRF does."""
+        data = {
+            'at': datetime.datetime(2024, 1, 2, 3, 4, 5,
+                                    tzinfo=datetime.timezone.utc),
+            'message': gettext_lazy('Not found.'),
+        }
+
+        body = ORJSONRenderer().render(data)
+
+        assert body == JSONRenderer().render(data)
+
+    def test_indent(self):
+        """Test an indent parameter in the media type indents the body."""
+        body = ORJSONRenderer().render(
+            {'id': 1}, 'application/json; indent=4',
+        )
+
+        assert body == b'{\n  "id": 1\n}'
+
+    def test_parse_error(self):
+        """Test malformed JSON raises a parse error."""
+        with pytest.raises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"title": '))
+
+
+class TestMessagePack:
+
+    def test_round_trip(self):
+        """Test rendered data parses back, decimals as exact strings."""
+        body = MessagePackRenderer().render(
+            {'title': 'Soup', 'price': Decimal('7.50'), 'tags': [1, 2]}
+        )
+
+        data = MessagePackParser().parse(io.BytesIO(body))
+
+        assert data == {'title': 'Soup', 'price': '7.50', 'tags': [1, 2]}
+
+    def test_parse_error(self):
+        """Test malformed MessagePack raises a parse error."""
+        with pytest.raises(ParseError):
+            MessagePackParser().parse(io.BytesIO(b'\xc1'))
+
+
+@pytest.mark.django_db
+class TestRecipeAPIFormats:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, client, test_user):
+        self.client = client
+        self.client.force_authenticate(test_user)
+        self.recipe = Recipe.objects.create(
+            user=test_user, title='Soup', time_minutes=10,
+            price=Decimal('7.50'),
+        )
+
+    def test_json_is_default(self):
+        res = self.client.get(detail_url(self.recipe.id))
+
+        assert res['Content-Type'] == 'application/json'
+        assert res.json()['price'] == '7.50'
+
+    def test_retrieve_msgpack(self):
+        res = self.client.get(
+            detail_url(self.recipe.id), HTTP_ACCEPT=MSGPACK,
+        )
+
+        assert res.status_code == status.HTTP_200_OK
+        assert res['Content-Type'] == MSGPACK
+        data = msgpack.unpackb(res.content)
+        assert data['title'] == 'Soup'
+        assert data['price'] == '7.50'
+
+    def test_list_msgpack_has_its_own_etag(self):
+        json_res = self.client.get(RECIPES_URL)
+        res = self.client.get(RECIPES_URL, HTTP_ACCEPT=MSGPACK)
+
+        assert res['ETag'] != json_res['ETag']
+        assert msgpack.unpackb(res.content)['results'][0]['price'] == '7.50'
+
+    @pytest.mark.parametrize('price', ['12.34', 12.34])
+    def test_create_msgpack(self, price):
+        body = msgpack.packb(
+            {'title': 'Stew', 'time_minutes': 30, 'price': price}
+        )
+
+        res = self.client.post(
+            RECIPES_URL, body, content_type=MSGPACK, HTTP_ACCEPT=MSGPACK,
+        )
+
+        assert res.status_code == status.HTTP_201_CREATED
+        recipe = Recipe.objects.get(id=msgpack.unpackb(res.content)['id'])
+        assert recipe.price == Decimal('12.34')
+
+    def test_create_json_number_price(self):
+        res = self.client.post(
+            RECIPES_URL,
+            b'{"title": "Stew", "time_minutes": 30, "price": 0.1}',
+            content_type='application/json',
+        )
+
+        assert res.status_code == status.HTTP_201_CREATED
+        assert Recipe.objects.get(id=res.json()['id']).price == Decimal('0.1')
+
+    def test_bulk_item_errors(self):
+        """Test per-item errors of the bulk endpoint are rendered."""
+        res = self.client.post(
+            reverse('recipe:recipe-bulk'), {'delete': [0]}, format='json',
+        )
+
+        assert res.status_code == status.HTTP_400_BAD_REQUEST
+        assert list(res.json()['delete']) == ['0']
+
+    def test_malformed_msgpack(self):
+        res = self.client.post(RECIPES_URL, b'\xc1', content_type=MSGPACK)
+
+        assert res.status_code == status.HTTP_400_BAD_REQUEST
+
+
+class TestSchemaMediaTypes:
+
+    def test_schema_lists_formats(self):
+        """Test the schema documents JSON and MessagePack bodies."""
+        schema = yaml.safe_load(generate_schema(source_hash()))
+
+        operation = schema['paths']['/api/recipe/recipes/']['post']
+        assert set(operation['requestBody']['content']) >= {
+            'application/json', MSGPACK,
+        }
+        assert set(operation['responses']['201']['content']) == {
+            'application/json', MSGPACK,
+        }
+
+
+def test_benchmark_command():
+    out = io.StringIO()
+
+    call_command('benchmark_renderers', rows=50, repeat=1, stdout=out)
+
+    assert 'All formats decode to the same data.' in out.getvalue()
@@ -0,0 +1,160 @@
+"""
+Tests for the pre-built OpenAPI schema.
+"""
+import gzip
+from pathlib import Path
+from unittest.mock import patch
+
+from django.urls import reverse
+import pytest
+import yaml
+
+from rest_framework import status
+
+from core.models import recipe_models
+from core.schema import (
+    HASH_PREFIX,
+    build_schema,
+    clear_schema_cache,
+    generate_schema,
+    source_hash,
+)
+
+SCHEMA_URL = reverse('api-schema')
+
+
+class TestSchemaView:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, client, settings, tmp_path):
+        self.client = client
+        self.path = tmp_path / 'schema.yaml'
+        settings.OPENAPI_SCHEMA_FILE = self.path
+        clear_schema_cache()
+        yield
+        clear_schema_cache()
+
+    def test_schema_is_generated_when_missing(self):
+        """Test a missing schema file is generated and written."""
+        res = self.client.get(SCHEMA_URL)
+
+        assert res.status_code == status.HTTP_200_OK
+        assert res['Content-Type'] == 'application/vnd.oai.openapi'
+        assert res.content == self.path.read_bytes()
+        schema = yaml.safe_load(res.content)
+        assert '/api/recipe/recipes/' in schema['paths']
+
+    def test_up_to_date_file_is_served(self):
+        """Test the schema is not generated again when nothing changed."""
+        build_schema(self.path)
+
+        with patch('core.schema.generate_schema') as patched_generate:
+            res = self.client.get(SCHEMA_URL)
+
+        patched_generate.assert_not_called()
+        assert res.content == self.path.read_bytes()
+
+    def test_stale_file_is_regenerated(self):
+        """Test a schema built from other sources is replaced."""
+        self.path.write_bytes(f'{HASH_PREFIX}stale\nopenapi: 3.0.3\n'.encode())
+
+        res = self.client.get(SCHEMA_URL)
+
+        current = f'{HASH_PREFIX}{source_hash()}\n'.encode()
+        assert res.content.startswith(current)
+        assert self.path.read_bytes() == res.content
+
+    def test_schema_is_served_from_memory(self):
+        """Test the file is only read once."""
+        self.client.get(SCHEMA_URL)
+
+        with patch('core.schema._load_schema') as patched_load:
+            res = self.client.get(SCHEMA_URL)
+
+        patched_load.assert_not_called()
+        assert res.status_code == status.HTTP_200_OK
+
+    def test_gzip(self):
+        """Test clients accepting gzip get the compressed schema."""
+        plain = self.client.get(SCHEMA_URL)
+
+        res = self.client.get(SCHEMA_URL, HTTP_ACCEPT_ENCODING='gzip, br')
+
+        assert res['Content-Encoding'] == 'gzip'
+        assert res['Vary'] == 'Accept-Encoding'
+        assert gzip.decompress(res.content) == plain.content
+        assert res['ETag'] != plain['ETag']
+
+    def test_not_modified(self):
+        """Test a matching If-None-Match is answered with 304."""
+        etag = self.client.get(SCHEMA_URL)['ETag']
+
+        res = self.client.get(SCHEMA_URL, HTTP_IF_NONE_MATCH=etag)
+
+        assert res.status_code == status.HTTP_304_NOT_MODIFIED
+        assert res.content == b''
+
+    def test_json_format(self):
+        """Test the schema can be fetched as JSON."""
+        schema = yaml.safe_load(self.client.get(SCHEMA_URL).content)
+
+        res = self.client.get(SCHEMA_URL, {'format': 'json'})
+
+        assert res['Content-Type'] == 'application/vnd.oai.openapi+json'
+        assert res.json() == schema
+
+    def test_model_change_invalidates_hash(self, monkeypatch):
+        """Test a change of a models module makes the schema stale."""
+        before = source_hash()
+        models_path = Path(recipe_models.__file__)
+        read_bytes = Path.read_bytes
+
+        def edited(path):
+            content = read_bytes(path)
+            if path == models_path:
+                content = content.replace(
+                    b'max_length=255', b'max_length=100',
+                )
+            return content
+
+        monkeypatch.setattr(Path, 'read_bytes', edited)
+
+        assert source_hash() != before
+
+    def test_tests_do_not_change_hash(self, monkeypatch):
+        """Test only sources the schema may depend on are hashed."""
+        before = source_hash()
+        read_bytes = Path.read_bytes
+        monkeypatch.setattr(Path, 'read_bytes', lambda path: (
+            read_bytes(path) + b'#' if 'tests' in path.parts
+            else read_bytes(path)
+        ))
+
+        assert source_hash() == before
+
+    def test_runtime_settings_do_not_change_hash(self, settings):
+        """Test env-driven DRF settings keep a pre-built schema fresh."""
+        before = source_hash()
+
+        settings.REST_FRAMEWORK = dict(
+            settings.REST_FRAMEWORK, NUM_PROXIES=1,
+        )
+
+        assert source_hash() == before
+
+    def test_renderer_change_invalidates_hash(self, settings):
+        """Test DRF settings that shape the schema are hashed."""
+        before = source_hash()
+
+        settings.REST_FRAMEWORK = dict(
+            settings.REST_FRAMEWORK,
+            DEFAULT_RENDERER_CLASSES=['core.renderers.ORJSONRenderer'],
+        )
+
+        assert source_hash() != before
+
+    def test_generated_schema_is_stable(self):
+        """Test the same sources always give the same schema."""
+        current_hash = source_hash()
+
+        assert generate_schema(current_hash) == generate_schema(current_hash)
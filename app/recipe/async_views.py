@@ -0,0 +1,56 @@
+"""
+Async read-only views of the Recipe API, served natively under ASGI.
+
+They reuse RecipeViewSet for querysets, filters, sparse fieldsets,
+pagination and serializers, and only run the ORM queries in the
+thread pool. Like the viewset they read from a replica when there is
+one. The response cache and conditional GET of the viewset are not
+applied here.
+"""
+from asgiref.sync import sync_to_async
+
+from rest_framework.response import Response
+
+from core.async_api import async_api_view
+from core.db.replicas import replica_reads
+from .views import RecipeViewSet
+
+
+def _viewset(request, action, **kwargs):
+    """Return a RecipeViewSet set up for the request without dispatching."""
+    return RecipeViewSet(
+        request=request,
+        action=action,
+        format_kwarg=None,
+        args=(),
+        kwargs=kwargs,
+        headers={},
+    )
+
+
+@async_api_view(
+    RecipeViewSet.authentication_classes,
+    RecipeViewSet.permission_classes,
+)
+async def recipe_list(request):
+    """List the recipes of the authenticated user"""
+    view = _viewset(request, 'list')
+    queryset = view.filter_queryset(view.get_queryset())
+    with replica_reads(request):
+        page = await sync_to_async(view.paginate_queryset)(queryset)
+    serializer = view.get_serializer(page, many=True)
+
+    return view.get_paginated_response(serializer.data)
+
+
+@async_api_view(
+    RecipeViewSet.authentication_classes,
+    RecipeViewSet.permission_classes,
+)
+async def recipe_detail(request, pk):
+    """Retrieve a recipe of the authenticated user"""
+    view = _viewset(request, 'retrieve', pk=pk)
+    with replica_reads(request):
+        recipe = await sync_to_async(view.get_object)()
+
+    return Response(view.get_serializer(recipe).data)
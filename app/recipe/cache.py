@@ -0,0 +1,117 @@
+"""
+Versioned per-user response cache for the Recipe API.
+
+Every cached body is stored under the current version of its owner.
+Writes bump the version, which orphans all older entries at once
+instead of deleting them one by one. Only bodies read from the primary
+are cached, replicas may lag behind the version.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from rest_framework.response import Response
+
+from core.db.replicas import reading_from_replica
+from core.metrics import record_cache_lookup
+
+HITS_KEY = 'recipe:cache:hits'
+MISSES_KEY = 'recipe:cache:misses'
+
+
+def _version_key(user_id):
+    return f'recipe:version:{user_id}'
+
+
+def _new_version():
+    # time based, so a version evicted from the cache never comes back
+    # lower than one that is still referenced by a cached body
+    return int(time.time() * 1000)
+
+
+def get_user_version(user_id):
+    """Return the current cache version for the user."""
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _new_version(), timeout=None)
+        version = cache.get(key)
+
+    return version
+
+
+def bump_user_version(user_id):
+    """Invalidate every cached response of the user."""
+    key = _version_key(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, _new_version(), timeout=None)
+
+
+def response_cache_key(user_id, full_path):
+    """Return the cache key of a response for the user's current version."""
+    path_hash = hashlib.md5(full_path.encode()).hexdigest()
+    version = get_user_version(user_id)
+    return f'recipe:response:{user_id}:{version}:{path_hash}'
+
+
+def _count(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+
+
+def get_cache_stats():
+    """Return hit and miss counts of the response cache."""
+    counts = cache.get_many([HITS_KEY, MISSES_KEY])
+    return {
+        'hits': counts.get(HITS_KEY, 0),
+        'misses': counts.get(MISSES_KEY, 0),
+    }
+
+
+class CachedResponseMixin:
+    """Serve list and retrieve responses from the per-user cache"""
+
+    def list(self, request, *args, **kwargs):
+        return self._cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        bump_user_version(self.request.user.pk)
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        bump_user_version(self.request.user.pk)
+
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+        bump_user_version(self.request.user.pk)
+
+    def _cached_response(self, handler, request, *args, **kwargs):
+        key = response_cache_key(request.user.pk, request.get_full_path())
+        data = cache.get(key)
+        record_cache_lookup('recipe_response', data is not None)
+        if data is not None:
+            _count(HITS_KEY)
+            return Response(data, headers={'X-Cache': 'HIT'})
+
+        _count(MISSES_KEY)
+        response = handler(request, *args, **kwargs)
+        # a body read from a lagging replica may predate a write that
+        # already bumped the version, it must not be cached under it
+        if response.status_code == 200 and not reading_from_replica():
+            cache.set(key, response.data, settings.RECIPE_CACHE_TIMEOUT)
+        response['X-Cache'] = 'MISS'
+
+        return response
@@ -0,0 +1,79 @@
+"""
+Conditional GET support for the Recipe API.
+"""
+import hashlib
+from calendar import timegm
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from core.db.replicas import reading_from_replica
+from .cache import get_user_version
+
+
+class ConditionalGetMixin:
+    """
+    Emit ETag and Last-Modified on list and retrieve responses and answer
+    If-None-Match / If-Modified-Since with 304 before serializing anything.
+
+    A list ETag is made of the owner's response cache version, which
+    every write bumps, so lists are validated without a query and carry
+    no Last-Modified. The version is read before the body, a write in
+    between can only make the ETag older than the body. A body read from
+    a lagging replica may be older than the version, it gets no ETag.
+    """
+
+    def list(self, request, *args, **kwargs):
+        etag = self._make_etag(request, get_user_version(request.user.pk))
+        response = self._conditional_response(
+            super().list, etag, None, False, request, *args, **kwargs
+        )
+        if reading_from_replica() and response.get('X-Cache') == 'MISS':
+            del response.headers['ETag']
+
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup = {self.lookup_field: kwargs[self.lookup_url_kwarg or 'pk']}
+        last_modified = self.filter_queryset(self.get_queryset()).filter(
+            **lookup
+        ).values_list('updated_at', flat=True).first()
+        if last_modified is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        etag = self._make_etag(request, last_modified)
+
+        return self._conditional_response(
+            super().retrieve, etag, last_modified, True,
+            request, *args, **kwargs
+        )
+
+    def _make_etag(self, request, *state):
+        parts = (
+            request.user.pk,
+            request.get_full_path(),
+            request.accepted_media_type,
+        ) + state
+        digest = hashlib.md5(repr(parts).encode()).hexdigest()
+
+        return f'"{digest}"'
+
+    def _conditional_response(self, handler, etag, last_modified,
+                              check_modified_since, request, *args, **kwargs):
+        timestamp = None
+        if last_modified is not None:
+            timestamp = timegm(last_modified.utctimetuple())
+
+        response = get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=timestamp if check_modified_since else None,
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+
+        response.headers.setdefault('ETag', etag)
+        if timestamp is not None:
+            response.headers.setdefault('Last-Modified', http_date(timestamp))
+
+        return response
@@ -0,0 +1,80 @@
+"""
+Streaming export of recipes.
+"""
+import csv
+import io
+import json
+
+from rest_framework.renderers import BaseRenderer
+
+EXPORT_FIELDS = (
+    'id', 'title', 'time_minutes', 'price', 'link', 'description',
+)
+
+
+class ExportRenderer(BaseRenderer):
+    """
+    Announces an export media type for content negotiation. The export
+    body itself is streamed, so only error responses are rendered here,
+    as JSON and labelled as such rather than with the export media type.
+    """
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        response = (renderer_context or {}).get('response')
+        if response is not None and response.exception:
+            response['Content-Type'] = 'application/json'
+
+        return json.dumps(data).encode()
+
+
+class NDJSONRenderer(ExportRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+
+class CSVRenderer(ExportRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+def _to_primitive(row):
+    *head, price, link, description = row
+    return head + [str(price), link, description]
+
+
+def _chunks(rows, chunk_size):
+    chunk = []
+    for row in rows:
+        chunk.append(_to_primitive(row))
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def stream_ndjson(rows, chunk_size):
+    """Yield recipe rows as newline delimited JSON, a chunk at a time."""
+    for chunk in _chunks(rows, chunk_size):
+        yield ''.join(
+            json.dumps(dict(zip(EXPORT_FIELDS, row))) + '\n'
+            for row in chunk
+        )
+
+
+def stream_csv(rows, chunk_size):
+    """Yield recipe rows as CSV with a header, a chunk at a time."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+
+    for chunk in _chunks(rows, chunk_size):
+        writer.writerows(chunk)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    # header of an empty export
+    if buffer.tell():
+        yield buffer.getvalue()
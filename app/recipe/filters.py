@@ -0,0 +1,121 @@
+"""
+Filter backends for the Recipe API
+"""
+from django.contrib.postgres.search import (
+    SearchHeadline,
+    SearchQuery,
+    SearchRank,
+)
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
+
+from rest_framework import serializers
+from rest_framework.filters import BaseFilterBackend
+
+SEARCH_CONFIG = 'english'
+
+
+class RecipeSearchFilter(BaseFilterBackend):
+    """
+    Full-text search over recipe title and description, backed by the
+    GIN indexed `search_vector` column. Matches are annotated with their
+    `rank` and a highlighted `headline` of the description.
+    """
+    search_param = 'search'
+
+    def get_search_terms(self, request):
+        return request.query_params.get(self.search_param, '').strip()
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+
+        query = SearchQuery(
+            terms,
+            config=SEARCH_CONFIG,
+            search_type='websearch',
+        )
+
+        return queryset.filter(search_vector=query).annotate(
+            # double precision, so the rank survives the cursor round trip
+            rank=Cast(SearchRank(F('search_vector'), query), FloatField()),
+            headline=SearchHeadline(
+                'description',
+                query,
+                config=SEARCH_CONFIG,
+                start_sel='<mark>',
+                stop_sel='</mark>',
+            ),
+        )
+
+    def get_schema_operation_parameters(self, view):
+        return [{
+            'name': self.search_param,
+            'required': False,
+            'in': 'query',
+            'description': 'Full-text search over title and description.',
+            'schema': {'type': 'string'},
+        }]
+
+
+class RecipeRangeSerializer(serializers.Serializer):
+    """Serializer for the range and prefix filters of recipes"""
+    time_minutes_min = serializers.IntegerField(min_value=0, required=False)
+    time_minutes_max = serializers.IntegerField(min_value=0, required=False)
+    price_min = serializers.DecimalField(
+        max_digits=None, decimal_places=None, required=False,
+    )
+    price_max = serializers.DecimalField(
+        max_digits=None, decimal_places=None, required=False,
+    )
+    title = serializers.CharField(required=False)
+
+
+class RecipeRangeFilter(BaseFilterBackend):
+    """
+    Range filters on `time_minutes` and `price` and a prefix filter on
+    `title`, each backed by a (user_id, column) index.
+    """
+    lookups = {
+        'time_minutes_min': 'time_minutes__gte',
+        'time_minutes_max': 'time_minutes__lte',
+        'price_min': 'price__gte',
+        'price_max': 'price__lte',
+        'title': 'title__startswith',
+    }
+
+    def filter_queryset(self, request, queryset, view):
+        params = {
+            name: value for name, value in request.query_params.items()
+            if name in self.lookups
+        }
+        if not params:
+            return queryset
+
+        serializer = RecipeRangeSerializer(data=params)
+        serializer.is_valid(raise_exception=True)
+
+        return queryset.filter(**{
+            self.lookups[name]: value
+            for name, value in serializer.validated_data.items()
+        })
+
+    def get_schema_operation_parameters(self, view):
+        types = {
+            'time_minutes_min': 'integer',
+            'time_minutes_max': 'integer',
+            'price_min': 'number',
+            'price_max': 'number',
+            'title': 'string',
+        }
+        return [
+            {
+                'name': name,
+                'required': False,
+                'in': 'query',
+                'description': f'Filter on {lookup.replace("__", " ")}.',
+                'schema': {'type': types[name]},
+            }
+            for name, lookup in self.lookups.items()
+        ]
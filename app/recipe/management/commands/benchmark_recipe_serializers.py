@@ -0,0 +1,88 @@
+"""
+Django command comparing the model serializer and the `.values()` fast
+path used by the recipe list. Sample rows are created in a transaction
+that is rolled back at the end.
+"""
+import time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from rest_framework.renderers import JSONRenderer
+
+from core.models import Recipe
+from recipe.serializers import RecipeSerializer, RecipeValuesSerializer
+
+
+class Command(BaseCommand):
+    """Django command to benchmark recipe list serialization"""
+    help = 'Compare model and values based recipe list serialization.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        with transaction.atomic():
+            queryset = self._seed(options['rows'])
+            model_time, model_body = self._measure(
+                options['repeat'],
+                lambda: RecipeSerializer(queryset.all(), many=True).data,
+            )
+            fields = RecipeValuesSerializer.fields
+            values_time, values_body = self._measure(
+                options['repeat'],
+                lambda: RecipeValuesSerializer(
+                    queryset.values(*fields), many=True
+                ).data,
+            )
+            transaction.set_rollback(True)
+
+        if model_body != values_body:
+            raise CommandError('Serializers produced different output.')
+
+        self.stdout.write(
+            f'{options["rows"]} rows, best of {options["repeat"]}:\n'
+            f'  RecipeSerializer:       {model_time * 1000:8.1f} ms\n'
+            f'  RecipeValuesSerializer: {values_time * 1000:8.1f} ms\n'
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Fast path is {model_time / values_time:.1f}x faster, '
+            'output is byte-identical.'
+        ))
+
+    def _seed(self, rows):
+        user = get_user_model().objects.create_user(
+            email='serializer-benchmark@example.com',
+            password=None,
+        )
+        Recipe.objects.bulk_create(
+            (
+                Recipe(
+                    user=user,
+                    title=f'Benchmark Recipe {i}',
+                    time_minutes=i % 120 + 1,
+                    price=Decimal(i % 10000) / 100,
+                    link=f'https://example.com/recipes/{i}',
+                )
+                for i in range(rows)
+            ),
+            batch_size=5000,
+        )
+
+        return Recipe.objects.filter(
+            user=user,
+        ).defer('search_vector').order_by('-id')
+
+    def _measure(self, repeat, serialize):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            body = JSONRenderer().render(serialize())
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+
+        return best, body
@@ -0,0 +1,94 @@
+"""
+Django command comparing DRF's JSON renderer and parser with the orjson
+and MessagePack ones on recipe detail payloads: encode and decode times
+and body sizes. The recipes are built in memory, no database is used.
+"""
+import io
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core.models import Recipe
+from core.parsers import MessagePackParser, ORJSONParser
+from core.renderers import MessagePackRenderer, ORJSONRenderer
+from recipe.serializers import RecipeDetailSerializer
+
+CODECS = {
+    'json': (JSONRenderer, JSONParser),
+    'orjson': (ORJSONRenderer, ORJSONParser),
+    'msgpack': (MessagePackRenderer, MessagePackParser),
+}
+
+
+class Command(BaseCommand):
+    """Django command to benchmark the API renderers and parsers"""
+    help = 'Compare encode/decode speed and size of the API body formats.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        data = RecipeDetailSerializer(
+            self._recipes(options['rows']), many=True,
+        ).data
+
+        results = {}
+        for name, (renderer_class, parser_class) in CODECS.items():
+            results[name] = self._measure(
+                renderer_class(), parser_class(), data, options['repeat'],
+            )
+        expected = results['json'][3]
+        for name, (*_, decoded) in results.items():
+            if decoded != expected:
+                raise CommandError(f'{name} decoded different data.')
+
+        json_encode, json_decode, json_size, _ = results['json']
+        self.stdout.write(
+            f'{options["rows"]} recipes, best of {options["repeat"]}:\n'
+            f'  {"format":<8} {"encode":>10} {"decode":>10} {"size":>12}'
+        )
+        for name, (encode, decode, size, _) in results.items():
+            self.stdout.write(
+                f'  {name:<8} {encode * 1000:7.1f} ms {decode * 1000:7.1f} ms '
+                f'{size:>8} bytes  '
+                f'({json_encode / encode:.1f}x encode, '
+                f'{json_decode / decode:.1f}x decode, '
+                f'{size / json_size:.0%} size)'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            'All formats decode to the same data.'
+        ))
+
+    def _recipes(self, rows):
+        return [
+            Recipe(
+                id=i + 1,
+                title=f'Benchmark Recipe {i}',
+                time_minutes=i % 120 + 1,
+                price=Decimal(i % 10000) / 100,
+                link=f'https://example.com/recipes/{i}',
+                description='Mix, bake and serve. ' * (i % 8),
+            )
+            for i in range(rows)
+        ]
+
+    def _measure(self, renderer, parser, data, repeat):
+        encode = decode = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            body = renderer.render(data, renderer.media_type)
+            elapsed = time.perf_counter() - started
+            encode = elapsed if encode is None else min(encode, elapsed)
+
+            started = time.perf_counter()
+            decoded = parser.parse(io.BytesIO(body), parser.media_type)
+            elapsed = time.perf_counter() - started
+            decode = elapsed if decode is None else min(decode, elapsed)
+
+        return encode, decode, len(body), decoded
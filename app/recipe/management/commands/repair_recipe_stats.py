@@ -0,0 +1,122 @@
+"""
+Django command recomputing the per-user recipe stats from core_recipe.
+The triggers keep them up to date, so drift only comes from writes that
+bypass them, like a restore with triggers disabled. Drifted rows are
+reported and, unless --dry-run is given, fixed. Writes to core_recipe
+wait while the stats are recomputed.
+"""
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Count, Max, Min, Sum
+
+from core.models import Recipe, RecipeStats
+
+FIELDS = (
+    'recipe_count', 'price_sum', 'price_min', 'price_max', 'time_minutes_sum',
+)
+EMPTY = {
+    'recipe_count': 0,
+    'price_sum': Decimal('0.00'),
+    'price_min': None,
+    'price_max': None,
+    'time_minutes_sum': 0,
+}
+
+
+class Command(BaseCommand):
+    """Django command to recompute the recipe stats"""
+    help = 'Recompute the per-user recipe stats and report drift.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report the drift without fixing it.',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        self.verbosity = options['verbosity']
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                # blocks the writes, so the triggers can not change the
+                # stats between the recount and the fix
+                cursor.execute(
+                    f'LOCK TABLE {Recipe._meta.db_table} IN SHARE MODE'
+                )
+            expected = self._recount()
+            stored = {
+                stats.user_id: stats
+                for stats in RecipeStats.objects.iterator()
+            }
+            missing, drifted = self._compare(expected, stored)
+            if not options['dry_run']:
+                RecipeStats.objects.bulk_create(
+                    missing, batch_size=options['batch_size'],
+                )
+                RecipeStats.objects.bulk_update(
+                    drifted, FIELDS, batch_size=options['batch_size'],
+                )
+
+        total = len(missing) + len(drifted)
+        checked = len(expected.keys() | stored.keys())
+        if not total:
+            self.stdout.write(self.style.SUCCESS(
+                f'Checked {checked} users, no drift.'
+            ))
+        elif options['dry_run']:
+            self.stdout.write(self.style.WARNING(
+                f'Checked {checked} users, {total} drifted '
+                f'({len(missing)} missing).'
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'Checked {checked} users, fixed {total} '
+                f'({len(missing)} missing).'
+            ))
+
+    def _recount(self):
+        rows = Recipe.objects.order_by().values('user').annotate(
+            recipe_count=Count('id'),
+            price_sum=Sum('price'),
+            price_min=Min('price'),
+            price_max=Max('price'),
+            time_minutes_sum=Sum('time_minutes'),
+        )
+
+        return {
+            row['user']: {field: row[field] for field in FIELDS}
+            for row in rows.iterator()
+        }
+
+    def _compare(self, expected, stored):
+        """Return the missing and the drifted rows, set to the recount."""
+        missing = []
+        drifted = []
+        for user_id in sorted(expected.keys() | stored.keys()):
+            values = expected.get(user_id, EMPTY)
+            stats = stored.get(user_id)
+            if stats is None:
+                self._report(user_id, 'missing')
+                missing.append(RecipeStats(user_id=user_id, **values))
+                continue
+
+            changes = [
+                f'{field} {getattr(stats, field)} != {values[field]}'
+                for field in FIELDS
+                if getattr(stats, field) != values[field]
+            ]
+            if changes:
+                self._report(user_id, ', '.join(changes))
+                for field in FIELDS:
+                    setattr(stats, field, values[field])
+                drifted.append(stats)
+
+        return missing, drifted
+
+    def _report(self, user_id, detail):
+        if self.verbosity >= 1:
+            self.stdout.write(f'user {user_id}: {detail}')
@@ -0,0 +1,136 @@
+"""
+Pagination classes for the Recipe API
+"""
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import F, Field, Func, Value
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import CursorPagination, _reverse_ordering
+from rest_framework.settings import api_settings
+
+
+class Row(Func):
+    """A row constructor, compared column by column as index keys are"""
+    function = 'ROW'
+    output_field = Field()
+
+
+class RecipeCursorPagination(CursorPagination):
+    """
+    Keyset pagination over the recipes of a user.
+
+    Pages are fetched with `id < last_seen` on the (user_id, -id) index,
+    so deep pages cost the same as the first one and no COUNT(*) is run.
+    Column orderings get the id, in the same direction, as a tie breaker,
+    and their cursors hold both values of the last row: pages start at
+    `(column, id) > (value, id)`, which is read straight off a
+    (user_id, column, id) index, inside a run of ties too.
+
+    Search results are paged by rank unless an ordering is requested.
+    Ranks are computed for all matches, their ties are skipped by offset
+    as DRF does. Only one ordering field may be requested.
+    """
+    ordering = '-id'
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    position_separator = '|'
+
+    def get_ordering(self, request, queryset, view):
+        requested = request.query_params.get(api_settings.ORDERING_PARAM, '')
+        if len([field for field in requested.split(',') if field.strip()]) > 1:
+            raise ValidationError({api_settings.ORDERING_PARAM: [
+                _('Only one ordering field is supported.')
+            ]})
+
+        ordering = tuple(super().get_ordering(request, queryset, view))
+        if ordering == (self.ordering,):
+            if 'rank' in queryset.query.annotations:
+                return ('-rank', '-id')
+            return ordering
+
+        field = ordering[0]
+        tie_breaker = '-id' if field.startswith('-') else 'id'
+
+        return (field, tie_breaker)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        ordering = self.get_ordering(request, queryset, view)
+        # a unique column, or an annotation no index can be seeked on
+        self.keyset = len(ordering) > 1 and (
+            ordering[0].lstrip('-') not in queryset.query.annotations
+        )
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = ordering
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            (offset, reverse, current_position) = (0, False, None)
+        else:
+            (offset, reverse, current_position) = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(ordering))
+        else:
+            queryset = queryset.order_by(*ordering)
+        if current_position is not None:
+            queryset = self._seek(queryset, current_position, reverse)
+
+        # positions are unique, so the offset is 0 in the cursors built
+        # here and the page after a position is always found by seeking
+        results = list(queryset[offset:offset + self.page_size + 1])
+        self.page = results[:self.page_size]
+        following_position = None
+        if len(results) > len(self.page):
+            following_position = self._get_position_from_instance(
+                results[-1], ordering,
+            )
+
+        has_current = current_position is not None or offset > 0
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.next_position = has_current, current_position
+            self.has_previous = following_position is not None
+            self.previous_position = following_position
+        else:
+            self.has_next = following_position is not None
+            self.next_position = following_position
+            self.has_previous = has_current
+            self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def _seek(self, queryset, position, reverse):
+        """Keep the rows after the position, in the order of the page."""
+        field_name = self.ordering[0].lstrip('-')
+        value, _separator, pk = position.rpartition(self.position_separator)
+        try:
+            value = queryset.model._meta.get_field(field_name).to_python(value)
+            pk = int(pk)
+        except (DjangoValidationError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+        descending = self.ordering[0].startswith('-')
+        lookup = 'lt' if reverse != descending else 'gt'
+        # a row comparison, unlike `column > value OR (column = value AND
+        # id > pk)`, gives the index scan a key to start from
+        return queryset.alias(
+            keyset=Row(F(field_name), F('id')),
+        ).filter(**{f'keyset__{lookup}': Row(Value(value), Value(pk))})
+
+    def _get_position_from_instance(self, instance, ordering):
+        position = super()._get_position_from_instance(instance, ordering)
+        if not self.keyset:
+            return position
+
+        pk = instance['id'] if isinstance(instance, dict) else instance.id
+        return f'{position}{self.position_separator}{pk}'
@@ -1,6 +1,14 @@
+from decimal import ROUND_HALF_UP, Decimal
+from functools import lru_cache
+from typing import Optional
+
+from django.conf import settings
+from django.utils.translation import gettext as _
+
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 
-from core.models import Recipe
+from core.models import Recipe, RecipeStats
 
 
 class RecipeSerializer(serializers.ModelSerializer):
@@ -14,8 +22,158 @@ class RecipeSerializer(serializers.ModelSerializer):
         read_only_fields = ('id',)
 
 
+class RecipeSearchSerializer(RecipeSerializer):
+    """Serializer for recipe search results"""
+    rank = serializers.FloatField(read_only=True)
+    headline = serializers.CharField(read_only=True)
+
+    class Meta(RecipeSerializer.Meta):
+        fields = RecipeSerializer.Meta.fields + ('rank', 'headline')
+
+
+class RecipeValuesSerializer(serializers.BaseSerializer):
+    """
+    Read-only fast path for recipe lists. Turns rows of `.values()` into
+    the same primitives RecipeSerializer produces, without building model
+    instances or running the per-field serializers.
+    """
+    fields = RecipeSerializer.Meta.fields
+    price_quantum = Decimal('0.01')
+
+    def to_representation(self, row):
+        data = {field: row[field] for field in self.fields}
+        if 'price' in data:
+            price = data['price'].quantize(self.price_quantum, ROUND_HALF_UP)
+            if api_settings.COERCE_DECIMAL_TO_STRING:
+                price = '{:f}'.format(price)
+            data['price'] = price
+
+        return data
+
+
+class RecipeSearchValuesSerializer(RecipeValuesSerializer):
+    """Read-only fast path for recipe search results"""
+    fields = RecipeSearchSerializer.Meta.fields
+
+
+class RecipeStatsSerializer(serializers.ModelSerializer):
+    """Serializer for the recipe summary of a user"""
+    average_price = serializers.DecimalField(
+        max_digits=14, decimal_places=2, rounding=ROUND_HALF_UP,
+        read_only=True,
+    )
+    min_price = serializers.DecimalField(
+        source='price_min', max_digits=5, decimal_places=2, read_only=True,
+    )
+    max_price = serializers.DecimalField(
+        source='price_max', max_digits=5, decimal_places=2, read_only=True,
+    )
+    average_time_minutes = serializers.SerializerMethodField()
+
+    class Meta:
+        model = RecipeStats
+        fields = (
+            'recipe_count', 'average_price', 'min_price', 'max_price',
+            'average_time_minutes',
+        )
+        read_only_fields = fields
+
+    def get_average_time_minutes(self, stats) -> Optional[float]:
+        average = stats.average_time_minutes
+        return None if average is None else round(average, 1)
+
+
 class RecipeDetailSerializer(RecipeSerializer):
     """Serializer for recipe detail object"""
 
     class Meta(RecipeSerializer.Meta):
         fields = RecipeSerializer.Meta.fields + ('description',)
+
+
+class RecipeBulkUpdateSerializer(RecipeDetailSerializer):
+    """Serializer for one item of a bulk recipe update"""
+    id = serializers.IntegerField(min_value=1)
+
+    class Meta(RecipeDetailSerializer.Meta):
+        read_only_fields = ()
+        extra_kwargs = {
+            field: {'required': False}
+            for field in RecipeDetailSerializer.Meta.fields
+        }
+
+
+class RecipeBulkSerializer(serializers.Serializer):
+    """Serializer for a batch of recipe create, update and delete operations"""
+    create = RecipeDetailSerializer(many=True, required=False)
+    update = RecipeBulkUpdateSerializer(many=True, required=False)
+    delete = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+    )
+
+    def validate(self, attrs):
+        total = sum(len(items) for items in attrs.values())
+        if not total:
+            raise serializers.ValidationError(
+                _('At least one operation is required.'),
+                code='empty',
+            )
+        if total > settings.RECIPE_BULK_MAX_ITEMS:
+            raise serializers.ValidationError(
+                _('At most %(max)d operations are allowed per request.')
+                % {'max': settings.RECIPE_BULK_MAX_ITEMS},
+                code='max_items',
+            )
+
+        errors = {}
+        update_ids = [item['id'] for item in attrs.get('update', [])]
+        update_errors = _duplicate_errors(update_ids)
+        if update_errors:
+            errors['update'] = update_errors
+
+        delete_ids = attrs.get('delete', [])
+        delete_errors = _duplicate_errors(delete_ids, set(update_ids))
+        if delete_errors:
+            errors['delete'] = delete_errors
+
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        return attrs
+
+
+def get_field_names(serializer_class):
+    """Return the names of the fields a serializer class outputs."""
+    if issubclass(serializer_class, RecipeValuesSerializer):
+        return serializer_class.fields
+
+    return serializer_class.Meta.fields
+
+
+@lru_cache(maxsize=None)
+def narrow_serializer(serializer_class, fields):
+    """
+    Return a subclass of the serializer that only outputs `fields`.
+    Classes are cached, there is at most one per serializer and field set.
+    """
+    if issubclass(serializer_class, RecipeValuesSerializer):
+        attrs = {'fields': fields}
+    else:
+        meta = type('Meta', (serializer_class.Meta,), {'fields': fields})
+        attrs = {'Meta': meta}
+
+    return type(serializer_class.__name__, (serializer_class,), attrs)
+
+
+def _duplicate_errors(ids, taken=()):
+    """Return per-item errors for ids listed more than once."""
+    seen = set(taken)
+    errors = []
+    for recipe_id in ids:
+        if recipe_id in seen:
+            errors.append({'id': [_('Recipe is listed more than once.')]})
+        else:
+            errors.append({})
+        seen.add(recipe_id)
+
+    return errors if any(errors) else []
@@ -0,0 +1,15 @@
+"""
+Signal handlers for the Recipe API
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.models import Recipe
+from .cache import bump_user_version
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def invalidate_recipe_cache(sender, instance, **kwargs):
+    """Drop cached responses of the recipe owner on any change"""
+    bump_user_version(instance.user_id)
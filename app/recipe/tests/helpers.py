@@ -0,0 +1,39 @@
+"""
+Helpers shared by the Recipe API tests.
+"""
+from decimal import Decimal
+
+from django.urls import reverse
+
+from core.models import Recipe
+
+
+def detail_url(recipe_id):
+    """Return recipe detail URL."""
+    return reverse('recipe:recipe-detail', args=[recipe_id])
+
+
+def create_recipe(user, **params):
+    """Create a sample recipe object."""
+    defaults = {
+        'title': 'Sample Recipe',
+        'time_minutes': 20,
+        'price': Decimal('7.50'),
+    }
+    defaults.update(params)
+
+    return Recipe.objects.create(user=user, **defaults)
+
+
+def create_recipes(user, count, **params):
+    """Create `count` sample recipes for the user in one query."""
+    defaults = {
+        'time_minutes': 20,
+        'price': Decimal('7.50'),
+    }
+    defaults.update(params)
+
+    return Recipe.objects.bulk_create(
+        Recipe(user=user, title=f'Sample Recipe {i}', **defaults)
+        for i in range(count)
+    )
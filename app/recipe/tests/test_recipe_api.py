@@ -12,30 +12,11 @@ from recipe.serializers import (
     RecipeSerializer,
     RecipeDetailSerializer,
 )
+from recipe.tests.helpers import create_recipe, detail_url
 
 RECIPES_URL = reverse('recipe:recipe-list')
 
 
-def detail_url(recipe_id):
-    """Return recipe detail URL."""
-    return reverse('recipe:recipe-detail', args=[recipe_id])
-
-
-def create_recipe(user, **params):
-    """Create a sample recipe object."""
-    defaults = {
-        'title': 'Sample Recipe',
-        'time_minutes': 20,
-        'price': Decimal('7.50'),
-        'description': 'Sample description',
-        'link': 'https://sample.com',
-    }
-    defaults.update(params)
-
-    recipe = Recipe.objects.create(user=user, **defaults)
-    return recipe
-
-
 @pytest.mark.django_db
 class TestPublicRecipeAPI:
     """Tests for public recipe endpoints."""
@@ -62,11 +43,15 @@ class TestPrivateRecipeAPI:
         self.test_user_2 = test_user_2
         self.recipe_1 = create_recipe(
             user=self.test_user,
-            title='Sample Recipe 1'
+            title='Sample Recipe 1',
+            description='Sample description',
+            link='https://sample.com',
             )
         self.recipe_2 = create_recipe(
             user=self.test_user,
-            title='Sample Recipe 2'
+            title='Sample Recipe 2',
+            description='Sample description',
+            link='https://sample.com',
             )
 
     def test_retrieve_recipes_success(self):
@@ -76,7 +61,7 @@ class TestPrivateRecipeAPI:
         serializer = RecipeSerializer(recipes, many=True)
 
         assert res.status_code == status.HTTP_200_OK
-        assert res.data == serializer.data
+        assert res.data['results'] == serializer.data
 
     def test_recipes_limited_to_user(self):
         """Test retrieving recipes only for authenticated user."""
@@ -87,7 +72,7 @@ class TestPrivateRecipeAPI:
         serializer = RecipeSerializer(recipes, many=True)
 
         assert res.status_code == status.HTTP_200_OK
-        assert res.data == serializer.data
+        assert res.data['results'] == serializer.data
 
     def test_recipe_detail_success(self):
         url = detail_url(self.recipe_1.id)
@@ -100,7 +85,7 @@ class TestPrivateRecipeAPI:
 
     def test_recipe_list_doesnt_return_description_field(self):
         res = self.client.get(RECIPES_URL)
-        assert 'description' not in res.data[0]
+        assert 'description' not in res.data['results'][0]
 
     def test_recipe_details_returns_description_field(self):
         url = detail_url(self.recipe_1.id)
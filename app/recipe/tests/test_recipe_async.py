@@ -0,0 +1,117 @@
+"""
+Tests for the async read-only recipe and profile views.
+"""
+
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import reverse
+import pytest
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from recipe.tests.helpers import create_recipe
+
+RECIPES_URL = reverse('recipe:recipe-list')
+ASYNC_RECIPES_URL = reverse('recipe:recipe-list-async')
+PROFILE_URL = reverse('user:profile-async')
+
+
+def async_detail_url(recipe_id):
+    """Create and return an async recipe detail URL."""
+    return reverse('recipe:recipe-detail-async', args=[recipe_id])
+
+
+@pytest.mark.django_db
+class TestAsyncRecipeViews:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, client, test_user, test_user_2):
+        self.token = Token.objects.create(user=test_user)
+        self.client = client
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token}')
+        self.test_user = test_user
+        self.recipes = [
+            create_recipe(
+                user=test_user, title=f'Tomato dish {i}',
+                description='Sample description',
+            )
+            for i in range(3)
+        ]
+        self.other = create_recipe(user=test_user_2)
+
+    def asgi_get(self, url):
+        """GET the url through the ASGI handler."""
+        # the async client takes headers by their plain names
+        return async_to_sync(AsyncClient().get)(
+            url, authorization=f'Token {self.token}',
+        )
+
+    def test_list_matches_sync_view(self):
+        query = '?page_size=2&search=tomato&fields=id,title,rank'
+
+        res = self.client.get(ASYNC_RECIPES_URL + query)
+
+        assert res.status_code == status.HTTP_200_OK
+        expected = self.client.get(RECIPES_URL + query).json()
+        assert res.json()['results'] == expected['results']
+        assert res.json()['next'].startswith(
+            f'http://testserver{ASYNC_RECIPES_URL}?cursor='
+        )
+
+    def test_detail(self):
+        recipe = self.recipes[0]
+
+        res = self.client.get(async_detail_url(recipe.id))
+
+        assert res.status_code == status.HTTP_200_OK
+        assert res.json()['title'] == recipe.title
+        assert res.json()['description'] == recipe.description
+
+    def test_detail_of_other_user_not_found(self):
+        res = self.client.get(async_detail_url(self.other.id))
+
+        assert res.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_invalid_parameters(self):
+        res = self.client.get(f'{ASYNC_RECIPES_URL}?fields=user')
+
+        assert res.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'fields' in res.json()
+
+    def test_auth_required(self):
+        self.client.credentials()
+
+        res = self.client.get(ASYNC_RECIPES_URL)
+
+        assert res.status_code == status.HTTP_401_UNAUTHORIZED
+        assert res['WWW-Authenticate'] == 'Token'
+
+    def test_invalid_token(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Token invalid')
+
+        res = self.client.get(PROFILE_URL)
+
+        assert res.status_code == status.HTTP_401_UNAUTHORIZED
+        assert res.json()['detail'] == 'Invalid token.'
+
+    def test_writes_not_allowed(self):
+        res = self.client.post(ASYNC_RECIPES_URL, {'title': 'New'})
+
+        assert res.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
+
+    def test_profile(self):
+        res = self.client.get(PROFILE_URL)
+
+        assert res.status_code == status.HTTP_200_OK
+        assert res.json() == {
+            'email': self.test_user.email,
+            'name': self.test_user.name,
+        }
+
+    def test_served_natively_under_asgi(self):
+        res = self.asgi_get(ASYNC_RECIPES_URL)
+
+        assert res.status_code == status.HTTP_200_OK
+        assert len(res.json()['results']) == 3
+        # the queries run in the thread pool are still timed
+        assert 'desc="2 queries"' in res['Server-Timing']
@@ -0,0 +1,159 @@
+"""
+Tests for the bulk recipe API.
+"""
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+import pytest
+
+from core.models import Recipe
+from rest_framework import status
+from recipe.tests.helpers import create_recipe
+
+BULK_URL = reverse('recipe:recipe-bulk')
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+def recipe_payload(index):
+    """Return a payload for a new recipe."""
+    return {
+        'title': f'Bulk Recipe {index}',
+        'time_minutes': 10,
+        'price': '2.50',
+    }
+
+
+@pytest.mark.django_db
+class TestRecipeBulkAPI:
+    """Tests for bulk create, update and delete of recipes."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, client, test_user, test_user_2):
+        self.client = client
+        self.client.force_authenticate(test_user)
+        self.test_user = test_user
+        self.test_user_2 = test_user_2
+        self.recipe_1 = create_recipe(user=test_user, title='Recipe 1')
+        self.recipe_2 = create_recipe(user=test_user, title='Recipe 2')
+
+    def test_auth_required(self):
+        self.client.force_authenticate(None)
+
+        res = self.client.post(BULK_URL, {}, format='json')
+
+        assert res.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_mixed_operations_success(self):
+        payload = {
+            'create': [recipe_payload(1)],
+            'update': [{'id': self.recipe_1.id, 'price': '9.99'}],
+            'delete': [self.recipe_2.id],
+        }
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        assert res.status_code == status.HTTP_200_OK
+        created = Recipe.objects.get(id=res.data['created'][0]['id'])
+        assert created.user == self.test_user
+        assert created.title == 'Bulk Recipe 1'
+        self.recipe_1.refresh_from_db()
+        assert self.recipe_1.price == Decimal('9.99')
+        assert self.recipe_1.title == 'Recipe 1'
+        assert res.data['updated'][0]['price'] == '9.99'
+        assert res.data['deleted'] == [self.recipe_2.id]
+        assert not Recipe.objects.filter(id=self.recipe_2.id).exists()
+
+    def test_update_bumps_updated_at(self):
+        original = self.recipe_1.updated_at
+        payload = {'update': [{'id': self.recipe_1.id, 'title': 'New'}]}
+
+        self.client.post(BULK_URL, payload, format='json')
+
+        self.recipe_1.refresh_from_db()
+        assert self.recipe_1.updated_at > original
+
+    def test_thousand_creates_in_constant_queries(self):
+        payload = {'create': [recipe_payload(i) for i in range(1000)]}
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.post(BULK_URL, payload, format='json')
+
+        assert res.status_code == status.HTTP_200_OK
+        assert len(res.data['created']) == 1000
+        assert Recipe.objects.filter(user=self.test_user).count() == 1002
+        assert len(queries) < 10
+
+    def test_too_many_operations_rejected(self):
+        payload = {
+            'create': [recipe_payload(i) for i in range(1000)],
+            'delete': [self.recipe_1.id],
+        }
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        assert res.status_code == status.HTTP_400_BAD_REQUEST
+        assert Recipe.objects.filter(user=self.test_user).count() == 2
+
+    def test_empty_payload_rejected(self):
+        res = self.client.post(BULK_URL, {}, format='json')
+
+        assert res.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_invalid_item_reported_per_item(self):
+        invalid = recipe_payload(2)
+        invalid['price'] = '-1.00'
+        payload = {'create': [recipe_payload(1), invalid]}
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        assert res.status_code == status.HTTP_400_BAD_REQUEST
+        assert res.data['create'][0] == {}
+        assert 'price' in res.data['create'][1]
+        assert Recipe.objects.filter(user=self.test_user).count() == 2
+
+    def test_other_users_recipes_not_touched(self):
+        other = create_recipe(user=self.test_user_2, title='Not yours')
+        payload = {
+            'create': [recipe_payload(1)],
+            'update': [
+                {'id': self.recipe_1.id, 'title': 'Mine'},
+                {'id': other.id, 'title': 'Stolen'},
+            ],
+            'delete': [other.id + 1000],
+        }
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        assert res.status_code == status.HTTP_400_BAD_REQUEST
+        assert res.data['update'][0] == {}
+        assert 'id' in res.data['update'][1]
+        assert 'id' in res.data['delete'][0]
+        other.refresh_from_db()
+        self.recipe_1.refresh_from_db()
+        assert other.title == 'Not yours'
+        assert self.recipe_1.title == 'Recipe 1'
+        assert not Recipe.objects.filter(title='Bulk Recipe 1').exists()
+
+    def test_duplicate_ids_rejected(self):
+        payload = {
+            'update': [{'id': self.recipe_1.id, 'title': 'New'}],
+            'delete': [self.recipe_1.id],
+        }
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        assert res.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'id' in res.data['delete'][0]
+        assert Recipe.objects.filter(id=self.recipe_1.id).exists()
+
+    def test_bulk_invalidates_cached_list(self):
+        self.client.get(RECIPES_URL)
+        payload = {'create': [recipe_payload(1)]}
+
+        self.client.post(BULK_URL, payload, format='json')
+        res = self.client.get(RECIPES_URL)
+
+        assert res['X-Cache'] == 'MISS'
+        assert len(res.data['results']) == 3
@@ -0,0 +1,110 @@
+"""
+Tests for the per-user recipe response cache.
+"""
+
+from django.test import override_settings
+from django.urls import reverse
+import pytest
+
+from rest_framework import status
+from recipe.cache import get_cache_stats
+from recipe.tests.helpers import create_recipe, detail_url
+
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+@pytest.mark.django_db
+class TestRecipeResponseCache:
+    """Tests for caching of recipe list and detail responses."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, client, test_user, test_user_2):
+        self.client = client
+        self.client.force_authenticate(test_user)
+        self.test_user = test_user
+        self.test_user_2 = test_user_2
+        self.recipe = create_recipe(user=test_user, title='Cached Recipe')
+
+    def test_second_list_request_is_a_hit(self):
+        first = self.client.get(RECIPES_URL)
+        second = self.client.get(RECIPES_URL)
+
+        assert first['X-Cache'] == 'MISS'
+        assert second['X-Cache'] == 'HIT'
+        assert second.data == first.data
+        assert get_cache_stats() == {'hits': 1, 'misses': 1}
+
+    def test_detail_request_is_cached(self):
+        self.client.get(detail_url(self.recipe.id))
+        res = self.client.get(detail_url(self.recipe.id))
+
+        assert res.status_code == status.HTTP_200_OK
+        assert res['X-Cache'] == 'HIT'
+        assert res.data['title'] == 'Cached Recipe'
+
+    def test_create_through_api_invalidates_list(self):
+        self.client.get(RECIPES_URL)
+        payload = {'title': 'New', 'time_minutes': 5, 'price': '1.00'}
+
+        self.client.post(RECIPES_URL, payload)
+        res = self.client.get(RECIPES_URL)
+
+        assert res['X-Cache'] == 'MISS'
+        assert len(res.data['results']) == 2
+
+    def test_patch_invalidates_detail(self):
+        url = detail_url(self.recipe.id)
+        self.client.get(url)
+
+        self.client.patch(url, {'title': 'Renamed'})
+        res = self.client.get(url)
+
+        assert res['X-Cache'] == 'MISS'
+        assert res.data['title'] == 'Renamed'
+
+    def test_orm_save_and_delete_invalidate_list(self):
+        self.client.get(RECIPES_URL)
+        self.recipe.title = 'Changed outside the API'
+        self.recipe.save()
+
+        res = self.client.get(RECIPES_URL)
+        assert res.data['results'][0]['title'] == 'Changed outside the API'
+
+        self.recipe.delete()
+        res = self.client.get(RECIPES_URL)
+        assert res.data['results'] == []
+
+    def test_cache_is_per_user(self):
+        self.client.get(RECIPES_URL)
+        self.client.force_authenticate(self.test_user_2)
+
+        res = self.client.get(RECIPES_URL)
+
+        assert res['X-Cache'] == 'MISS'
+        assert res.data['results'] == []
+
+    def test_other_user_write_keeps_cache(self):
+        self.client.get(RECIPES_URL)
+        create_recipe(user=self.test_user_2)
+
+        res = self.client.get(RECIPES_URL)
+
+        assert res['X-Cache'] == 'HIT'
+
+    def test_file_based_backend(self, tmp_path):
+        caches = {
+            'default': {
+                'BACKEND': 'django.core.cache.backends.filebased.'
+                           'FileBasedCache',
+                'LOCATION': str(tmp_path),
+            }
+        }
+        with override_settings(CACHES=caches):
+            self.client.get(RECIPES_URL)
+            res = self.client.get(RECIPES_URL)
+            assert res['X-Cache'] == 'HIT'
+
+            self.recipe.delete()
+            res = self.client.get(RECIPES_URL)
+            assert res['X-Cache'] == 'MISS'
+            assert res.data['results'] == []
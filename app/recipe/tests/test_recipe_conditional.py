@@ -0,0 +1,129 @@
+"""
+Tests for conditional GET requests on the recipe APIs.
+"""
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.http import http_date
+import pytest
+
+from rest_framework import status
+from recipe.tests.helpers import create_recipe, detail_url
+
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+@pytest.mark.django_db
+class TestRecipeConditionalGet:
+    """Tests for ETag and Last-Modified handling of recipes."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, client, test_user):
+        self.client = client
+        self.client.force_authenticate(test_user)
+        self.test_user = test_user
+        self.recipe = create_recipe(user=test_user)
+
+    def test_updated_at_changes_on_save(self):
+        original = self.recipe.updated_at
+
+        self.recipe.title = 'Changed'
+        self.recipe.save()
+
+        assert self.recipe.updated_at > original
+
+    def test_responses_carry_validators(self):
+        for url in (RECIPES_URL, detail_url(self.recipe.id)):
+            res = self.client.get(url)
+
+            assert res.status_code == status.HTTP_200_OK
+            assert res['ETag'].startswith('"')
+        assert res['Last-Modified']
+
+    def test_list_if_none_match_not_modified(self):
+        etag = self.client.get(RECIPES_URL)['ETag']
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+
+        assert res.status_code == status.HTTP_304_NOT_MODIFIED
+        assert res['ETag'] == etag
+        assert res.content == b''
+        assert len(queries) == 0
+
+    def test_list_cache_hit_runs_no_queries(self):
+        etag = self.client.get(RECIPES_URL)['ETag']
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(RECIPES_URL)
+
+        assert res['X-Cache'] == 'HIT'
+        assert res['ETag'] == etag
+        assert len(queries) == 0
+
+    def test_detail_if_none_match_not_modified(self):
+        url = detail_url(self.recipe.id)
+        etag = self.client.get(url)['ETag']
+
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert res.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_detail_if_modified_since_not_modified(self):
+        url = detail_url(self.recipe.id)
+        last_modified = self.client.get(url)['Last-Modified']
+
+        res = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        assert res.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_detail_modified_since_old_date(self):
+        url = detail_url(self.recipe.id)
+
+        res = self.client.get(url, HTTP_IF_MODIFIED_SINCE=http_date(0))
+
+        assert res.status_code == status.HTTP_200_OK
+
+    def test_update_changes_etag(self):
+        url = detail_url(self.recipe.id)
+        etag = self.client.get(url)['ETag']
+
+        self.client.patch(url, {'title': 'Renamed'})
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert res.status_code == status.HTTP_200_OK
+        assert res['ETag'] != etag
+        assert res.data['title'] == 'Renamed'
+
+    def test_delete_changes_list_etag(self):
+        other = create_recipe(user=self.test_user)
+        etag = self.client.get(RECIPES_URL)['ETag']
+
+        other.delete()
+        res = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+
+        assert res.status_code == status.HTTP_200_OK
+        assert len(res.data['results']) == 1
+
+    def test_change_outside_api_changes_list_etag(self):
+        etag = self.client.get(RECIPES_URL)['ETag']
+
+        self.recipe.title = 'Changed'
+        self.recipe.save()
+        res = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+
+        assert res.status_code == status.HTTP_200_OK
+        assert res.data['results'][0]['title'] == 'Changed'
+
+    def test_etag_differs_per_page(self):
+        create_recipe(user=self.test_user)
+        first = self.client.get(f'{RECIPES_URL}?page_size=1')
+        second = self.client.get(first.data['next'])
+
+        assert first['ETag'] != second['ETag']
+
+    def test_missing_recipe_returns_not_found(self):
+        res = self.client.get(detail_url(self.recipe.id + 1000))
+
+        assert res.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,109 @@
+"""
+Tests for the streaming recipe export.
+"""
+import csv
+import io
+import json
+import tracemalloc
+
+from django.urls import reverse
+import pytest
+
+from core.models import Recipe
+from rest_framework import status
+from recipe.tests.helpers import create_recipes
+
+EXPORT_URL = reverse('recipe:recipe-export')
+
+
+@pytest.mark.django_db
+class TestRecipeExport:
+    """Tests for exporting recipes as NDJSON and CSV."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, client, test_user, test_user_2):
+        self.client = client
+        self.client.force_authenticate(test_user)
+        self.test_user = test_user
+        create_recipes(test_user, 3, description='Sample description')
+        create_recipes(test_user_2, 2, description='Sample description')
+
+    def test_auth_required(self):
+        self.client.force_authenticate(None)
+
+        res = self.client.get(EXPORT_URL)
+
+        assert res.status_code == status.HTTP_401_UNAUTHORIZED
+
+    @pytest.mark.parametrize('accept, status_code', [
+        ('text/csv', status.HTTP_401_UNAUTHORIZED),
+        ('application/x-ndjson', status.HTTP_401_UNAUTHORIZED),
+        ('application/xml', status.HTTP_406_NOT_ACCEPTABLE),
+    ])
+    def test_errors_are_json(self, accept, status_code):
+        """Test error bodies are labelled JSON, whatever was accepted."""
+        self.client.force_authenticate(None)
+
+        res = self.client.get(EXPORT_URL, HTTP_ACCEPT=accept)
+
+        assert res.status_code == status_code
+        assert res['Content-Type'] == 'application/json'
+        assert 'detail' in json.loads(res.content)
+        assert not res.has_header('Content-Disposition')
+
+    def test_export_ndjson(self):
+        res = self.client.get(EXPORT_URL)
+
+        assert res.status_code == status.HTTP_200_OK
+        assert res.streaming
+        assert res['Content-Type'].startswith('application/x-ndjson')
+        lines = b''.join(res.streaming_content).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+        expected = Recipe.objects.filter(
+            user=self.test_user,
+        ).order_by('-id')
+        assert [row['id'] for row in rows] == [r.id for r in expected]
+        assert rows[0]['price'] == '7.50'
+        assert rows[0]['description'] == 'Sample description'
+
+    def test_export_csv(self):
+        res = self.client.get(EXPORT_URL, HTTP_ACCEPT='text/csv')
+
+        assert res.status_code == status.HTTP_200_OK
+        assert res['Content-Type'].startswith('text/csv')
+        content = b''.join(res.streaming_content).decode()
+        rows = list(csv.DictReader(io.StringIO(content)))
+        assert len(rows) == 3
+        assert rows[0]['price'] == '7.50'
+        assert 'recipes.csv' in res['Content-Disposition']
+
+    def test_export_csv_format_override(self):
+        res = self.client.get(f'{EXPORT_URL}?format=csv')
+
+        assert res['Content-Type'].startswith('text/csv')
+
+    def test_empty_csv_export_has_header(self):
+        Recipe.objects.filter(user=self.test_user).delete()
+
+        res = self.client.get(f'{EXPORT_URL}?format=csv')
+
+        content = b''.join(res.streaming_content).decode()
+        assert content.splitlines() == [
+            'id,title,time_minutes,price,link,description'
+        ]
+
+    def test_export_memory_stays_bounded(self, settings):
+        """Test peak memory depends on the chunk size, not the row count."""
+        settings.RECIPE_EXPORT_CHUNK_SIZE = 200
+        create_recipes(self.test_user, 5000, description='x' * 2000)
+
+        res = self.client.get(EXPORT_URL)
+        tracemalloc.start()
+        total = 0
+        for chunk in res.streaming_content:
+            total += len(chunk)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        assert total > 10_000_000
+        assert peak < 3_000_000
@@ -0,0 +1,132 @@
+"""
+Tests for sparse fieldsets of the recipe API.
+"""
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+import pytest
+
+from rest_framework import status
+from recipe import serializers
+from recipe.tests.helpers import create_recipe, detail_url
+
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+def select_clause(queries):
+    """Return the column list of the last SELECT on the recipe table."""
+    sql = [
+        query['sql'] for query in queries
+        if 'FROM "core_recipe"' in query['sql']
+    ][-1]
+
+    return sql.split(' FROM ')[0]
+
+
+@pytest.mark.django_db
+class TestRecipeSparseFields:
+    """Tests for the fields and exclude parameters."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, client, test_user):
+        self.client = client
+        self.client.force_authenticate(test_user)
+        self.test_user = test_user
+        self.recipe = create_recipe(
+            user=test_user, title='Tomato soup',
+            description='A very long description',
+        )
+
+    def test_list_fields(self):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(f'{RECIPES_URL}?fields=title,id')
+
+        assert res.status_code == status.HTTP_200_OK
+        assert res.data['results'] == [
+            {'id': self.recipe.id, 'title': 'Tomato soup'},
+        ]
+        assert '"price"' not in select_clause(queries)
+
+    def test_list_exclude(self):
+        res = self.client.get(f'{RECIPES_URL}?exclude=link,price')
+
+        assert set(res.data['results'][0]) == {'id', 'title', 'time_minutes'}
+
+    def test_list_pages_without_ordering_field(self):
+        for price in ('1.00', '2.00', '3.00'):
+            create_recipe(user=self.test_user, price=Decimal(price))
+        url = f'{RECIPES_URL}?ordering=price&page_size=2&fields=title'
+
+        titles = []
+        while url:
+            res = self.client.get(url)
+            assert res.status_code == status.HTTP_200_OK
+            titles.extend(recipe['title'] for recipe in res.data['results'])
+            url = res.data['next']
+
+        assert titles[-1] == 'Tomato soup'
+        assert len(titles) == 4
+
+    def test_search_without_headline(self):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(
+                f'{RECIPES_URL}?search=tomato&exclude=headline'
+            )
+
+        assert set(res.data['results'][0]) == {
+            'id', 'title', 'time_minutes', 'price', 'link', 'rank',
+        }
+        assert 'ts_headline' not in select_clause(queries)
+
+    def test_detail_fields(self):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(
+                f'{detail_url(self.recipe.id)}?fields=title'
+            )
+
+        assert res.status_code == status.HTTP_200_OK
+        assert res.data == {'title': 'Tomato soup'}
+        assert '"description"' not in select_clause(queries)
+
+    def test_detail_exclude(self):
+        res = self.client.get(
+            f'{detail_url(self.recipe.id)}?exclude=description'
+        )
+
+        assert 'description' not in res.data
+        assert res.data['title'] == 'Tomato soup'
+
+    def test_unknown_field(self):
+        res = self.client.get(f'{RECIPES_URL}?fields=title,user')
+
+        assert res.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'fields' in res.data
+
+    def test_no_fields_left(self):
+        res = self.client.get(
+            f'{detail_url(self.recipe.id)}?fields=title&exclude=title'
+        )
+
+        assert res.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_updates_ignore_fields(self):
+        res = self.client.patch(
+            f'{detail_url(self.recipe.id)}?fields=title',
+            {'description': 'Short'},
+        )
+
+        assert res.status_code == status.HTTP_200_OK
+        assert res.data['description'] == 'Short'
+
+    def test_narrowed_serializers_are_cached(self):
+        first = serializers.narrow_serializer(
+            serializers.RecipeDetailSerializer, ('id', 'title')
+        )
+        second = serializers.narrow_serializer(
+            serializers.RecipeDetailSerializer, ('id', 'title')
+        )
+
+        assert first is second
+        assert tuple(first().fields) == ('id', 'title')
@@ -0,0 +1,227 @@
+"""
+Tests for filtering and ordering the recipe list.
+"""
+import base64
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+import pytest
+
+from core.models import Recipe
+from rest_framework import status
+from recipe.tests.helpers import create_recipe
+
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+def explain(sql):
+    """Return the query plan of the SQL."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN {sql}')
+        return '\n'.join(row[0] for row in cursor.fetchall())
+
+
+@pytest.mark.django_db
+class TestRecipeFilters:
+    """Tests for range, prefix and ordering parameters."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, client, test_user, test_user_2):
+        self.client = client
+        self.client.force_authenticate(test_user)
+        self.quick_cheap = create_recipe(
+            user=test_user, title='Quick salad',
+            time_minutes=10, price=Decimal('4.00'),
+        )
+        self.quick_pricey = create_recipe(
+            user=test_user, title='Quick steak',
+            time_minutes=25, price=Decimal('19.00'),
+        )
+        self.slow_cheap = create_recipe(
+            user=test_user, title='Slow stew',
+            time_minutes=180, price=Decimal('6.00'),
+        )
+        create_recipe(
+            user=test_user_2, title='Quick toast',
+            time_minutes=5, price=Decimal('1.00'),
+        )
+
+    def get_ids(self, query):
+        res = self.client.get(f'{RECIPES_URL}?{query}')
+        assert res.status_code == status.HTTP_200_OK
+        return [recipe['id'] for recipe in res.data['results']]
+
+    def test_under_30_minutes_and_10_dollars(self):
+        ids = self.get_ids('time_minutes_max=30&price_max=10')
+
+        assert ids == [self.quick_cheap.id]
+
+    def test_minimum_bounds(self):
+        ids = self.get_ids('time_minutes_min=20&price_min=6')
+
+        assert ids == [self.slow_cheap.id, self.quick_pricey.id]
+
+    def test_title_prefix(self):
+        ids = self.get_ids('title=Quick')
+
+        assert ids == [self.quick_pricey.id, self.quick_cheap.id]
+
+    def test_invalid_filter_value(self):
+        res = self.client.get(f'{RECIPES_URL}?price_max=cheap')
+
+        assert res.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'price_max' in res.data
+
+    @pytest.mark.parametrize('ordering,expected', [
+        ('time_minutes', ['quick_cheap', 'quick_pricey', 'slow_cheap']),
+        ('-time_minutes', ['slow_cheap', 'quick_pricey', 'quick_cheap']),
+        ('price', ['quick_cheap', 'slow_cheap', 'quick_pricey']),
+        ('-price', ['quick_pricey', 'slow_cheap', 'quick_cheap']),
+    ])
+    def test_ordering(self, ordering, expected):
+        ids = self.get_ids(f'ordering={ordering}')
+
+        assert ids == [getattr(self, name).id for name in expected]
+
+    def test_ordering_not_whitelisted_is_ignored(self):
+        ids = self.get_ids('ordering=title')
+
+        assert ids == [
+            self.slow_cheap.id, self.quick_pricey.id, self.quick_cheap.id,
+        ]
+
+    def test_ordered_pages_with_ties(self, test_user):
+        for _ in range(4):
+            create_recipe(user=test_user, time_minutes=25)
+        expected = self.get_ids('ordering=time_minutes&page_size=100')
+
+        ids = []
+        url = f'{RECIPES_URL}?ordering=time_minutes&page_size=2'
+        while url:
+            res = self.client.get(url)
+            ids.extend(recipe['id'] for recipe in res.data['results'])
+            url = res.data['next']
+
+        assert ids == expected
+        assert len(ids) == 7
+
+    def test_previous_pages_with_ties(self, test_user):
+        for _ in range(4):
+            create_recipe(user=test_user, time_minutes=25)
+        url = f'{RECIPES_URL}?ordering=-time_minutes&page_size=2'
+        pages = []
+        while url:
+            res = self.client.get(url)
+            pages.append([recipe['id'] for recipe in res.data['results']])
+            url = res.data['next']
+
+        url = res.data['previous']
+        for expected in reversed(pages[:-1]):
+            res = self.client.get(url)
+            assert [r['id'] for r in res.data['results']] == expected
+            url = res.data['previous']
+
+        assert url is None
+
+    def test_several_orderings_are_rejected(self):
+        res = self.client.get(f'{RECIPES_URL}?ordering=price,time_minutes')
+
+        assert res.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'ordering' in res.data
+
+    def test_invalid_cursor(self):
+        url = self.client.get(
+            f'{RECIPES_URL}?ordering=price&page_size=1'
+        ).data['next']
+        cursor = url.split('cursor=')[1].split('&')[0]
+
+        res = self.client.get(
+            url.replace(cursor, base64.b64encode(b'p=cheap%7C1').decode())
+        )
+
+        assert res.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+class TestRecipeFilterPlans:
+    """Tests the planner reads filtered and ordered pages off an index."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, client, test_user, test_user_2):
+        self.client = client
+        self.client.force_authenticate(test_user)
+        for user in (test_user, test_user_2):
+            Recipe.objects.bulk_create(
+                Recipe(
+                    user=user,
+                    title=f'Dish {i:04d}',
+                    time_minutes=i % 200,
+                    price=Decimal(i % 90),
+                )
+                for i in range(1000)
+            )
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE core_recipe')
+
+    def page_plan(self, query):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(f'{RECIPES_URL}?{query}')
+        assert res.status_code == status.HTTP_200_OK
+
+        return explain(queries[-1]['sql'])
+
+    @pytest.mark.parametrize('query,index', [
+        ('time_minutes_max=3', 'core_recipe_user_time_idx'),
+        ('time_minutes_min=198', 'core_recipe_user_time_idx'),
+        ('price_min=88&price_max=89', 'core_recipe_user_price_idx'),
+        ('title=Dish%20001', 'core_recipe_user_title_idx'),
+        ('ordering=time_minutes', 'core_recipe_user_time_idx'),
+        ('ordering=-time_minutes', 'core_recipe_user_time_idx'),
+        ('ordering=price', 'core_recipe_user_price_idx'),
+        ('ordering=-price', 'core_recipe_user_price_idx'),
+        ('ordering=price&price_max=1', 'core_recipe_user_price_idx'),
+    ])
+    def test_page_query_uses_index(self, query, index):
+        plan = self.page_plan(query)
+
+        assert index in plan
+        assert 'Seq Scan' not in plan
+
+    @pytest.mark.parametrize('query', [
+        '',
+        'time_minutes_max=30&price_max=10',
+        'time_minutes_max=3&price_max=10&title=Dish',
+        'ordering=time_minutes&price_max=10',
+        'ordering=-price&time_minutes_min=15',
+        'ordering=price&title=Dish%20001',
+    ])
+    def test_filter_combinations_never_scan_the_table(self, query):
+        plan = self.page_plan(query)
+
+        assert 'Seq Scan' not in plan
+
+    @pytest.mark.parametrize('ordering', ['time_minutes', '-price'])
+    def test_page_inside_ties_seeks_the_index(self, ordering):
+        """Test a page starting in a run of ties skips nothing by offset."""
+        url = f'{RECIPES_URL}?ordering={ordering}&page_size=2'
+        for _ in range(3):
+            url = self.client.get(url).data['next']
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+
+        sql = queries[-1]['sql']
+        plan = explain(sql)
+        assert 'OFFSET' not in sql
+        assert 'Index Cond' in plan and 'ROW(' in plan
+        assert 'Filter' not in plan
+
+    @pytest.mark.parametrize('ordering', [
+        'time_minutes', '-time_minutes', 'price', '-price',
+    ])
+    def test_ordering_needs_no_sort(self, ordering):
+        plan = self.page_plan(f'ordering={ordering}')
+
+        assert 'Sort' not in plan
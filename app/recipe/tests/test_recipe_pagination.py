@@ -0,0 +1,85 @@
+"""
+Tests for the keyset pagination of the recipe list API.
+"""
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+import pytest
+
+from core.models import Recipe
+from rest_framework import status
+from recipe.tests.helpers import create_recipes
+
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+@pytest.mark.django_db
+class TestRecipePagination:
+    """Tests for cursor based pagination of recipes."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, client, test_user, test_user_2):
+        self.client = client
+        self.client.force_authenticate(test_user)
+        self.test_user = test_user
+        create_recipes(test_user, 25)
+        create_recipes(test_user_2, 5)
+
+    def test_pages_cover_all_recipes_in_order(self):
+        """Test following `next` links returns each recipe exactly once."""
+        ids = []
+        url = f'{RECIPES_URL}?page_size=10'
+
+        while url:
+            res = self.client.get(url)
+            assert res.status_code == status.HTTP_200_OK
+            ids.extend(recipe['id'] for recipe in res.data['results'])
+            url = res.data['next']
+
+        expected = Recipe.objects.filter(
+            user=self.test_user,
+        ).order_by('-id').values_list('id', flat=True)
+        assert ids == list(expected)
+
+    def test_response_has_no_count(self):
+        """Test the list response does not report a total count."""
+        res = self.client.get(RECIPES_URL)
+
+        assert 'count' not in res.data
+        assert set(res.data) == {'next', 'previous', 'results'}
+
+    def test_deep_page_query_count_is_stable(self):
+        """Test a deep page runs the same queries as the first page."""
+        with CaptureQueriesContext(connection) as first_page:
+            res = self.client.get(f'{RECIPES_URL}?page_size=5')
+        url = res.data['next']
+        for _ in range(3):
+            url = self.client.get(url).data['next']
+
+        with CaptureQueriesContext(connection) as deep_page:
+            res = self.client.get(url)
+
+        page_query = deep_page[-1]['sql']
+        assert res.status_code == status.HTTP_200_OK
+        assert len(first_page) == len(deep_page) == 1
+        assert 'COUNT(' not in page_query.upper()
+        assert '"core_recipe"."id" <' in page_query
+
+    def test_page_query_uses_user_id_index(self):
+        """Test the keyset query can be answered from the composite index."""
+        last_seen = Recipe.objects.filter(user=self.test_user).latest('id')
+        queryset = Recipe.objects.filter(
+            user=self.test_user,
+            id__lt=last_seen.id,
+        ).order_by('-id')[:101]
+
+        # the fixture is far too small for the planner to prefer an index
+        # on its own, so only leave it the index scans to choose from
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute('SET LOCAL enable_bitmapscan = off')
+        plan = queryset.explain()
+
+        assert 'core_recipe_user_id_desc_idx' in plan
+        assert 'Sort' not in plan
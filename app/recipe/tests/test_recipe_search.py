@@ -0,0 +1,117 @@
+"""
+Tests for full-text search of recipes.
+"""
+
+from django.contrib.postgres.search import SearchQuery
+from django.db import connection
+from django.urls import reverse
+import pytest
+
+from core.models import Recipe
+from rest_framework import status
+from recipe.tests.helpers import create_recipe
+
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+def search_url(terms, **params):
+    """Return the recipe list URL searching for the terms."""
+    query = '&'.join(f'{key}={value}' for key, value in params.items())
+    return f'{RECIPES_URL}?search={terms}&{query}'
+
+
+@pytest.mark.django_db
+class TestRecipeSearch:
+    """Tests for the search parameter of the recipe list."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, client, test_user, test_user_2):
+        self.client = client
+        self.client.force_authenticate(test_user)
+        self.test_user = test_user
+        self.in_title = create_recipe(
+            user=test_user,
+            title='Tomato soup',
+            description='A warm bowl for cold days',
+        )
+        self.in_description = create_recipe(
+            user=test_user,
+            title='Pasta',
+            description='Pasta with a fresh tomato sauce',
+        )
+        self.unrelated = create_recipe(user=test_user, title='Pancakes')
+        create_recipe(user=test_user_2, title='Tomato salad')
+
+    def test_search_matches_title_and_description(self):
+        res = self.client.get(search_url('tomatoes'))
+
+        assert res.status_code == status.HTTP_200_OK
+        ids = [recipe['id'] for recipe in res.data['results']]
+        assert ids == [self.in_title.id, self.in_description.id]
+
+    def test_search_results_are_ranked_and_highlighted(self):
+        res = self.client.get(search_url('tomato'))
+
+        first, second = res.data['results']
+        assert first['rank'] > second['rank']
+        assert '<mark>tomato</mark>' in second['headline']
+
+    def test_search_without_matches(self):
+        res = self.client.get(search_url('curry'))
+
+        assert res.data['results'] == []
+
+    def test_list_without_search_has_no_rank(self):
+        res = self.client.get(RECIPES_URL)
+
+        assert len(res.data['results']) == 3
+        assert 'rank' not in res.data['results'][0]
+
+    def test_search_pages_follow_rank(self):
+        for i in range(5):
+            create_recipe(
+                user=self.test_user,
+                title=f'Dish {i}',
+                description='tomato ' * (i % 2 + 1),
+            )
+        expected = self.client.get(
+            search_url('tomato', page_size=100)
+        ).data['results']
+
+        ids = []
+        url = search_url('tomato', page_size=2)
+        while url:
+            res = self.client.get(url)
+            ids.extend(recipe['id'] for recipe in res.data['results'])
+            url = res.data['next']
+
+        assert ids == [recipe['id'] for recipe in expected]
+        assert len(ids) == 7
+
+    def test_search_vector_follows_updates(self):
+        url = reverse('recipe:recipe-detail', args=[self.unrelated.id])
+        self.client.patch(url, {'description': 'Topped with tomato'})
+        bulk_payload = {
+            'update': [{'id': self.in_title.id, 'title': 'Onion soup'}],
+        }
+        self.client.post(
+            reverse('recipe:recipe-bulk'), bulk_payload, format='json',
+        )
+
+        res = self.client.get(search_url('tomato'))
+
+        ids = {recipe['id'] for recipe in res.data['results']}
+        assert ids == {self.unrelated.id, self.in_description.id}
+
+    def test_search_uses_gin_index(self):
+        # on a table this small the per-user indexes always win, so check
+        # the match on its own can be answered from the GIN index
+        queryset = Recipe.objects.filter(
+            search_vector=SearchQuery('tomato', config='english'),
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        plan = queryset.explain()
+
+        assert 'core_recipe_search_idx' in plan
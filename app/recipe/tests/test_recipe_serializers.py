@@ -0,0 +1,58 @@
+"""
+Tests for the recipe serializers.
+"""
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+import pytest
+
+from core.models import Recipe
+from rest_framework.renderers import JSONRenderer
+from recipe.serializers import (
+    RecipeSerializer,
+    RecipeValuesSerializer,
+)
+
+
+@pytest.mark.django_db
+class TestRecipeValuesSerializer:
+    """Tests for the values based fast path of the recipe list."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, test_user):
+        for price in ('0.00', '0.05', '7.5', '999.99'):
+            Recipe.objects.create(
+                user=test_user,
+                title=f'Recipe for {price} – "quoted"',
+                time_minutes=5,
+                price=Decimal(price),
+                link='https://example.com',
+            )
+        self.queryset = Recipe.objects.order_by('-id')
+
+    def test_output_is_byte_identical(self):
+        model_data = RecipeSerializer(self.queryset, many=True).data
+        values = self.queryset.values(*RecipeValuesSerializer.fields)
+        values_data = RecipeValuesSerializer(values, many=True).data
+
+        renderer = JSONRenderer()
+        assert renderer.render(values_data) == renderer.render(model_data)
+
+    def test_price_is_a_string_with_two_decimals(self):
+        values = self.queryset.values(*RecipeValuesSerializer.fields)
+        data = RecipeValuesSerializer(values, many=True).data
+
+        assert [row['price'] for row in data] == [
+            '999.99', '7.50', '0.05', '0.00',
+        ]
+
+    def test_benchmark_command(self):
+        out = StringIO()
+
+        call_command(
+            'benchmark_recipe_serializers', rows=50, repeat=1, stdout=out,
+        )
+
+        assert 'byte-identical' in out.getvalue()
+        assert not Recipe.objects.filter(title__startswith='Benchmark')
@@ -0,0 +1,285 @@
+"""
+Tests for the per-user recipe stats.
+"""
+import io
+import threading
+import time
+from decimal import Decimal
+
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+import pytest
+
+from core.models import Recipe, RecipeStats
+from rest_framework import status
+from recipe.tests.helpers import create_recipe, detail_url
+
+STATS_URL = reverse('recipe:recipe-stats')
+RECIPES_URL = reverse('recipe:recipe-list')
+BULK_URL = reverse('recipe:recipe-bulk')
+
+
+def stats_of(user):
+    """Return the stored stats of a user as a tuple."""
+    stats = RecipeStats.objects.filter(user=user).first()
+    if stats is None:
+        return None
+
+    return (
+        stats.recipe_count, stats.price_sum, stats.price_min,
+        stats.price_max, stats.time_minutes_sum,
+    )
+
+
+@pytest.mark.django_db
+class TestRecipeStatsAPI:
+    """Tests for the recipe stats endpoint."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, client, test_user, test_user_2):
+        self.client = client
+        self.client.force_authenticate(test_user)
+        self.test_user = test_user
+        self.test_user_2 = test_user_2
+
+    def test_auth_required(self):
+        self.client.force_authenticate(None)
+
+        res = self.client.get(STATS_URL)
+
+        assert res.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_no_recipes(self):
+        res = self.client.get(STATS_URL)
+
+        assert res.status_code == status.HTTP_200_OK
+        assert res.data == {
+            'recipe_count': 0,
+            'average_price': None,
+            'min_price': None,
+            'max_price': None,
+            'average_time_minutes': None,
+        }
+
+    def test_stats_of_own_recipes(self):
+        create_recipe(self.test_user, price=Decimal('1.00'), time_minutes=10)
+        create_recipe(self.test_user, price=Decimal('2.00'), time_minutes=15)
+        create_recipe(self.test_user, price=Decimal('4.00'), time_minutes=20)
+        create_recipe(self.test_user_2, price=Decimal('99.00'))
+
+        res = self.client.get(STATS_URL)
+
+        assert res.data == {
+            'recipe_count': 3,
+            'average_price': '2.33',
+            'min_price': '1.00',
+            'max_price': '4.00',
+            'average_time_minutes': 15.0,
+        }
+
+    def test_read_is_single_lookup(self):
+        create_recipe(self.test_user)
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(STATS_URL)
+
+        assert res.status_code == status.HTTP_200_OK
+        sql = [query['sql'] for query in queries.captured_queries]
+        assert len([s for s in sql if 'core_recipestats' in s]) == 1
+        assert not [s for s in sql if '"core_recipe"' in s]
+
+    def test_api_writes_update_stats(self):
+        res = self.client.post(RECIPES_URL, {
+            'title': 'Soup', 'time_minutes': 30, 'price': '5.00',
+        })
+        recipe_id = res.data['id']
+        assert stats_of(self.test_user) == (
+            1, Decimal('5.00'), Decimal('5.00'), Decimal('5.00'), 30,
+        )
+
+        self.client.patch(detail_url(recipe_id), {'price': '3.00'})
+        assert stats_of(self.test_user) == (
+            1, Decimal('3.00'), Decimal('3.00'), Decimal('3.00'), 30,
+        )
+
+        self.client.delete(detail_url(recipe_id))
+        assert stats_of(self.test_user) == (0, Decimal('0.00'), None, None, 0)
+
+    def test_bulk_endpoint_updates_stats(self):
+        recipe = create_recipe(self.test_user, price=Decimal('1.00'))
+
+        res = self.client.post(BULK_URL, {
+            'create': [
+                {'title': 'A', 'time_minutes': 5, 'price': '2.00'},
+                {'title': 'B', 'time_minutes': 5, 'price': '6.00'},
+            ],
+            'delete': [recipe.id],
+        }, format='json')
+
+        assert res.status_code == status.HTTP_200_OK
+        assert stats_of(self.test_user) == (
+            2, Decimal('8.00'), Decimal('2.00'), Decimal('6.00'), 10,
+        )
+
+
+@pytest.mark.django_db
+class TestRecipeStatsTriggers:
+    """Tests for the triggers maintaining the recipe stats."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, test_user, test_user_2):
+        self.test_user = test_user
+        self.test_user_2 = test_user_2
+
+    def test_bulk_create(self):
+        Recipe.objects.bulk_create([
+            Recipe(
+                user=self.test_user, title=f'Recipe {i}',
+                time_minutes=i, price=Decimal(i),
+            )
+            for i in range(1, 5)
+        ])
+
+        assert stats_of(self.test_user) == (
+            4, Decimal('10.00'), Decimal('1.00'), Decimal('4.00'), 10,
+        )
+        assert stats_of(self.test_user_2) is None
+
+    def test_delete_of_minimum_recomputes_it(self):
+        cheapest = create_recipe(self.test_user, price=Decimal('1.00'))
+        create_recipe(self.test_user, price=Decimal('3.00'))
+        create_recipe(self.test_user, price=Decimal('2.00'))
+
+        cheapest.delete()
+
+        assert stats_of(self.test_user) == (
+            2, Decimal('5.00'), Decimal('2.00'), Decimal('3.00'), 40,
+        )
+
+    def test_queryset_update(self):
+        create_recipe(self.test_user, price=Decimal('1.00'))
+        create_recipe(self.test_user, price=Decimal('3.00'))
+
+        Recipe.objects.filter(user=self.test_user).update(
+            price=Decimal('2.00'), time_minutes=1,
+        )
+
+        assert stats_of(self.test_user) == (
+            2, Decimal('4.00'), Decimal('2.00'), Decimal('2.00'), 2,
+        )
+
+    def test_update_moves_recipe_between_users(self):
+        recipe = create_recipe(self.test_user, price=Decimal('4.00'))
+        create_recipe(self.test_user, price=Decimal('1.00'))
+
+        Recipe.objects.filter(pk=recipe.pk).update(user=self.test_user_2)
+
+        assert stats_of(self.test_user) == (
+            1, Decimal('1.00'), Decimal('1.00'), Decimal('1.00'), 20,
+        )
+        assert stats_of(self.test_user_2) == (
+            1, Decimal('4.00'), Decimal('4.00'), Decimal('4.00'), 20,
+        )
+
+    def test_queryset_delete(self):
+        create_recipe(self.test_user)
+        create_recipe(self.test_user_2)
+
+        Recipe.objects.all().delete()
+
+        assert stats_of(self.test_user) == (0, Decimal('0.00'), None, None, 0)
+        assert stats_of(self.test_user_2) == (
+            0, Decimal('0.00'), None, None, 0,
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestRecipeStatsConcurrency:
+    """Tests for the triggers under concurrent writes."""
+
+    def wait_for_lock(self):
+        for _ in range(100):
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT count(*) FROM pg_locks WHERE NOT granted'
+                )
+                if cursor.fetchone()[0]:
+                    return
+            time.sleep(0.05)
+        raise AssertionError('The delete never waited for the insert.')
+
+    def test_recompute_sees_concurrent_insert(self, test_user):
+        """Test a removed minimum is recomputed with a committed insert"""
+        cheapest = create_recipe(test_user, price=Decimal('5.00'))
+        create_recipe(test_user, price=Decimal('10.00'))
+
+        def delete_cheapest():
+            try:
+                Recipe.objects.filter(pk=cheapest.pk).delete()
+            finally:
+                connections.close_all()
+
+        with transaction.atomic():
+            create_recipe(test_user, price=Decimal('7.00'))
+            # the delete waits for the stats row this insert holds
+            deleting = threading.Thread(target=delete_cheapest)
+            deleting.start()
+            self.wait_for_lock()
+        deleting.join()
+
+        assert stats_of(test_user) == (
+            2, Decimal('17.00'), Decimal('7.00'), Decimal('10.00'), 40,
+        )
+
+
+@pytest.mark.django_db
+class TestRepairRecipeStats:
+    """Tests for the repair_recipe_stats command."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, test_user, test_user_2):
+        self.test_user = test_user
+        self.test_user_2 = test_user_2
+        create_recipe(test_user, price=Decimal('1.00'))
+        create_recipe(test_user, price=Decimal('3.00'))
+        create_recipe(test_user_2, price=Decimal('2.00'))
+
+    def repair(self, **options):
+        out = io.StringIO()
+        call_command('repair_recipe_stats', stdout=out, **options)
+        return out.getvalue()
+
+    def test_no_drift(self):
+        out = self.repair()
+
+        assert 'Checked 2 users, no drift.' in out
+
+    def test_fixes_drift(self):
+        expected = stats_of(self.test_user)
+        RecipeStats.objects.filter(user=self.test_user).update(
+            recipe_count=7, price_min=None,
+        )
+        RecipeStats.objects.filter(user=self.test_user_2).delete()
+
+        out = self.repair()
+
+        assert f'user {self.test_user.pk}: recipe_count 7 != 2' in out
+        assert f'user {self.test_user_2.pk}: missing' in out
+        assert 'fixed 2 (1 missing)' in out
+        assert stats_of(self.test_user) == expected
+        assert stats_of(self.test_user_2) == (
+            1, Decimal('2.00'), Decimal('2.00'), Decimal('2.00'), 20,
+        )
+        assert 'no drift' in self.repair()
+
+    def test_dry_run_reports_only(self):
+        RecipeStats.objects.filter(user=self.test_user).update(
+            price_sum=Decimal('0.00'),
+        )
+
+        out = self.repair(dry_run=True)
+
+        assert '1 drifted' in out
+        assert stats_of(self.test_user)[1] == Decimal('0.00')
@@ -2,7 +2,7 @@ from django.urls import path, include
 
 from rest_framework.routers import DefaultRouter
 
-from . import views
+from . import async_views, views
 
 
 router = DefaultRouter()
@@ -11,5 +11,16 @@ router.register('recipes', views.RecipeViewSet)
 app_name = 'recipe'
 
 urlpatterns = [
+    path(
+        'async/recipes/',
+        async_views.recipe_list,
+        name='recipe-list-async',
+    ),
+    path(
+        'async/recipes/<int:pk>/',
+        async_views.recipe_detail,
+        name='recipe-detail-async',
+    ),
+    path('stats/', views.RecipeStatsView.as_view(), name='recipe-stats'),
     path('', include(router.urls)),
 ]
@@ -1,29 +1,263 @@
 """
 Views for the Recipe API
 """
-from rest_framework import viewsets
-from rest_framework.authentication import TokenAuthentication
+from django.conf import settings
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.translation import gettext as _
+from rest_framework import generics, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import OrderingFilter
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
 
-from core.models import Recipe
+from core.db.replicas import ReplicaReadMixin
+from core.models import Recipe, RecipeStats
+from user.authentication import CachedTokenAuthentication
 from . import serializers
+from .cache import CachedResponseMixin, bump_user_version
+from .conditional import ConditionalGetMixin
+from .export import (
+    EXPORT_FIELDS,
+    CSVRenderer,
+    NDJSONRenderer,
+    stream_csv,
+    stream_ndjson,
+)
+from .filters import RecipeRangeFilter, RecipeSearchFilter
+from .pagination import RecipeCursorPagination
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(
+    ReplicaReadMixin,
+    ConditionalGetMixin,
+    CachedResponseMixin,
+    viewsets.ModelViewSet,
+):
     serializer_class = serializers.RecipeDetailSerializer
     queryset = Recipe.objects.all()
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated,)
+    pagination_class = RecipeCursorPagination
+    filter_backends = [RecipeSearchFilter, RecipeRangeFilter, OrderingFilter]
+    ordering_fields = ['time_minutes', 'price']
+    ordering = '-id'
+
+    replica_actions = ('list', 'retrieve')
+    sparse_actions = ('list', 'retrieve')
 
     def get_queryset(self):
-        return self.queryset.filter(user=self.request.user).order_by('-id')
+        queryset = self.queryset.filter(
+            user=self.request.user,
+        ).defer('search_vector').order_by('-id')
+        if self.action == 'retrieve':
+            fields = self.get_sparse_fields(self.get_full_serializer_class())
+            if fields is not None:
+                queryset = queryset.only(*fields)
+
+        return queryset
 
     def get_serializer_class(self):
+        serializer_class = self.get_full_serializer_class()
+        fields = self.get_sparse_fields(serializer_class)
+        if fields is None:
+            return serializer_class
+
+        return serializers.narrow_serializer(serializer_class, fields)
+
+    def get_full_serializer_class(self):
         if self.action == 'list':
-            return serializers.RecipeSerializer
+            if getattr(self, 'swagger_fake_view', False):
+                return serializers.RecipeSerializer
+            if RecipeSearchFilter().get_search_terms(self.request):
+                return serializers.RecipeSearchValuesSerializer
+            return serializers.RecipeValuesSerializer
+        if self.action == 'bulk':
+            return serializers.RecipeBulkSerializer
 
         return self.serializer_class
 
+    def get_sparse_fields(self, serializer_class):
+        """
+        Return the fields picked by `?fields=` and `?exclude=`, in the
+        order of the serializer, or None when neither is given.
+        """
+        params = self.request.query_params
+        if self.action not in self.sparse_actions or not (
+            'fields' in params or 'exclude' in params
+        ):
+            return None
+
+        available = serializers.get_field_names(serializer_class)
+        requested = _split_fields(params.get('fields'))
+        excluded = _split_fields(params.get('exclude')) or []
+        errors = {}
+        for param, names in (('fields', requested), ('exclude', excluded)):
+            unknown = [name for name in names or [] if name not in available]
+            if unknown:
+                errors[param] = [
+                    _('Unknown field: %(field)s.') % {'field': name}
+                    for name in unknown
+                ]
+        fields = tuple(
+            name for name in available
+            if (requested is None or name in requested)
+            and name not in excluded
+        )
+        if not errors and not fields:
+            errors['fields'] = [_('At least one field must be selected.')]
+        if errors:
+            raise ValidationError(errors)
+
+        return fields
+
+    def paginate_queryset(self, queryset):
+        if self.action == 'list':
+            # the list serializer reads plain rows, not model instances,
+            # the cursor also needs the columns the page is ordered by
+            ordering = self.paginator.get_ordering(
+                self.request, queryset, self
+            )
+            fields = dict.fromkeys(self.get_serializer_class().fields)
+            fields.update(dict.fromkeys(
+                field.lstrip('-') for field in ordering
+            ))
+            queryset = queryset.values(*fields)
+
+        return super().paginate_queryset(queryset)
+
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """Create, update and delete many recipes in one transaction"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        with transaction.atomic():
+            result = self.perform_bulk(serializer.validated_data)
+        bump_user_version(request.user.pk)
+
+        return Response({
+            'created': serializers.RecipeDetailSerializer(
+                result['created'], many=True
+            ).data,
+            'updated': serializers.RecipeDetailSerializer(
+                result['updated'], many=True
+            ).data,
+            'deleted': result['deleted'],
+        })
+
+    @action(
+        detail=False,
+        methods=['get'],
+        renderer_classes=[NDJSONRenderer, CSVRenderer],
+    )
+    def export(self, request):
+        """Stream all recipes of the user as NDJSON or CSV"""
+        chunk_size = settings.RECIPE_EXPORT_CHUNK_SIZE
+        rows = self.get_queryset().values_list(*EXPORT_FIELDS).iterator(
+            chunk_size=chunk_size
+        )
+        renderer = request.accepted_renderer
+        stream = stream_csv if renderer.format == 'csv' else stream_ndjson
+
+        response = StreamingHttpResponse(
+            stream(rows, chunk_size),
+            content_type=f'{renderer.media_type}; charset=utf-8',
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="recipes.{renderer.format}"'
+        )
+
+        return response
+
+    def perform_bulk(self, validated_data):
+        """Apply validated bulk operations to the user's recipes"""
+        queryset = self.get_queryset()
+        updates = validated_data.get('update', [])
+        deletes = validated_data.get('delete', [])
+
+        recipes = queryset.select_for_update().in_bulk(
+            [item['id'] for item in updates]
+        )
+        owned = set(
+            queryset.filter(id__in=deletes).values_list('id', flat=True)
+        )
+        errors = {
+            'update': _not_found_errors(
+                [item['id'] for item in updates], recipes
+            ),
+            'delete': _not_found_errors(deletes, owned),
+        }
+        errors = {key: value for key, value in errors.items() if value}
+        if errors:
+            raise ValidationError(errors)
+
+        created = Recipe.objects.bulk_create(
+            [
+                Recipe(user=self.request.user, **item)
+                for item in validated_data.get('create', [])
+            ],
+            batch_size=settings.RECIPE_BULK_BATCH_SIZE,
+        )
+
+        updated = []
+        fields = {'updated_at'}
+        now = timezone.now()
+        for item in updates:
+            recipe = recipes[item['id']]
+            for field, value in item.items():
+                setattr(recipe, field, value)
+            recipe.updated_at = now
+            fields.update(item)
+            updated.append(recipe)
+        fields.discard('id')
+        Recipe.objects.bulk_update(
+            updated,
+            sorted(fields),
+            batch_size=settings.RECIPE_BULK_BATCH_SIZE,
+        )
+
+        if deletes:
+            queryset.filter(id__in=deletes).delete()
+
+        return {'created': created, 'updated': updated, 'deleted': deletes}
+
+
+class RecipeStatsView(ReplicaReadMixin, generics.RetrieveAPIView):
+    """Summary of the recipes of the authenticated user"""
+    serializer_class = serializers.RecipeStatsSerializer
+    authentication_classes = (CachedTokenAuthentication,)
+    permission_classes = (IsAuthenticated,)
+
+    def get_object(self):
+        # a single primary key lookup, the triggers on core_recipe keep
+        # the row up to date and users without recipes have none yet
+        user = self.request.user
+        try:
+            return RecipeStats.objects.get(pk=user.pk)
+        except RecipeStats.DoesNotExist:
+            return RecipeStats(user=user)
+
+
+def _split_fields(value):
+    """Split a comma separated list of field names."""
+    if value is None:
+        return None
+
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def _not_found_errors(ids, found):
+    """Return per-item errors for ids the user does not own."""
+    errors = [
+        {} if recipe_id in found else {'id': [_('Not found.')]}
+        for recipe_id in ids
+    ]
+
+    return errors if any(errors) else []
@@ -0,0 +1,17 @@
+"""
+Async read-only views of the User API, served natively under ASGI.
+"""
+from rest_framework.response import Response
+
+from core.async_api import async_api_view
+from user.serializers import UserSerializer
+from user.views import UserProfileView
+
+
+@async_api_view(
+    UserProfileView.authentication_classes,
+    UserProfileView.permission_classes,
+)
+async def profile(request):
+    """Retrieve the authenticated user"""
+    return Response(UserSerializer(request.user).data)
@@ -0,0 +1,158 @@
+"""
+Authentication classes for the API.
+"""
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from core.db.replicas import primary_reads
+from core.metrics import record_cache_lookup
+
+# never cached, the password hash has no business in a shared cache
+UNCACHED_USER_FIELDS = {'password'}
+# backends each process has its own copy of, a token revoked through one
+# worker would stay valid in the others until its entry expires
+PROCESS_LOCAL_CACHES = (LocMemCache, DummyCache)
+
+
+def _token_cache_key(key):
+    return f'auth:token:{key}'
+
+
+def _generation_key(key):
+    return f'auth:generation:{key}'
+
+
+def _new_generation():
+    # time based, so a generation evicted from the cache never comes back
+    # equal to one that is still stored in a cached entry
+    return int(time.time() * 1000)
+
+
+def _get_generation(key):
+    generation_key = _generation_key(key)
+    generation = cache.get(generation_key)
+    if generation is None:
+        cache.add(generation_key, _new_generation(), timeout=None)
+        generation = cache.get(generation_key)
+
+    return generation
+
+
+def token_cache_is_shared():
+    """Return whether the default cache is shared by all workers."""
+    return not isinstance(caches['default'], PROCESS_LOCAL_CACHES)
+
+
+def invalidate_token(key):
+    """Forget the cached user of a token key."""
+    generation_key = _generation_key(key)
+    try:
+        cache.incr(generation_key)
+    except ValueError:
+        cache.add(generation_key, _new_generation(), timeout=None)
+    cache.delete(_token_cache_key(key))
+
+
+def invalidate_user_tokens(user_id):
+    """Forget the cached user of every token of a user."""
+    with primary_reads():
+        keys = list(
+            Token.objects.filter(user_id=user_id).values_list(
+                'key', flat=True,
+            )
+        )
+    for key in keys:
+        invalidate_token(key)
+
+
+def _cache_entry(token, generation):
+    user = token.user
+    return {
+        'generation': generation,
+        'created': token.created,
+        'user': {
+            field.attname: getattr(user, field.attname)
+            for field in user._meta.concrete_fields
+            if field.attname not in UNCACHED_USER_FIELDS
+        },
+    }
+
+
+def _token_from_entry(key, entry):
+    """Rebuild the token and its user, the password left deferred."""
+    user_model = get_user_model()
+    fields = entry['user']
+    user = user_model.from_db(
+        DEFAULT_DB_ALIAS,
+        list(fields),
+        [
+            fields[field.attname] for field in user_model._meta.concrete_fields
+            if field.attname in fields
+        ],
+    )
+    token = Token.from_db(
+        DEFAULT_DB_ALIAS,
+        ['key', 'user_id', 'created'],
+        [key, user.pk, entry['created']],
+    )
+    token.user = user
+
+    return token
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication that caches the resolved token and user, so
+    repeated requests skip the token join user query. Cache misses are
+    looked up on the primary, even in requests reading from a replica.
+
+    Entries carry the generation of their token, read before the lookup
+    and bumped by every change of the token or its user, so an entry
+    written by a lookup that raced with a change is never used. Lookups
+    are only cached when the default cache is shared by all workers.
+    """
+
+    def authenticate_credentials(self, key):
+        if not token_cache_is_shared():
+            with primary_reads():
+                return super().authenticate_credentials(key)
+
+        token_key = _token_cache_key(key)
+        cached = cache.get_many([token_key, _generation_key(key)])
+        generation = cached.get(_generation_key(key))
+        entry = cached.get(token_key)
+        if entry is not None and entry['generation'] != generation:
+            entry = None
+        record_cache_lookup('auth_token', entry is not None)
+        if entry is None:
+            if generation is None:
+                generation = _get_generation(key)
+            # always from the primary: a lagging replica would bring back,
+            # and cache, a token deleted or a user deactivated moments ago
+            with primary_reads():
+                user, token = super().authenticate_credentials(key)
+            cache.set(
+                token_key,
+                _cache_entry(token, generation),
+                settings.AUTH_TOKEN_CACHE_TIMEOUT,
+            )
+            return (user, token)
+
+        token = _token_from_entry(key, entry)
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(
+                _('User inactive or deleted.')
+            )
+
+        return (token.user, token)
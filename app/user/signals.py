@@ -0,0 +1,36 @@
+"""
+Signal handlers for the User API
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from rest_framework.authtoken.models import Token
+
+from .authentication import invalidate_token, invalidate_user_tokens
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def invalidate_cached_token(sender, instance, **kwargs):
+    """Drop the cached user of a changed or deleted token"""
+    key = instance.key
+    invalidate_token(key)
+    # again once committed: a lookup made in between still read the old
+    # row, and cached it under the generation bumped above. The key is
+    # bound now, a deleted instance loses its primary key
+    transaction.on_commit(lambda: invalidate_token(key))
+
+
+@receiver(post_save, sender=get_user_model())
+def invalidate_cached_user(sender, instance, created, **kwargs):
+    """
+    Drop the cached tokens of a changed user, so deactivation, password
+    and profile changes are seen by the very next request.
+    """
+    if created:
+        return
+    user_id = instance.pk
+    invalidate_user_tokens(user_id)
+    transaction.on_commit(lambda: invalidate_user_tokens(user_id))
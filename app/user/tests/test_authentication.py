@@ -0,0 +1,165 @@
+"""
+Tests for the cached token authentication.
+"""
+import pickle
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+import rest_framework.status as status
+
+import pytest
+
+
+PROFILE_URL = reverse('user:profile')
+
+
+@pytest.mark.django_db
+class TestCachedTokenAuthentication():
+
+    @pytest.fixture(autouse=True)
+    def setup(self, client, test_user, settings, tmp_path):
+        # lookups are only cached in a cache shared by all workers
+        settings.CACHES = {
+            'default': {
+                'BACKEND': 'django.core.cache.backends.filebased.'
+                           'FileBasedCache',
+                'LOCATION': str(tmp_path),
+            }
+        }
+        self.test_user = test_user
+        self.token = Token.objects.create(user=test_user)
+        client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.client = client
+
+    def test_repeated_requests_skip_token_lookup(self):
+        """Test the token is only looked up on the first request"""
+        with CaptureQueriesContext(connection) as first:
+            res = self.client.get(PROFILE_URL)
+        assert res.status_code == status.HTTP_200_OK
+
+        with CaptureQueriesContext(connection) as second:
+            res = self.client.get(PROFILE_URL)
+
+        assert res.status_code == status.HTTP_200_OK
+        assert res.data['email'] == self.test_user.email
+        assert len(first) == 1
+        assert len(second) == 0
+
+    def test_invalid_token_rejected(self):
+        """Test an unknown token is still rejected"""
+        self.client.credentials(HTTP_AUTHORIZATION='Token invalid')
+
+        res = self.client.get(PROFILE_URL)
+
+        assert res.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_deleted_token_rejected(self):
+        """Test a deleted token stops working immediately"""
+        self.client.get(PROFILE_URL)
+
+        self.token.delete()
+        res = self.client.get(PROFILE_URL)
+
+        assert res.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_deactivated_user_rejected(self):
+        """Test a deactivated user is rejected immediately"""
+        self.client.get(PROFILE_URL)
+
+        self.test_user.is_active = False
+        self.test_user.save()
+        res = self.client.get(PROFILE_URL)
+
+        assert res.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_password_change_invalidates_cache(self):
+        """Test a password change through the API is seen right away"""
+        self.client.get(PROFILE_URL)
+        self.client.patch(PROFILE_URL, {'password': 'newpass123'})
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(PROFILE_URL)
+
+        assert res.status_code == status.HTTP_200_OK
+        assert len(queries) == 1
+
+    def test_profile_change_is_not_stale(self):
+        """Test the cached user is refreshed after a profile update"""
+        self.client.get(PROFILE_URL)
+        self.client.patch(PROFILE_URL, {'name': 'New Name'})
+
+        res = self.client.get(PROFILE_URL)
+
+        assert res.data['name'] == 'New Name'
+        # saved from the cached user, whose password is not loaded
+        self.test_user.refresh_from_db()
+        assert self.test_user.check_password('testpass123')
+
+    def test_password_hash_is_not_cached(self):
+        """Test the cache holds no password hash"""
+        self.client.get(PROFILE_URL)
+
+        entry = cache.get(f'auth:token:{self.token.key}')
+
+        assert entry['user']['id'] == self.test_user.pk
+        assert self.test_user.password.encode() not in pickle.dumps(entry)
+
+    def test_deactivation_during_lookup_is_not_cached(self):
+        """Test a lookup racing with a deactivation is not used again"""
+        lookup = TokenAuthentication.authenticate_credentials
+
+        def deactivated_meanwhile(auth, key):
+            result = lookup(auth, key)
+            self.test_user.is_active = False
+            self.test_user.save()
+            return result
+
+        with patch.object(
+            TokenAuthentication, 'authenticate_credentials',
+            deactivated_meanwhile,
+        ):
+            res = self.client.get(PROFILE_URL)
+        assert res.status_code == status.HTTP_200_OK
+
+        res = self.client.get(PROFILE_URL)
+
+        assert res.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_lookup_before_commit_is_not_used(
+        self, django_capture_on_commit_callbacks,
+    ):
+        """Test a lookup that read the row before a change committed"""
+        stale = (self.test_user, self.token)
+        with django_capture_on_commit_callbacks(execute=True):
+            Token.objects.filter(pk=self.token.pk).delete()
+            # another worker, which still sees the committed token
+            with patch.object(
+                TokenAuthentication, 'authenticate_credentials',
+                return_value=stale,
+            ):
+                res = self.client.get(PROFILE_URL)
+            assert res.status_code == status.HTTP_200_OK
+
+        res = self.client.get(PROFILE_URL)
+
+        assert res.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_process_local_cache_is_not_used(self, settings):
+        """Test lookups are not cached per process"""
+        settings.CACHES = {
+            'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            }
+        }
+        self.client.get(PROFILE_URL)
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(PROFILE_URL)
+
+        assert res.status_code == status.HTTP_200_OK
+        assert len(queries) == 1
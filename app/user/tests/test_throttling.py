@@ -0,0 +1,163 @@
+"""
+Tests for the login rate limiter.
+"""
+from unittest.mock import patch
+
+from django.contrib.auth import authenticate
+from django.urls import reverse
+import rest_framework.status as status
+
+import pytest
+
+from user.throttling import LoginRateThrottle
+
+
+TOKEN_URL = reverse('user:token')
+
+
+@pytest.mark.django_db
+class TestLoginRateThrottle():
+
+    @pytest.fixture(autouse=True)
+    def setup(self, client, test_user, settings):
+        settings.LOGIN_RATE_WINDOW = 60
+        settings.LOGIN_RATE_EMAIL_LIMIT = 3
+        settings.LOGIN_RATE_IP_LIMIT = 5
+        settings.LOGIN_LOCKOUT = 120
+        self.client = client
+        self.test_user = test_user
+
+    def login(self, email='user@example.com', password='wrongpass', **extra):
+        return self.client.post(
+            TOKEN_URL, {'email': email, 'password': password}, **extra
+        )
+
+    def test_email_locked_out_before_hashing(self):
+        """Test attempts over the limit are rejected without hashing"""
+        with patch(
+            'user.serializers.authenticate', wraps=authenticate,
+        ) as patched_authenticate:
+            statuses = [self.login().status_code for _ in range(10)]
+
+        assert statuses == [status.HTTP_400_BAD_REQUEST] * 3 + [
+            status.HTTP_429_TOO_MANY_REQUESTS
+        ] * 7
+        assert patched_authenticate.call_count == 3
+
+    def test_retry_after_header(self):
+        """Test rejected attempts tell when to retry"""
+        for _ in range(3):
+            self.login()
+
+        res = self.login(password='testpass123')
+
+        assert res.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert 115 <= int(res['Retry-After']) <= 120
+
+    def test_email_is_normalized(self):
+        """Test changing the case of the email does not reset the count"""
+        emails = ('user@example.com', 'USER@example.com', 'User@Example.com')
+        for email in emails:
+            self.login(email=email)
+
+        res = self.login(email=' user@EXAMPLE.com ')
+
+        assert res.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+    def test_ip_limit_across_emails(self):
+        """Test one client rotating emails is limited by its IP"""
+        for i in range(5):
+            self.login(email=f'user{i}@example.com')
+
+        res = self.login(email='other@example.com')
+        other_client = self.login(
+            email='other@example.com', REMOTE_ADDR='10.0.0.2',
+        )
+
+        assert res.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert other_client.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_spoofed_forwarded_for_is_ignored(self):
+        """Test rotating X-Forwarded-For does not reset the IP count"""
+        for i in range(5):
+            self.login(
+                email=f'user{i}@example.com',
+                HTTP_X_FORWARDED_FOR=f'203.0.113.{i}',
+            )
+
+        res = self.login(
+            email='other@example.com', HTTP_X_FORWARDED_FOR='203.0.113.99',
+        )
+
+        assert res.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+    def test_forwarded_for_behind_proxy(self, settings):
+        """Test only the address appended by the proxy is trusted"""
+        settings.REST_FRAMEWORK = dict(
+            settings.REST_FRAMEWORK, NUM_PROXIES=1,
+        )
+        for i in range(5):
+            self.login(
+                email=f'user{i}@example.com',
+                HTTP_X_FORWARDED_FOR=f'198.51.100.{i}, 10.0.0.9',
+            )
+
+        res = self.login(
+            email='other@example.com',
+            HTTP_X_FORWARDED_FOR='198.51.100.99, 10.0.0.9',
+        )
+        other_client = self.login(
+            email='other@example.com', HTTP_X_FORWARDED_FOR='10.0.0.2',
+        )
+
+        assert res.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert other_client.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.parametrize('body', [b'[1, 2]', b'"user@example.com"'])
+    def test_non_object_body(self, body):
+        """Test a body that is not an object counts against the IP only"""
+        res = self.client.post(
+            TOKEN_URL, body, content_type='application/json',
+        )
+
+        assert res.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_previous_window_counts_partly(self):
+        """Test the previous bucket is weighted by its overlap"""
+        with patch('user.throttling.time.time', return_value=6000.0):
+            for _ in range(3):
+                self.login()
+        # a quarter into the next bucket, 3 * 0.75 attempts still count
+        with patch('user.throttling.time.time', return_value=6015.0):
+            res = self.login()
+
+        assert res.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+    def test_lockout_served_from_process_memory(self):
+        """Test a locked out key is rejected without touching the cache"""
+        for _ in range(4):
+            self.login()
+
+        with patch('user.throttling.cache') as patched_cache:
+            res = self.login()
+
+        assert res.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert not patched_cache.method_calls
+
+    def test_lockout_shared_through_cache(self):
+        """Test a lockout set by another worker is honoured"""
+        for _ in range(4):
+            self.login()
+        LoginRateThrottle.local_lockouts.clear()
+
+        res = self.login(password='testpass123')
+
+        assert res.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+    def test_disabled(self, settings):
+        """Test the limiter can be switched off"""
+        settings.LOGIN_RATE_LIMIT_ENABLED = False
+
+        statuses = {self.login().status_code for _ in range(10)}
+
+        assert statuses == {status.HTTP_400_BAD_REQUEST}
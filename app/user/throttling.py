@@ -0,0 +1,115 @@
+"""
+Throttling classes for the User API.
+"""
+import hashlib
+import time
+from collections.abc import Mapping
+
+from django.conf import settings
+from django.core.cache import cache
+
+from rest_framework.throttling import BaseThrottle
+
+
+class LoginRateThrottle(BaseThrottle):
+    """
+    Limit login attempts per email and per client IP over a sliding
+    window, before the password is hashed.
+
+    The window is approximated with two fixed buckets: the count of the
+    previous bucket is weighted by how much of it still overlaps the
+    window. A key over its limit is locked out for LOGIN_LOCKOUT seconds.
+    Counters and lockouts live in the shared cache, so all workers agree,
+    and lockouts are also remembered in-process, so a worker rejects a
+    burst from a locked out key without a single cache round trip.
+    """
+    cache_prefix = 'login'
+    # key -> time the lockout ends, shared by the requests of a process
+    local_lockouts = {}
+    max_local_lockouts = 10000
+
+    def allow_request(self, request, view):
+        if not settings.LOGIN_RATE_LIMIT_ENABLED:
+            return True
+
+        self.wait_seconds = 0
+        now = time.time()
+        keys = self.get_keys(request)
+        for key in keys:
+            until = self.local_lockouts.get(key)
+            if until is not None:
+                if until > now:
+                    return self.reject(until - now)
+                self.local_lockouts.pop(key, None)
+
+        lockouts = cache.get_many([self._lockout_key(key) for key in keys])
+        for key in keys:
+            until = lockouts.get(self._lockout_key(key))
+            if until is not None and until > now:
+                self.local_lockouts[key] = until
+                return self.reject(until - now)
+
+        for key, limit in keys.items():
+            if self._hit(key, now) > limit:
+                return self.reject(self._lock_out(key, now))
+
+        return True
+
+    def get_keys(self, request):
+        """Return the keys the attempt counts against, with their limit."""
+        keys = {
+            f'ip:{self.get_ident(request)}': settings.LOGIN_RATE_IP_LIMIT,
+        }
+        # any JSON value parses, only an object can hold an email
+        data = request.data
+        email = data.get('email') if isinstance(data, Mapping) else None
+        if isinstance(email, str) and email.strip():
+            digest = hashlib.md5(email.strip().lower().encode()).hexdigest()
+            keys[f'email:{digest}'] = settings.LOGIN_RATE_EMAIL_LIMIT
+
+        return keys
+
+    def reject(self, wait):
+        self.wait_seconds = wait
+        return False
+
+    def wait(self):
+        return self.wait_seconds
+
+    def _hit(self, key, now):
+        """Count an attempt and return the attempts in the window."""
+        window = settings.LOGIN_RATE_WINDOW
+        bucket = int(now // window)
+        current_key = f'{self.cache_prefix}:count:{key}:{bucket}'
+        previous_key = f'{self.cache_prefix}:count:{key}:{bucket - 1}'
+
+        # buckets live for two windows, long enough to be the previous one
+        cache.add(current_key, 0, timeout=2 * window)
+        try:
+            current = cache.incr(current_key)
+        except ValueError:
+            # expired between add and incr
+            current = 1
+            cache.set(current_key, current, timeout=2 * window)
+        previous = cache.get(previous_key, 0)
+        overlap = 1 - (now % window) / window
+
+        return current + previous * overlap
+
+    def _lock_out(self, key, now):
+        lockout = settings.LOGIN_LOCKOUT
+        until = now + lockout
+        cache.set(self._lockout_key(key), until, timeout=lockout)
+        if len(self.local_lockouts) >= self.max_local_lockouts:
+            for stale in [
+                stale for stale, end in self.local_lockouts.items()
+                if end <= now
+            ]:
+                self.local_lockouts.pop(stale, None)
+        if len(self.local_lockouts) < self.max_local_lockouts:
+            self.local_lockouts[key] = until
+
+        return lockout
+
+    def _lockout_key(self, key):
+        return f'{self.cache_prefix}:lockout:{key}'
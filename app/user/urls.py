@@ -3,7 +3,7 @@ URL mappings for the User API.
 """
 from django.urls import path
 
-from user import views
+from user import async_views, views
 
 
 app_name = 'user'
@@ -12,4 +12,5 @@ urlpatterns = [
     path('create/', views.CreateUserView.as_view(), name='create'),
     path('token/', views.CreateTokenView.as_view(), name='token'),
     path('profile/', views.UserProfileView.as_view(), name='profile'),
+    path('async/profile/', async_views.profile, name='profile-async'),
 ]
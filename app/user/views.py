@@ -1,10 +1,13 @@
 """
 Views for the User API
 """
-from rest_framework import generics, authentication, permissions
+from rest_framework import generics, permissions
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.settings import api_settings
 
+from core.db.replicas import ReplicaReadMixin
+from user.authentication import CachedTokenAuthentication
+from user.throttling import LoginRateThrottle
 from user.serializers import (
     UserSerializer,
     AuthTokenSerializer,
@@ -22,13 +25,16 @@ class CreateTokenView(ObtainAuthToken):
     """Create a new auth token for user"""
     serializer_class = AuthTokenSerializer
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+    parser_classes = api_settings.DEFAULT_PARSER_CLASSES
+    # checked before the serializer hashes the password
+    throttle_classes = (LoginRateThrottle,)
 
 
 # PATCH and GET
-class UserProfileView(generics.RetrieveUpdateAPIView):
+class UserProfileView(ReplicaReadMixin, generics.RetrieveUpdateAPIView):
     """Manage the authenticated user"""
     serializer_class = UserSerializer
-    authentication_classes = (authentication.TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (permissions.IsAuthenticated,)
 
     def get_object(self):